@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+
+"""
+End-to-end benchmarks of the tagging scan and policy application against the synthetic connector.
+
+Each case runs in its own subprocess so peak RSS is measured per case. Results are
+appended to a JSON history file and compared with the previous run of the same
+configuration; the script exits with status 1 when a metric regresses beyond the threshold.
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import platform
+import subprocess
+from datetime import datetime
+from typing import Dict, List, Optional, Any
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO_ROOT, 'src'))
+
+from connectors.synthetic import SyntheticConnector
+from detection.rule_loader import RuleLoader
+from detection.detector import PIIDetector, DETECTION_BACKENDS
+from metadata_tagger import process_database
+from policy_manager import PolicyLoader, PolicyEngine, PolicyApplier
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+logger = logging.getLogger('benchmarks')
+
+# Catalog shapes by total number of columns
+CATALOG_SIZES = {
+    '1k': {'schemas': 2, 'tables': 50, 'columns': 10},
+    '10k': {'schemas': 5, 'tables': 200, 'columns': 10},
+    '100k': {'schemas': 10, 'tables': 1000, 'columns': 10}
+}
+
+DEFAULT_SIZES = ['1k', '10k']
+DEFAULT_SAMPLE_SIZES = [10, 100]
+DEFAULT_HISTORY = os.path.join(REPO_ROOT, 'benchmarks', 'history.json')
+
+# Metrics where a higher value is worse, and those where a lower value is worse
+HIGHER_IS_WORSE = ['wall_seconds', 'peak_rss_mb', 'total_queries']
+LOWER_IS_WORSE = ['columns_per_second']
+
+# Timings of phases shorter than this are too noisy to compare
+MIN_TIMED_SECONDS = 0.5
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB, or None where it cannot be measured"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+def _metrics(wall_seconds: float, columns: int, query_counts: Dict[str, int]) -> Dict[str, Any]:
+    """Build the metrics of one measured phase"""
+    return {
+        'wall_seconds': round(wall_seconds, 4),
+        'columns': columns,
+        'columns_per_second': round(columns / wall_seconds, 1) if wall_seconds > 0 else None,
+        'total_queries': sum(query_counts.values()),
+        'query_counts': dict(query_counts),
+        'peak_rss_mb': peak_rss_mb()
+    }
+
+def run_case(size: str, sample_size: int, workers: int, latency: float,
+             backend: str = 'python') -> Dict[str, Dict[str, Any]]:
+    """Run one scan and the policy application after it, in this process"""
+    logging.disable(logging.WARNING)
+    
+    config = dict(CATALOG_SIZES[size], rows=sample_size, latency=latency, database='BENCHMARK')
+    connector = SyntheticConnector(config)
+    columns = config['schemas'] * config['tables'] * config['columns']
+    
+    rule_loader = RuleLoader(os.path.join(REPO_ROOT, 'config', 'tag_rules.yaml'))
+    detector = PIIDetector(rule_loader, backend)
+    
+    start = time.perf_counter()
+    process_database(connector, detector, rule_loader, {}, sample_size=sample_size, workers=workers,
+                     result_sink=lambda row: None)
+    scan = _metrics(time.perf_counter() - start, columns, connector.query_counts)
+    
+    # Policies are applied to the tags the scan left on the synthetic database
+    os.environ['SNOWFLAKE_DATABASE'] = config['database']
+    policies = PolicyLoader(os.path.join(REPO_ROOT, 'config', 'policy_config.yaml')).load_policies()
+    connector.connect()
+    connector.query_counts.clear()
+    start = time.perf_counter()
+    PolicyApplier(PolicyEngine(connector)).apply_all_policies(policies)
+    policy = _metrics(time.perf_counter() - start, len(connector.applied_tags), connector.query_counts)
+    connector.close()
+    
+    return {
+        f"scan/{size}/sample{sample_size}": scan,
+        f"policies/{size}/sample{sample_size}": policy
+    }
+
+def run_case_in_subprocess(size: str, sample_size: int, workers: int, latency: float,
+                           backend: str = 'python') -> Dict[str, Dict[str, Any]]:
+    """Run a case in a fresh interpreter so its peak RSS is its own"""
+    command = [sys.executable, os.path.abspath(__file__), '--run-case', size, str(sample_size),
+               '--workers', str(workers), '--latency', str(latency), '--detection-backend', backend]
+    completed = subprocess.run(command, capture_output=True, text=True, cwd=REPO_ROOT)
+    if completed.returncode != 0:
+        raise RuntimeError(f"Benchmark case {size}/sample{sample_size} failed:\n{completed.stderr}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def load_history(filepath: str) -> Dict[str, Any]:
+    """Load the benchmark history, starting empty if there is none"""
+    if not os.path.exists(filepath):
+        return {'runs': []}
+    with open(filepath, 'r') as f:
+        return json.load(f)
+
+def save_history(filepath: str, history: Dict[str, Any]) -> None:
+    """Write the benchmark history atomically"""
+    temp_path = f"{filepath}.tmp"
+    with open(temp_path, 'w') as f:
+        json.dump(history, f, indent=2)
+    os.replace(temp_path, filepath)
+
+def git_commit() -> Optional[str]:
+    """Commit the benchmarks ran against, if the tree is a git checkout"""
+    try:
+        completed = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                   cwd=REPO_ROOT)
+        return completed.stdout.strip() or None
+    except OSError:
+        return None
+
+def find_regressions(baseline: Dict[str, Dict[str, Any]], results: Dict[str, Dict[str, Any]],
+                     threshold: float) -> List[str]:
+    """
+    Compare results with a baseline run of the same configuration
+    Query counts are deterministic, so any increase counts; other metrics may move by threshold.
+    Timings are only compared for phases that took at least MIN_TIMED_SECONDS.
+    """
+    regressions = []
+    for case, metrics in results.items():
+        previous = baseline.get(case)
+        if not previous:
+            continue
+        timed = (previous.get('wall_seconds') or 0) >= MIN_TIMED_SECONDS
+        for metric in HIGHER_IS_WORSE:
+            old, new = previous.get(metric), metrics.get(metric)
+            if old is None or new is None or (metric == 'wall_seconds' and not timed):
+                continue
+            allowed = 0 if metric == 'total_queries' else threshold
+            if new > old * (1 + allowed):
+                regressions.append(f"{case}: {metric} rose from {old} to {new}")
+        for metric in LOWER_IS_WORSE:
+            old, new = previous.get(metric), metrics.get(metric)
+            if timed and old and new is not None and new < old * (1 - threshold):
+                regressions.append(f"{case}: {metric} fell from {old} to {new}")
+    return regressions
+
+def main():
+    """Run the benchmark cases, record them and check for regressions"""
+    parser = argparse.ArgumentParser(description='Benchmark the metadata tagger against a synthetic database')
+    parser.add_argument('--sizes', nargs='+', default=DEFAULT_SIZES, choices=list(CATALOG_SIZES),
+                        help='Catalog sizes to run, by total number of columns')
+    parser.add_argument('--sample-sizes', nargs='+', type=int, default=DEFAULT_SAMPLE_SIZES,
+                        help='Sample sizes to run each catalog size with')
+    parser.add_argument('--workers', type=int, default=1, help='Workers passed to process_database')
+    parser.add_argument('--latency', type=float, default=0.0, help='Simulated seconds per query')
+    parser.add_argument('--detection-backend', default='python', choices=DETECTION_BACKENDS,
+                        help='Detection backend of the scans')
+    parser.add_argument('--history', default=DEFAULT_HISTORY, help='JSON file the results are appended to')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='Relative change in time, throughput or memory that counts as a regression')
+    parser.add_argument('--no-record', action='store_true', help='Compare with the history without appending to it')
+    parser.add_argument('--run-case', nargs=2, metavar=('SIZE', 'SAMPLE_SIZE'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.run_case:
+        size, sample_size = args.run_case
+        print(json.dumps(run_case(size, int(sample_size), args.workers, args.latency, args.detection_backend)))
+        return
+    
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    
+    results = {}
+    for size in args.sizes:
+        for sample_size in args.sample_sizes:
+            logger.info(f"Running {size} columns with sample size {sample_size}")
+            cases = run_case_in_subprocess(size, sample_size, args.workers, args.latency, args.detection_backend)
+            for case, metrics in cases.items():
+                results[case] = metrics
+                logger.info(f"{case}: {metrics['wall_seconds']}s, {metrics['columns_per_second']} columns/s, "
+                            f"{metrics['total_queries']} queries, peak RSS {metrics['peak_rss_mb']} MB")
+    
+    config = {'workers': args.workers, 'latency': args.latency, 'python': platform.python_version()}
+    # Runs of the default backend keep the configuration they were recorded with before backends existed
+    if args.detection_backend != 'python':
+        config['detection_backend'] = args.detection_backend
+    history = load_history(args.history)
+    baseline = next((run for run in reversed(history['runs']) if run.get('config') == config), None)
+    regressions = find_regressions(baseline['results'], results, args.threshold) if baseline else []
+    
+    if not args.no_record:
+        history['runs'].append({
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'commit': git_commit(),
+            'config': config,
+            'results': results
+        })
+        save_history(args.history, history)
+        logger.info(f"Recorded results in {args.history}")
+    
+    if regressions:
+        for regression in regressions:
+            logger.error(f"Regression: {regression}")
+        sys.exit(1)
+    logger.info("No regressions" if baseline else "No earlier run with this configuration to compare with")
+
+if __name__ == "__main__":
+    main()
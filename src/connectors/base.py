@@ -3,11 +3,14 @@ Base connector module defining the abstract interface for database connections.
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, List, Optional, Any, Tuple, Union
 
 class DatabaseConnector(ABC):
     """Abstract base class for database connections"""
     
+    # QueryLedger recording every statement run through cursor(), or None
+    query_ledger = None
+    
     @abstractmethod
     def connect(self) -> Any:
         """Establish connection to the database"""
@@ -28,16 +31,139 @@ class DatabaseConnector(ABC):
         """Get column information for a table"""
         pass
     
+    def get_catalog(self, schemas: Optional[List[str]] = None) -> Dict[str, Dict[str, List[Dict[str, str]]]]:
+        """
+        Get column information for every table, grouped as schema -> table -> columns
+        Connectors that can read the whole catalog in one query should override this
+        """
+        catalog = {}
+        for schema in schemas or self.get_schemas():
+            catalog[schema] = {}
+            for table in self.get_tables(schema):
+                catalog[schema][table] = self.get_columns(schema, table)
+        return catalog
+    
+    def get_table_stats(self, schemas: Optional[List[str]] = None) -> Dict[Tuple[str, str], Dict[str, Any]]:
+        """
+        Get change-tracking statistics (last_altered, row_count) keyed by (schema, table)
+        Connectors that cannot report them return an empty dictionary
+        """
+        return {}
+    
+    def get_single_table_stats(self, schema: str, table: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the change-tracking statistics of one table, or None if they cannot be reported
+        Connectors that can read one table's statistics cheaply should override this
+        """
+        return self.get_table_stats([schema]).get((schema, table))
+    
     @abstractmethod
     def get_sample_data(self, schema: str, table: str, column: str, sample_size: int = 100) -> List[Any]:
         """Get sample data from a column"""
         pass
     
+    @abstractmethod
+    def get_table_sample(self, schema: str, table: str, columns: List[str], sample_size: int = 100) -> Dict[str, List[Any]]:
+        """Get sample data for several columns of a table with a single query"""
+        pass
+    
+    def get_table_sample_with_rows(self, schema: str, table: str, columns: List[str],
+                                   sample_size: int = 100) -> Tuple[Dict[str, List[Any]], Optional[int]]:
+        """
+        Get sample data for several columns of a table and the number of rows the sample fetched
+        The row count is None for connectors that cannot report it.
+        """
+        return self.get_table_sample(schema, table, columns, sample_size), None
+    
+    def get_table_match_counts(self, schema: str, table: str, columns: List[str], patterns: List[Tuple[str, str, str]],
+                               sample_size: int = 100, with_values: bool = False) -> Dict[str, Dict[str, Any]]:
+        """
+        Count the sampled values of several columns each pattern matches, in the database with a single query
+        Patterns are (Python pattern, translated pattern, match parameters); each column gets its non-null
+        sample count, the matches of each pattern and, with with_values, its non-null sample values.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support pattern pushdown")
+    
     @abstractmethod
     def apply_tag(self, schema: str, table: str, column: str, tag: str, tag_value: str) -> bool:
         """Apply a tag to a column"""
         pass
     
+    def apply_tags(self, schema: str, table: str, column_tags: Dict[str, str], tag: str,
+                   tag_schema: str = "") -> Dict[str, bool]:
+        """
+        Apply a tag to several columns of a table
+        Returns the success status for each column; connectors that can tag many
+        columns in one statement should override this
+        """
+        return {
+            column: self.apply_tag(schema, table, column, tag, tag_value, tag_schema)
+            for column, tag_value in column_tags.items()
+        }
+    
+    def plan_tags(self, schema: str, table: str, column_tags: Dict[str, str], tag: str,
+                  tag_schema: str = "") -> Tuple[str, str]:
+        """
+        Build the DDL that apply_tags would run, without running it
+        Returns the statement defining the tag and the statement tagging the columns
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support tag plans")
+    
+    def execute_statements(self, statements: List[str], batch_size: int = 500) -> List[bool]:
+        """
+        Run DDL statements that do not depend on each other, several at once where the connector supports it
+        Returns the success status for each statement
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support tag plans")
+    
+    async def get_table_sample_async(self, schema: str, table: str, columns: List[str],
+                                     sample_size: int = 100) -> Dict[str, List[Any]]:
+        """
+        Asynchronous variant of get_table_sample
+        Runs the blocking call unless the connector supports asynchronous queries
+        """
+        return self.get_table_sample(schema, table, columns, sample_size)
+    
+    async def get_table_sample_with_rows_async(self, schema: str, table: str, columns: List[str], sample_size: int = 100
+                                               ) -> Tuple[Dict[str, List[Any]], Optional[int]]:
+        """Asynchronous variant of get_table_sample_with_rows"""
+        return self.get_table_sample_with_rows(schema, table, columns, sample_size)
+    
+    async def get_table_match_counts_async(self, schema: str, table: str, columns: List[str],
+                                           patterns: List[Tuple[str, str, str]], sample_size: int = 100,
+                                           with_values: bool = False) -> Dict[str, Dict[str, Any]]:
+        """
+        Asynchronous variant of get_table_match_counts
+        Runs the blocking call unless the connector supports asynchronous queries
+        """
+        return self.get_table_match_counts(schema, table, columns, patterns, sample_size, with_values)
+    
+    async def get_single_table_stats_async(self, schema: str, table: str) -> Optional[Dict[str, Any]]:
+        """
+        Asynchronous variant of get_single_table_stats
+        Runs the blocking call unless the connector supports asynchronous queries
+        """
+        return self.get_single_table_stats(schema, table)
+    
+    async def apply_tags_async(self, schema: str, table: str, column_tags: Dict[str, str], tag: str,
+                               tag_schema: str = "") -> Dict[str, bool]:
+        """
+        Asynchronous variant of apply_tags
+        Runs the blocking call unless the connector supports asynchronous queries
+        """
+        return self.apply_tags(schema, table, column_tags, tag, tag_schema)
+    
+    def cursor(self) -> Any:
+        """Open a cursor on the connection, recording its statements when a query ledger is set"""
+        cursor = self.conn.cursor()
+        return self.query_ledger.wrap(cursor) if self.query_ledger is not None else cursor
+    
+    def clone(self) -> 'DatabaseConnector':
+        """Create a new, unconnected connector with the same configuration"""
+        connector = type(self)(self.config)
+        connector.query_ledger = self.query_ledger
+        return connector
+    
     @abstractmethod
     def close(self) -> None:
         """Close the database connection"""
@@ -0,0 +1,71 @@
+"""
+Connector pool module for sharing a bounded set of database connections between threads.
+"""
+
+import queue
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Iterator, List
+
+from .base import DatabaseConnector
+
+logger = logging.getLogger(__name__)
+
+class ConnectorPool:
+    """Bounded pool of connected database connectors handed out to worker threads"""
+    
+    def __init__(self, connector: DatabaseConnector, size: int):
+        """
+        Initialize with an already connected connector
+        Further connections are cloned from it on demand, up to size in total
+        """
+        self.size = max(1, size)
+        self._primary = connector
+        self._connectors: List[DatabaseConnector] = [connector]
+        self._available = queue.Queue()
+        self._available.put(connector)
+        self._lock = threading.Lock()
+    
+    @contextmanager
+    def acquire(self) -> Iterator[DatabaseConnector]:
+        """Borrow a connector for the duration of the with block"""
+        connector = self._take()
+        try:
+            yield connector
+        finally:
+            self._available.put(connector)
+    
+    def _take(self) -> DatabaseConnector:
+        """Take an idle connector, opening a new connection while under the size limit"""
+        try:
+            return self._available.get_nowait()
+        except queue.Empty:
+            pass
+        
+        with self._lock:
+            grow = len(self._connectors) < self.size
+            if grow:
+                connector = self._primary.clone()
+                self._connectors.append(connector)
+        
+        if not grow:
+            # Pool is at capacity, wait for another worker to return a connector
+            return self._available.get()
+        
+        try:
+            connector.connect()
+        except Exception:
+            with self._lock:
+                self._connectors.remove(connector)
+            raise
+        logger.info(f"Opened pooled connection {len(self._connectors)}/{self.size}")
+        return connector
+    
+    def close(self) -> None:
+        """Close every pooled connection except the primary one, which the caller owns"""
+        with self._lock:
+            for connector in self._connectors:
+                if connector is not self._primary:
+                    connector.close()
+            self._connectors = [self._primary]
@@ -4,8 +4,11 @@ Snowflake connector implementation with SSO support.
 
 import os
 import re
+import json
+import time
+import asyncio
 import logging
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 
 from dotenv import load_dotenv
 
@@ -13,9 +16,25 @@ from .base import DatabaseConnector
 
 logger = logging.getLogger(__name__)
 
+def _string_literal(text: str) -> str:
+    """
+    Quote text as a Snowflake string literal
+    Backslashes are escapes inside Snowflake strings, so they are doubled; quotes are doubled and
+    control characters written as hex escapes so the statement stays on one line.
+    """
+    escaped = text.replace('\\', '\\\\').replace("'", "''")
+    escaped = re.sub(r'[\x00-\x1f]', lambda match: f"\\x{ord(match.group()):02x}", escaped)
+    return f"'{escaped}'"
+
 class SnowflakeConnector(DatabaseConnector):
     """Connector implementation for Snowflake with SSO support"""
     
+    # Number of rows pulled per round-trip when streaming large metadata results
+    FETCH_BATCH_SIZE = 10000
+    
+    # Seconds between status checks for queries submitted asynchronously
+    ASYNC_POLL_INTERVAL = 0.25
+    
     def __init__(self, config: Dict[str, str]):
         """Initialize with connection parameters"""
         # Load environment variables
@@ -25,6 +44,9 @@ class SnowflakeConnector(DatabaseConnector):
         self.config = self._process_env_variables(config)
         self.conn = None
         
+        # Tags already created or confirmed during this run, keyed by (database, schema, tag)
+        self._ensured_tags = set()
+        
         # Import here to make the dependency optional
         try:
             import snowflake.connector
@@ -148,7 +170,7 @@ class SnowflakeConnector(DatabaseConnector):
     
     def get_schemas(self) -> List[str]:
         """Get list of schemas in the database"""
-        cursor = self.conn.cursor()
+        cursor = self.cursor()
         try:
             cursor.execute("SHOW SCHEMAS")
             schemas = [row[1] for row in cursor.fetchall()]
@@ -158,7 +180,7 @@ class SnowflakeConnector(DatabaseConnector):
     
     def get_tables(self, schema: str) -> List[str]:
         """Get list of tables in a schema"""
-        cursor = self.conn.cursor()
+        cursor = self.cursor()
         try:
             cursor.execute(f"SHOW TABLES IN SCHEMA {schema}")
             tables = [row[1] for row in cursor.fetchall()]
@@ -168,7 +190,7 @@ class SnowflakeConnector(DatabaseConnector):
     
     def get_columns(self, schema: str, table: str) -> List[Dict[str, str]]:
         """Get column information for a table"""
-        cursor = self.conn.cursor()
+        cursor = self.cursor()
         try:
             cursor.execute(f"DESCRIBE TABLE {schema}.{table}")
             columns = []
@@ -183,9 +205,109 @@ class SnowflakeConnector(DatabaseConnector):
         finally:
             cursor.close()
     
+    def get_catalog(self, schemas: Optional[List[str]] = None) -> Dict[str, Dict[str, List[Dict[str, str]]]]:
+        """
+        Get column information for every table with a single INFORMATION_SCHEMA query
+        Returns a dictionary of schema -> table -> columns, in the same shape as get_columns
+        """
+        database = self.config.get('database')
+        info_schema = f"{database}.INFORMATION_SCHEMA" if database else "INFORMATION_SCHEMA"
+        
+        sql = f"""
+        SELECT c.TABLE_SCHEMA, c.TABLE_NAME, c.COLUMN_NAME, c.DATA_TYPE, c.IS_NULLABLE
+        FROM {info_schema}.COLUMNS c
+        JOIN {info_schema}.TABLES t
+            ON t.TABLE_SCHEMA = c.TABLE_SCHEMA AND t.TABLE_NAME = c.TABLE_NAME
+        WHERE t.TABLE_TYPE = 'BASE TABLE'
+        """
+        if schemas:
+            schema_list = ", ".join("'" + schema.upper().replace("'", "''") + "'" for schema in schemas)
+            sql += f" AND UPPER(c.TABLE_SCHEMA) IN ({schema_list})"
+        sql += " ORDER BY c.TABLE_SCHEMA, c.TABLE_NAME, c.ORDINAL_POSITION"
+        
+        cursor = self.cursor()
+        try:
+            cursor.execute(sql)
+            catalog = {}
+            # Stream the rows in batches rather than materialising the whole result
+            while True:
+                rows = cursor.fetchmany(self.FETCH_BATCH_SIZE)
+                if not rows:
+                    break
+                for schema, table, column, data_type, is_nullable in rows:
+                    catalog.setdefault(schema, {}).setdefault(table, []).append({
+                        'name': column,
+                        'type': data_type,
+                        'nullable': 'Y' if is_nullable == 'YES' else 'N'
+                    })
+        finally:
+            cursor.close()
+        
+        logger.info(f"Loaded catalog of {sum(len(tables) for tables in catalog.values())} tables "
+                    f"in {len(catalog)} schemas from {info_schema}")
+        
+        if not schemas:
+            return catalog
+        
+        # Keep the requested schema order, matching unquoted names case-insensitively
+        ordered = {}
+        for schema in schemas:
+            name = next((found for found in catalog if found.upper() == schema.upper()), schema)
+            ordered[name] = catalog.get(name, {})
+        return ordered
+    
+    def get_table_stats(self, schemas: Optional[List[str]] = None) -> Dict[Tuple[str, str], Dict[str, Any]]:
+        """Get LAST_ALTERED and ROW_COUNT for every base table with a single query"""
+        database = self.config.get('database')
+        info_schema = f"{database}.INFORMATION_SCHEMA" if database else "INFORMATION_SCHEMA"
+        
+        sql = f"""
+        SELECT TABLE_SCHEMA, TABLE_NAME, LAST_ALTERED, ROW_COUNT
+        FROM {info_schema}.TABLES
+        WHERE TABLE_TYPE = 'BASE TABLE'
+        """
+        if schemas:
+            schema_list = ", ".join("'" + schema.upper().replace("'", "''") + "'" for schema in schemas)
+            sql += f" AND UPPER(TABLE_SCHEMA) IN ({schema_list})"
+        
+        cursor = self.cursor()
+        try:
+            cursor.execute(sql)
+            stats = {}
+            while True:
+                rows = cursor.fetchmany(self.FETCH_BATCH_SIZE)
+                if not rows:
+                    break
+                for schema, table, last_altered, row_count in rows:
+                    stats[(schema, table)] = self._table_stats_row(last_altered, row_count)
+            return stats
+        finally:
+            cursor.close()
+    
+    def _table_stats_row(self, last_altered: Any, row_count: Any) -> Dict[str, Any]:
+        """Statistics of a table as the scan state fingerprints them"""
+        return {'last_altered': str(last_altered) if last_altered is not None else None, 'row_count': row_count}
+    
+    def _single_table_stats_sql(self, schema: str, table: str) -> str:
+        """Build the query reading LAST_ALTERED and ROW_COUNT of one table"""
+        database = self.config.get('database')
+        info_schema = f"{database}.INFORMATION_SCHEMA" if database else "INFORMATION_SCHEMA"
+        return (f"SELECT LAST_ALTERED, ROW_COUNT FROM {info_schema}.TABLES "
+                f"WHERE TABLE_SCHEMA = {_string_literal(schema)} AND TABLE_NAME = {_string_literal(table)}")
+    
+    def get_single_table_stats(self, schema: str, table: str) -> Optional[Dict[str, Any]]:
+        """Get LAST_ALTERED and ROW_COUNT of one table, or None if it is not found"""
+        cursor = self.cursor()
+        try:
+            cursor.execute(self._single_table_stats_sql(schema, table))
+            row = cursor.fetchone()
+            return self._table_stats_row(*row) if row else None
+        finally:
+            cursor.close()
+    
     def get_sample_data(self, schema: str, table: str, column: str, sample_size: int = 100) -> List[Any]:
         """Get sample data from a column"""
-        cursor = self.conn.cursor()
+        cursor = self.cursor()
         try:
             cursor.execute(f"SELECT {column} FROM {schema}.{table} SAMPLE ({sample_size} ROWS)")
             # Extract values from the single-column result
@@ -194,29 +316,128 @@ class SnowflakeConnector(DatabaseConnector):
         finally:
             cursor.close()
     
+    def _table_sample_sql(self, schema: str, table: str, columns: List[str], sample_size: int) -> str:
+        """Build the query that samples several columns of a table at once"""
+        column_list = ", ".join(columns)
+        return f"SELECT {column_list} FROM {schema}.{table} SAMPLE ({sample_size} ROWS)"
+    
+    def _split_sample_rows(self, columns: List[str], rows: List[tuple]) -> Dict[str, List[Any]]:
+        """Split sampled rows back into per-column lists of non-null values"""
+        sample_data = {column: [] for column in columns}
+        for row in rows:
+            for column, value in zip(columns, row):
+                if value is not None:
+                    sample_data[column].append(value)
+        return sample_data
+    
+    def get_table_sample(self, schema: str, table: str, columns: List[str], sample_size: int = 100) -> Dict[str, List[Any]]:
+        """
+        Get sample data for several columns of a table with a single query
+        Returns a dictionary of column name to its non-null sample values
+        """
+        return self.get_table_sample_with_rows(schema, table, columns, sample_size)[0]
+    
+    def get_table_sample_with_rows(self, schema: str, table: str, columns: List[str],
+                                   sample_size: int = 100) -> Tuple[Dict[str, List[Any]], Optional[int]]:
+        """Get sample data for several columns of a table and the number of rows the sample fetched"""
+        if not columns:
+            return {}, None
+        
+        cursor = self.cursor()
+        try:
+            cursor.execute(self._table_sample_sql(schema, table, columns, sample_size))
+            rows = cursor.fetchall()
+            return self._split_sample_rows(columns, rows), len(rows)
+        finally:
+            cursor.close()
+    
+    def _match_counts_sql(self, schema: str, table: str, columns: List[str], patterns: List[Tuple[str, str, str]],
+                          sample_size: int, with_values: bool) -> str:
+        """Build the query counting, over one sample, the values of each column each pattern matches"""
+        aggregates = []
+        for column in columns:
+            aggregates.append(f"COUNT({column})")
+            aggregates.extend(f"COUNT_IF(REGEXP_LIKE({column}, {_string_literal(regex)}, '{parameters}'))"
+                              for _, regex, parameters in patterns)
+            if with_values:
+                aggregates.append(f"ARRAY_AGG({column})")
+        return f"SELECT {', '.join(aggregates)} FROM {schema}.{table} SAMPLE ({sample_size} ROWS)"
+    
+    def _split_match_counts(self, columns: List[str], patterns: List[Tuple[str, str, str]],
+                            with_values: bool, row: tuple) -> Dict[str, Dict[str, Any]]:
+        """Split the single row of a match count query back into per-column counts and values"""
+        width = 1 + len(patterns) + (1 if with_values else 0)
+        match_counts = {}
+        for position, column in enumerate(columns):
+            cells = row[position * width:(position + 1) * width]
+            counts = {'count': cells[0] or 0, 'matches': [count or 0 for count in cells[1:1 + len(patterns)]]}
+            if with_values:
+                # Arrays come back as JSON text
+                values = cells[-1]
+                counts['values'] = json.loads(values) if isinstance(values, str) else list(values or [])
+            match_counts[column] = counts
+        return match_counts
+    
+    def get_table_match_counts(self, schema: str, table: str, columns: List[str], patterns: List[Tuple[str, str, str]],
+                               sample_size: int = 100, with_values: bool = False) -> Dict[str, Dict[str, Any]]:
+        """
+        Count the sampled values of several columns each pattern matches with COUNT_IF(REGEXP_LIKE(...))
+        Only counts leave the warehouse, unless with_values asks for the sampled values too
+        """
+        if not columns:
+            return {}
+        
+        cursor = self.cursor()
+        try:
+            cursor.execute(self._match_counts_sql(schema, table, columns, patterns, sample_size, with_values))
+            return self._split_match_counts(columns, patterns, with_values, cursor.fetchone())
+        finally:
+            cursor.close()
+    
+    def _qualified_tag(self, schema: str, tag: str, tag_schema: str = "") -> str:
+        """Fully qualified name of a tag kept in tag_schema, or else in the tagged table's schema"""
+        used_tag_schema = tag_schema or schema
+        database = self.config.get('database')
+        return f"{database}.{used_tag_schema}.{tag}" if database else f"{used_tag_schema}.{tag}"
+    
+    def _ensure_tag(self, cursor: Any, schema: str, tag: str, tag_schema: str = "") -> str:
+        """
+        Make sure the tag exists and return its fully qualified name
+        Each tag is only checked once per run, so repeated calls cost no round-trips
+        """
+        # Define the tag schema - use provided tag_schema if not empty, otherwise use the table's schema
+        used_tag_schema = tag_schema or schema
+        database = self.config.get('database')
+        qualified_tag = self._qualified_tag(schema, tag, tag_schema)
+        
+        registry_key = (database, used_tag_schema, tag)
+        if registry_key in self._ensured_tags:
+            return qualified_tag
+        
+        # Create the tag by its qualified name so the session never has to switch schema
+        try:
+            cursor.execute(f"CREATE TAG IF NOT EXISTS {qualified_tag}")
+            logger.info(f"Ensured tag {qualified_tag} exists")
+        except Exception as e:
+            # Roles without CREATE TAG can still use a tag that already exists
+            location = f"{database}.{used_tag_schema}" if database else used_tag_schema
+            cursor.execute(f"SHOW TAGS LIKE '{tag}' IN SCHEMA {location}")
+            if not cursor.fetchone():
+                raise
+            logger.info(f"Could not create tag {qualified_tag} ({e}), using the existing tag")
+        
+        self._ensured_tags.add(registry_key)
+        return qualified_tag
+    
     def apply_tag(self, schema: str, table: str, column: str, tag: str, tag_value: str, tag_schema: str = "") -> bool:
         """Apply a tag to a column using Snowflake's tag mechanism"""
-        cursor = self.conn.cursor()
+        cursor = self.cursor()
         try:
-            # Define the tag schema - use provided tag_schema if not empty, otherwise use the table's schema
-            if tag_schema:
-                used_tag_schema = tag_schema
-            else:
-                used_tag_schema = schema  # Default: use the same schema as the tagged object
-            
-            # First ensure the schema exists for tags
-            cursor.execute(f"USE DATABASE {self.config.get('database')}")
-            cursor.execute(f"USE SCHEMA {used_tag_schema}")
-            
-            # Check if tag exists, create it if not
-            cursor.execute(f"SHOW TAGS LIKE '{tag}'")
-            if not cursor.fetchone():
-                cursor.execute(f"CREATE TAG IF NOT EXISTS {tag}")
-                logger.info(f"Created new tag: {tag} in schema {used_tag_schema}")
+            qualified_tag = self._ensure_tag(cursor, schema, tag, tag_schema)
             
             # Apply tag to column - use fully qualified names
-            cursor.execute(f"ALTER TABLE {schema}.{table} MODIFY COLUMN {column} SET TAG {used_tag_schema}.{tag} = '{tag_value}'")
-            logger.info(f"Applied tag {used_tag_schema}.{tag}='{tag_value}' to {schema}.{table}.{column}")
+            cursor.execute(f"ALTER TABLE {schema}.{table} MODIFY COLUMN {column} SET TAG {qualified_tag} = '{tag_value}'")
+            logger.info(f"Applied tag {qualified_tag}='{tag_value}' to {schema}.{table}.{column}")
             return True
         except Exception as e:
             logger.error(f"Failed to apply tag: {e}")
@@ -224,6 +445,214 @@ class SnowflakeConnector(DatabaseConnector):
         finally:
             cursor.close()
     
+    def _tag_columns_sql(self, schema: str, table: str, column_tags: Dict[str, str], qualified_tag: str) -> str:
+        """Build one ALTER TABLE statement that sets the tag on every given column"""
+        clauses = ", ".join(
+            f"COLUMN {column} SET TAG {qualified_tag} = '{tag_value}'"
+            for column, tag_value in column_tags.items()
+        )
+        return f"ALTER TABLE {schema}.{table} MODIFY {clauses}"
+    
+    def apply_tags(self, schema: str, table: str, column_tags: Dict[str, str], tag: str,
+                   tag_schema: str = "") -> Dict[str, bool]:
+        """
+        Apply a tag to several columns of a table with a single ALTER TABLE statement
+        Returns the success status for each column
+        """
+        if not column_tags:
+            return {}
+        
+        cursor = self.cursor()
+        try:
+            qualified_tag = self._ensure_tag(cursor, schema, tag, tag_schema)
+            
+            # One MODIFY clause per column, all in the same statement
+            cursor.execute(self._tag_columns_sql(schema, table, column_tags, qualified_tag))
+            logger.info(f"Applied tag {qualified_tag} to {len(column_tags)} columns of {schema}.{table}")
+            return {column: True for column in column_tags}
+        except Exception as e:
+            logger.warning(f"Batched tag application failed for {schema}.{table}, retrying per column: {e}")
+        finally:
+            cursor.close()
+        
+        # Fall back to one statement per column to find out which columns failed
+        return super().apply_tags(schema, table, column_tags, tag, tag_schema)
+    
+    def plan_tags(self, schema: str, table: str, column_tags: Dict[str, str], tag: str,
+                  tag_schema: str = "") -> Tuple[str, str]:
+        """
+        Build the CREATE TAG and ALTER TABLE statements for tagging columns of a table
+        Every name is qualified with the database so the statements run from any session
+        """
+        qualified_tag = self._qualified_tag(schema, tag, tag_schema)
+        database = self.config.get('database')
+        qualified_schema = f"{database}.{schema}" if database else schema
+        return (f"CREATE TAG IF NOT EXISTS {qualified_tag}",
+                self._tag_columns_sql(qualified_schema, table, column_tags, qualified_tag))
+    
+    def execute_statements(self, statements: List[str], batch_size: int = 500) -> List[bool]:
+        """
+        Run statements as asynchronous queries, submitting up to batch_size before waiting for them
+        Statements of a batch run concurrently, so they must not depend on each other. Each is its own
+        query, recorded under its own query id; a failed statement is reported and nothing is run again.
+        """
+        batch_size = max(1, batch_size)
+        succeeded = []
+        cursor = self.cursor()
+        try:
+            for start in range(0, len(statements), batch_size):
+                batch = statements[start:start + batch_size]
+                query_ids = []
+                for statement in batch:
+                    try:
+                        cursor.execute_async(statement)
+                        query_ids.append(cursor.sfqid)
+                    except Exception as e:
+                        logger.error(f"Statement could not be submitted: {e}")
+                        query_ids.append(None)
+                outcomes = [query_id is not None and self._wait_for_statement(cursor, query_id)
+                            for query_id in query_ids]
+                logger.info(f"Ran {sum(outcomes)} of {len(batch)} statements submitted together")
+                succeeded.extend(outcomes)
+        finally:
+            cursor.close()
+        return succeeded
+    
+    def _wait_for_statement(self, cursor: Any, query_id: str) -> bool:
+        """Wait for a statement submitted with execute_async to finish, returning whether it succeeded"""
+        try:
+            status = self.conn.get_query_status_throw_if_error(query_id)
+            while self.conn.is_still_running(status):
+                time.sleep(self.ASYNC_POLL_INTERVAL)
+                status = self.conn.get_query_status_throw_if_error(query_id)
+            cursor.get_results_from_sfqid(query_id)
+            return True
+        except Exception as e:
+            if self.query_ledger is not None:
+                self.query_ledger.fail_submitted(query_id, e)
+            logger.error(f"Statement {query_id} failed: {e}")
+            return False
+    
+    async def submit(self, sql: str) -> str:
+        """
+        Submit a query without waiting for it to finish
+        Returns the Snowflake query id to pass to wait(); the driver's blocking calls run on a worker thread
+        """
+        cursor = self.cursor()
+        try:
+            await asyncio.to_thread(cursor.execute_async, sql)
+            return cursor.sfqid
+        finally:
+            cursor.close()
+    
+    async def wait(self, query_id: str) -> List[tuple]:
+        """
+        Wait for a submitted query to finish and return its rows
+        Raises the query's error if it failed
+        """
+        try:
+            # Each status check is a round-trip, so it runs on a worker thread instead of the event loop
+            status = await asyncio.to_thread(self.conn.get_query_status_throw_if_error, query_id)
+            while self.conn.is_still_running(status):
+                await asyncio.sleep(self.ASYNC_POLL_INTERVAL)
+                status = await asyncio.to_thread(self.conn.get_query_status_throw_if_error, query_id)
+        except Exception as e:
+            if self.query_ledger is not None:
+                self.query_ledger.fail_submitted(query_id, e)
+            raise
+        
+        cursor = self.cursor()
+        try:
+            await asyncio.to_thread(cursor.get_results_from_sfqid, query_id)
+            return await asyncio.to_thread(cursor.fetchall)
+        finally:
+            cursor.close()
+    
+    async def gather(self, statements: List[str], return_exceptions: bool = False) -> List[Any]:
+        """
+        Submit several queries at once and wait for all of them
+        Returns the rows of each query in statement order
+        """
+        async def run(sql: str) -> List[tuple]:
+            return await self.wait(await self.submit(sql))
+        
+        return await asyncio.gather(*(run(sql) for sql in statements), return_exceptions=return_exceptions)
+    
+    async def get_table_sample_async(self, schema: str, table: str, columns: List[str],
+                                     sample_size: int = 100) -> Dict[str, List[Any]]:
+        """Sample several columns of a table with an asynchronous query"""
+        return (await self.get_table_sample_with_rows_async(schema, table, columns, sample_size))[0]
+    
+    async def get_table_sample_with_rows_async(self, schema: str, table: str, columns: List[str], sample_size: int = 100
+                                               ) -> Tuple[Dict[str, List[Any]], Optional[int]]:
+        """Sample several columns of a table with an asynchronous query, counting the rows fetched"""
+        if not columns:
+            return {}, None
+        
+        query_id = await self.submit(self._table_sample_sql(schema, table, columns, sample_size))
+        rows = await self.wait(query_id)
+        return self._split_sample_rows(columns, rows), len(rows)
+    
+    async def get_table_match_counts_async(self, schema: str, table: str, columns: List[str],
+                                           patterns: List[Tuple[str, str, str]], sample_size: int = 100,
+                                           with_values: bool = False) -> Dict[str, Dict[str, Any]]:
+        """Count pattern matches over a sample of several columns with an asynchronous query"""
+        if not columns:
+            return {}
+        
+        query_id = await self.submit(self._match_counts_sql(schema, table, columns, patterns, sample_size, with_values))
+        rows = await self.wait(query_id)
+        return self._split_match_counts(columns, patterns, with_values, rows[0])
+    
+    async def get_single_table_stats_async(self, schema: str, table: str) -> Optional[Dict[str, Any]]:
+        """Get LAST_ALTERED and ROW_COUNT of one table with an asynchronous query"""
+        rows = await self.wait(await self.submit(self._single_table_stats_sql(schema, table)))
+        return self._table_stats_row(*rows[0]) if rows else None
+    
+    async def apply_tags_async(self, schema: str, table: str, column_tags: Dict[str, str], tag: str,
+                               tag_schema: str = "") -> Dict[str, bool]:
+        """
+        Apply a tag to several columns of a table with an asynchronous ALTER TABLE
+        Returns the success status for each column
+        """
+        if not column_tags:
+            return {}
+        
+        cursor = self.cursor()
+        try:
+            qualified_tag = await asyncio.to_thread(self._ensure_tag, cursor, schema, tag, tag_schema)
+        except Exception as e:
+            logger.error(f"Failed to apply tag: {e}")
+            return {column: False for column in column_tags}
+        finally:
+            cursor.close()
+        
+        try:
+            await self.wait(await self.submit(self._tag_columns_sql(schema, table, column_tags, qualified_tag)))
+            logger.info(f"Applied tag {qualified_tag} to {len(column_tags)} columns of {schema}.{table}")
+            return {column: True for column in column_tags}
+        except Exception as e:
+            logger.warning(f"Batched tag application failed for {schema}.{table}, retrying per column: {e}")
+        
+        # Fall back to one statement per column, still in flight together
+        outcomes = await self.gather([
+            self._tag_columns_sql(schema, table, {column: tag_value}, qualified_tag)
+            for column, tag_value in column_tags.items()
+        ], return_exceptions=True)
+        applied = {}
+        for column, outcome in zip(column_tags, outcomes):
+            applied[column] = not isinstance(outcome, Exception)
+            if not applied[column]:
+                logger.error(f"Failed to apply tag to {schema}.{table}.{column}: {outcome}")
+        return applied
+    
+    def clone(self) -> 'SnowflakeConnector':
+        """Create a new, unconnected connector that shares this connector's tag registry"""
+        connector = SnowflakeConnector(self.config)
+        connector._ensured_tags = self._ensured_tags
+        connector.query_ledger = self.query_ledger
+        return connector
+    
     def close(self) -> None:
         """Close the Snowflake connection"""
         if self.conn:
@@ -0,0 +1,781 @@
+"""
+Synthetic connector implementation backed by a generated in-memory catalog.
+"""
+
+import re
+import time
+import random
+import asyncio
+import logging
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Any, Tuple, Callable
+
+from .base import DatabaseConnector
+
+logger = logging.getLogger(__name__)
+
+def _email(rng: random.Random) -> str:
+    """Random email address"""
+    return f"{rng.choice(['ann', 'bob', 'chen', 'dana', 'eli'])}.{rng.randint(1, 9999)}@{rng.choice(['example.com', 'mail.org', 'corp.net'])}"
+
+def _phone(rng: random.Random) -> str:
+    """Random US phone number"""
+    return f"{rng.randint(200, 999)}-{rng.randint(200, 999)}-{rng.randint(1000, 9999)}"
+
+def _ssn(rng: random.Random) -> str:
+    """Random social security number"""
+    return f"{rng.randint(100, 899):03d}-{rng.randint(10, 99)}-{rng.randint(1000, 9999)}"
+
+def _credit_card(rng: random.Random) -> str:
+    """Random 16-digit card number"""
+    return "-".join(f"{rng.randint(0, 9999):04d}" for _ in range(4))
+
+def _ip_address(rng: random.Random) -> str:
+    """Random IPv4 address"""
+    return ".".join(str(rng.randint(1, 254)) for _ in range(4))
+
+def _first_name(rng: random.Random) -> str:
+    """Random first name"""
+    return rng.choice(['Ann', 'Bob', 'Chen', 'Dana', 'Eli', 'Fatima', 'Goran'])
+
+def _note(rng: random.Random) -> str:
+    """Random free-text note without PII"""
+    return rng.choice(['ok', 'pending review', 'shipped', 'see ticket', 'n/a'])
+
+def _timestamp(rng: random.Random) -> str:
+    """Random timestamp between 2020 and 2023"""
+    return (datetime(2020, 1, 1) + timedelta(seconds=rng.randint(0, 10 ** 8))).isoformat(sep=' ')
+
+# Column kinds as (name, data type, value generator); the names of the PII kinds
+# either match the name rules or hide the PII so only the data patterns find it
+PII_COLUMN_KINDS: List[Tuple[str, str, Callable[[random.Random], Any]]] = [
+    ('first_name', 'TEXT', _first_name),
+    ('email_address', 'TEXT', _email),
+    ('phone_number', 'TEXT', _phone),
+    ('ssn', 'TEXT', _ssn),
+    ('credit_card_number', 'TEXT', _credit_card),
+    ('contact', 'TEXT', _email),
+    ('reference', 'TEXT', _ssn),
+    ('payload', 'TEXT', _credit_card),
+    ('source_host', 'TEXT', _ip_address),
+    ('callback', 'TEXT', _phone)
+]
+
+NON_PII_COLUMN_KINDS: List[Tuple[str, str, Callable[[random.Random], Any]]] = [
+    ('id', 'NUMBER', lambda rng: rng.randint(1, 10 ** 9)),
+    ('amount', 'NUMBER', lambda rng: round(rng.uniform(0, 10000), 2)),
+    ('score', 'FLOAT', lambda rng: rng.random()),
+    ('status', 'TEXT', lambda rng: rng.choice(['NEW', 'OPEN', 'CLOSED'])),
+    ('note', 'TEXT', _note),
+    ('is_active', 'BOOLEAN', lambda rng: rng.random() < 0.5),
+    ('created_at', 'TIMESTAMP_NTZ', _timestamp),
+    ('quantity', 'NUMBER', lambda rng: rng.randint(0, 500))
+]
+
+# POSIX character classes of Snowflake regular expressions, as Python bracket contents
+POSIX_CLASSES = {'alnum': 'a-zA-Z0-9', 'alpha': 'a-zA-Z', 'digit': '0-9', 'lower': 'a-z', 'upper': 'A-Z',
+                 'space': ' \t\n\r\f\v', 'punct': '!-/:-@\\[-`{-~', 'xdigit': '0-9a-fA-F'}
+
+def compile_regexp_like(regex: str, parameters: str = 'c') -> re.Pattern:
+    """
+    Compile a Snowflake regular expression into a Python pattern whose fullmatch answers REGEXP_LIKE
+    Covers the POSIX extended syntax pushdown produces: character classes in brackets, $ only at the
+    very end, ASCII \\w, \\d and \\s, and the i and s parameters.
+    """
+    parts = []
+    position = 0
+    while position < len(regex):
+        char = regex[position]
+        position += 1
+        if char == '\\':
+            parts.append(char + regex[position])
+            position += 1
+        elif char == '[':
+            bracket = ['[']
+            if regex[position] == '^':
+                bracket.append('^')
+                position += 1
+            # A leading ] is a literal, and backslashes are literals throughout a POSIX bracket
+            first = True
+            while first or regex[position] != ']':
+                if regex.startswith('[:', position):
+                    end = regex.index(':]', position)
+                    bracket.append(POSIX_CLASSES[regex[position + 2:end]])
+                    position = end + 2
+                else:
+                    bracket.append(re.escape(regex[position]) if regex[position] in '\\[]' else regex[position])
+                    position += 1
+                first = False
+            parts.append(''.join(bracket) + ']')
+            position += 1
+        else:
+            parts.append('\\Z' if char == '$' else char)
+    flags = re.ASCII | (re.IGNORECASE if 'i' in parameters else 0) | (re.DOTALL if 's' in parameters else 0)
+    return re.compile(''.join(parts), flags)
+
+class SyntheticError(Exception):
+    """Error of a statement the synthetic database rejects, carrying the kind it is counted as"""
+    
+    def __init__(self, kind: str, message: str):
+        """Initialize with the statement kind and the error message"""
+        super().__init__(message)
+        self.kind = kind
+
+class SyntheticCursor:
+    """
+    DB-API style cursor answering the SQL the tagger and the policy manager issue from the synthetic state
+    Statements it does not recognise succeed without rows
+    """
+    
+    def __init__(self, connector: 'SyntheticConnector'):
+        """Initialize over the connector whose state the statements read and change"""
+        self.connector = connector
+        self.sfqid = None
+        self.rowcount = 0
+        self._rows: List[tuple] = []
+        self._prepared: Optional[Callable[[], Tuple[str, List[tuple]]]] = None
+    
+    def _next_query_id(self) -> None:
+        """Give the statement about to run its query id"""
+        with self.connector._lock:
+            self.connector.query_serial += 1
+            self.sfqid = f"synthetic-{self.connector.query_serial}"
+    
+    def prepare(self, answer: Callable[[], Tuple[str, List[tuple]]]) -> None:
+        """Have the next statement answered by a callable holding the parameters its SQL was built from"""
+        self._prepared = answer
+    
+    def _answer(self, sql: str) -> Tuple[str, List[tuple]]:
+        """Kind and rows of a statement, from the prepared answer if there is one"""
+        answer, self._prepared = self._prepared, None
+        return answer() if answer is not None else self.connector._answer(" ".join(sql.split()))
+    
+    def execute(self, sql: str, *args, **kwargs) -> 'SyntheticCursor':
+        """Run a statement, counting it by kind and waiting out the latency"""
+        self._next_query_id()
+        try:
+            kind, rows = self._answer(sql)
+        except SyntheticError as e:
+            self.connector._query(e.kind)
+            raise
+        self.connector._query(kind)
+        self._rows = rows
+        self.rowcount = len(rows)
+        return self
+    
+    def execute_async(self, sql: str, *args, **kwargs) -> Dict[str, str]:
+        """Submit a statement, counting it by kind; the caller waits out the latency"""
+        self._next_query_id()
+        try:
+            kind, outcome = self._answer(sql)
+        except SyntheticError as e:
+            kind, outcome = e.kind, e
+        self.connector._count(kind)
+        with self.connector._lock:
+            self.connector.submitted[self.sfqid] = outcome
+        return {'queryId': self.sfqid}
+    
+    def get_results_from_sfqid(self, query_id: str) -> None:
+        """Attach to the rows of a submitted statement"""
+        with self.connector._lock:
+            self._rows = self.connector.submitted.pop(query_id)
+        self.rowcount = len(self._rows)
+    
+    def fetchone(self) -> Optional[tuple]:
+        """Fetch the next row, or None when there are no more"""
+        return self._rows.pop(0) if self._rows else None
+    
+    def fetchmany(self, size: int = 1) -> List[tuple]:
+        """Fetch up to size rows"""
+        rows, self._rows = self._rows[:size], self._rows[size:]
+        return rows
+    
+    def fetchall(self) -> List[tuple]:
+        """Fetch every remaining row"""
+        rows, self._rows = self._rows, []
+        return rows
+    
+    def close(self) -> None:
+        """Release the cursor"""
+        self._rows = []
+
+class SyntheticConnection:
+    """Simulated connection handing out cursors over a synthetic connector"""
+    
+    def __init__(self, connector: 'SyntheticConnector'):
+        """Initialize over the connector that answers the statements"""
+        self.connector = connector
+    
+    def cursor(self) -> SyntheticCursor:
+        """Open a cursor"""
+        return SyntheticCursor(self.connector)
+    
+    def get_query_status_throw_if_error(self, query_id: str) -> str:
+        """Status of a submitted statement, raising its error if it failed"""
+        with self.connector._lock:
+            outcome = self.connector.submitted.get(query_id)
+            if isinstance(outcome, Exception):
+                del self.connector.submitted[query_id]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return 'SUCCESS'
+    
+    def close(self) -> None:
+        """Close the connection"""
+
+class SyntheticConnector(DatabaseConnector):
+    """
+    Connector over a generated catalog of schemas x tables x columns, for offline runs
+    Every query runs as SQL through cursor(), sleeps for the configured latency and is counted by type
+    """
+    
+    DEFAULTS = {
+        'database': 'SYNTHETIC',
+        'account': 'synthetic',
+        'schemas': 2,
+        'tables': 10,
+        'columns': 8,
+        'pii_ratio': 0.3,
+        'rows': 1000,
+        'null_ratio': 0.05,
+        'latency': 0.0,
+        'seed': 0
+    }
+    
+    # Shapes of the statements the tagger and the policy manager send, with the kind each is counted
+    # as and the method answering it from the match; statements of any other shape succeed without rows
+    STATEMENT_SHAPES = [(re.compile(pattern, re.IGNORECASE), kind, answer) for pattern, kind, answer in [
+        (r"SELECT CURRENT_SCHEMA\(\)", 'metadata', '_current_schema'),
+        (r"SHOW SCHEMAS", 'metadata', '_show_schemas'),
+        (r"SHOW TABLES IN SCHEMA (\S+)$", 'metadata', '_show_tables'),
+        (r"DESCRIBE TABLE (\S+)$", 'metadata', '_describe_table'),
+        (r"SELECT TABLE_SCHEMA, TABLE_NAME, LAST_ALTERED, ROW_COUNT FROM \S+\.INFORMATION_SCHEMA\.TABLES"
+         r"(?: WHERE UPPER\(TABLE_SCHEMA\) IN \((.*)\))?$", 'stats', '_table_stats'),
+        (r"SELECT LAST_ALTERED, ROW_COUNT FROM \S+\.INFORMATION_SCHEMA\.TABLES "
+         r"WHERE TABLE_SCHEMA = '([^']*)' AND TABLE_NAME = '([^']*)'$", 'stats', '_single_table_stats'),
+        (r"SELECT COLUMN_NAME, DATA_TYPE FROM \S+\.INFORMATION_SCHEMA\.COLUMNS "
+         r"WHERE TABLE_SCHEMA = '([^']*)' AND TABLE_NAME = '([^']*)'$", 'column_types', '_column_types'),
+        (r"SELECT TABLE_SCHEMA, TABLE_NAME, COLUMN_NAME, DATA_TYPE, IS_NULLABLE FROM \S+\.INFORMATION_SCHEMA\.COLUMNS"
+         r"(?: WHERE UPPER\(TABLE_SCHEMA\) IN \((.*)\))?$", 'catalog', '_catalog_rows'),
+        (r"SELECT (.*) FROM SNOWFLAKE\.ACCOUNT_USAGE\.TAG_REFERENCES ", 'tag_references', '_tag_references'),
+        (r"SELECT (.+) FROM (\S+) SAMPLE \((\d+) ROWS\)$", 'sample', '_sample_rows'),
+        (r"CREATE TAG IF NOT EXISTS (\S+)$", 'create_tag', '_create_tag'),
+        (r"ALTER TABLE (\S+) MODIFY (COLUMN \S+ SET TAG .*)$", 'tag', '_set_tags'),
+        (r"SHOW (MASKING|ROW ACCESS) POLICIES", 'show', '_show_policies'),
+        (r"(?:CREATE OR REPLACE|ALTER) (MASKING|ROW ACCESS) POLICY (\S+)", 'policy_ddl', '_define_policy'),
+        (r"ALTER TABLE (\S+) (?:MODIFY COLUMN (\S+) SET MASKING|ADD ROW ACCESS) POLICY (\S+)", 'policy_apply',
+         '_apply_policy')
+    ]]
+    
+    def __init__(self, config: Dict[str, Any]):
+        """Initialize with the catalog shape, latency in seconds per query and random seed"""
+        self.config = dict(self.DEFAULTS, **config)
+        self.conn = None
+        self.latency = float(self.config['latency'])
+        
+        # State shared with clones, as if every connection saw the same account
+        self.catalog = self._generate_catalog()
+        self.query_counts = Counter()
+        self.applied_tags: Dict[Tuple[str, str, str], Tuple[str, str]] = {}
+        self.created_tags = set()
+        self.last_altered: Dict[Tuple[str, str], str] = {}
+        self.policies: Dict[str, str] = {}
+        self.policy_references: Dict[str, str] = {}
+        # Rows or errors of statements submitted asynchronously, by query id
+        self.submitted: Dict[str, Any] = {}
+        self.query_serial = 0
+        self._ensured_tags = set()
+        self._lock = threading.Lock()
+        self._is_clone = False
+    
+    def _generate_catalog(self) -> Dict[str, Dict[str, List[Dict[str, Any]]]]:
+        """Build the schemas, tables and columns from the seed; each column keeps its value generator"""
+        rng = random.Random(self.config['seed'])
+        catalog = {}
+        for schema_index in range(int(self.config['schemas'])):
+            schema = f"SCHEMA_{schema_index}"
+            catalog[schema] = {}
+            for table_index in range(int(self.config['tables'])):
+                columns = []
+                for column_index in range(int(self.config['columns'])):
+                    is_pii = rng.random() < float(self.config['pii_ratio'])
+                    name, data_type, generate = rng.choice(PII_COLUMN_KINDS if is_pii else NON_PII_COLUMN_KINDS)
+                    columns.append({
+                        'name': f"{name}_{column_index}".upper(),
+                        'type': data_type,
+                        'nullable': 'Y',
+                        'pii': is_pii,
+                        'generate': generate
+                    })
+                catalog[schema][f"TABLE_{table_index}"] = columns
+        return catalog
+    
+    def _count(self, kind: str) -> None:
+        """Count a query of the given kind"""
+        with self._lock:
+            self.query_counts[kind] += 1
+    
+    def _query(self, kind: str) -> None:
+        """Count a query of the given kind and wait out its latency"""
+        self._count(kind)
+        if self.latency > 0:
+            time.sleep(self.latency)
+    
+    def _run(self, sql: str, answer: Optional[Callable[[], Tuple[str, List[tuple]]]] = None) -> List[tuple]:
+        """
+        Run a statement through a cursor, so a query ledger records it, and fetch its rows
+        A prepared answer replaces reading the statement back from its SQL.
+        """
+        cursor = self.cursor()
+        try:
+            if answer is not None:
+                cursor.prepare(answer)
+            cursor.execute(sql)
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+    
+    async def _run_async(self, sql: str, answer: Optional[Callable[[], Tuple[str, List[tuple]]]] = None
+                         ) -> List[tuple]:
+        """Submit a statement through a cursor and wait out its latency without blocking the event loop"""
+        cursor = self.cursor()
+        try:
+            if answer is not None:
+                cursor.prepare(answer)
+            cursor.execute_async(sql)
+            query_id = cursor.sfqid
+            if self.latency > 0:
+                await asyncio.sleep(self.latency)
+            try:
+                self.conn.get_query_status_throw_if_error(query_id)
+            except Exception as e:
+                if self.query_ledger is not None:
+                    self.query_ledger.fail_submitted(query_id, e)
+                raise
+            cursor.get_results_from_sfqid(query_id)
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+    
+    def connect(self) -> Any:
+        """Open a simulated connection"""
+        self._query('connect')
+        self.conn = SyntheticConnection(self)
+        return self.conn
+    
+    def get_schemas(self) -> List[str]:
+        """Get list of schemas in the database"""
+        return [row[1] for row in self._run("SHOW SCHEMAS")]
+    
+    def get_tables(self, schema: str) -> List[str]:
+        """Get list of tables in a schema"""
+        return [row[1] for row in self._run(f"SHOW TABLES IN SCHEMA {schema}")]
+    
+    def get_columns(self, schema: str, table: str) -> List[Dict[str, str]]:
+        """Get column information for a table"""
+        return [{'name': name, 'type': data_type, 'nullable': nullable}
+                for name, data_type, _, nullable in self._run(f"DESCRIBE TABLE {schema}.{table}")]
+    
+    def _schema_filter(self, schemas: Optional[List[str]]) -> str:
+        """WHERE clause limiting an INFORMATION_SCHEMA query to some schemas, or nothing for all"""
+        if not schemas:
+            return ""
+        return " WHERE UPPER(TABLE_SCHEMA) IN ({})".format(", ".join(f"'{schema.upper()}'" for schema in schemas))
+    
+    def get_catalog(self, schemas: Optional[List[str]] = None) -> Dict[str, Dict[str, List[Dict[str, str]]]]:
+        """Get every schema, table and column with a single query"""
+        rows = self._run("SELECT TABLE_SCHEMA, TABLE_NAME, COLUMN_NAME, DATA_TYPE, IS_NULLABLE "
+                         f"FROM {self.config['database']}.INFORMATION_SCHEMA.COLUMNS{self._schema_filter(schemas)}")
+        catalog = {}
+        for schema, table, column, data_type, nullable in rows:
+            catalog.setdefault(schema, {}).setdefault(table, []).append(
+                {'name': column, 'type': data_type, 'nullable': nullable}
+            )
+        return catalog
+    
+    def get_table_stats(self, schemas: Optional[List[str]] = None) -> Dict[Tuple[str, str], Dict[str, Any]]:
+        """Get last-altered time and row count for every table with a single query"""
+        rows = self._run("SELECT TABLE_SCHEMA, TABLE_NAME, LAST_ALTERED, ROW_COUNT "
+                         f"FROM {self.config['database']}.INFORMATION_SCHEMA.TABLES{self._schema_filter(schemas)}")
+        return {(schema, table): {'last_altered': last_altered, 'row_count': row_count}
+                for schema, table, last_altered, row_count in rows}
+    
+    def _single_table_stats_sql(self, schema: str, table: str) -> str:
+        """Build the query reading the last-altered time and row count of one table"""
+        return (f"SELECT LAST_ALTERED, ROW_COUNT FROM {self.config['database']}.INFORMATION_SCHEMA.TABLES "
+                f"WHERE TABLE_SCHEMA = '{schema}' AND TABLE_NAME = '{table}'")
+    
+    def get_single_table_stats(self, schema: str, table: str) -> Optional[Dict[str, Any]]:
+        """Get last-altered time and row count of one table, or None if it is not found"""
+        rows = self._run(self._single_table_stats_sql(schema, table))
+        return {'last_altered': rows[0][0], 'row_count': rows[0][1]} if rows else None
+    
+    async def get_single_table_stats_async(self, schema: str, table: str) -> Optional[Dict[str, Any]]:
+        """Asynchronous variant of get_single_table_stats"""
+        rows = await self._run_async(self._single_table_stats_sql(schema, table))
+        return {'last_altered': rows[0][0], 'row_count': rows[0][1]} if rows else None
+    
+    def _table_columns(self, schema: str, table: str, columns: List[str], kind: str) -> List[Dict[str, Any]]:
+        """Generated columns of a table by name, failing like the warehouse on unknown names"""
+        by_name = {column['name']: column for column in self.catalog.get(schema, {}).get(table, [])}
+        for name in columns:
+            if name not in by_name:
+                raise SyntheticError(kind, f"invalid identifier '{name}' in {schema}.{table}")
+        return [by_name[name] for name in columns]
+    
+    def _column_values(self, schema: str, table: str, column: Dict[str, Any], sample_size: int) -> List[Any]:
+        """Generate a column's sample values, None for nulls, the same on every call"""
+        rng = random.Random(f"{self.config['seed']}:{schema}.{table}.{column['name']}")
+        null_ratio = float(self.config['null_ratio'])
+        return [column['generate'](rng) if rng.random() >= null_ratio else None
+                for _ in range(min(sample_size, int(self.config['rows'])))]
+    
+    def _table_sample_sql(self, schema: str, table: str, columns: List[str], sample_size: int) -> str:
+        """Build the query sampling several columns of a table"""
+        return f"SELECT {', '.join(columns)} FROM {schema}.{table} SAMPLE ({sample_size} ROWS)"
+    
+    def _split_sample_rows(self, columns: List[str], rows: List[tuple]) -> Dict[str, List[Any]]:
+        """Turn sampled rows into each column's non-null values"""
+        return {column: [row[position] for row in rows if row[position] is not None]
+                for position, column in enumerate(columns)}
+    
+    def get_sample_data(self, schema: str, table: str, column: str, sample_size: int = 100) -> List[Any]:
+        """Get sample data from a column"""
+        return self._split_sample_rows([column], self._run(self._table_sample_sql(schema, table, [column],
+                                                                                    sample_size)))[column]
+    
+    def get_table_sample(self, schema: str, table: str, columns: List[str], sample_size: int = 100) -> Dict[str, List[Any]]:
+        """Get sample data for several columns of a table with a single query"""
+        return self.get_table_sample_with_rows(schema, table, columns, sample_size)[0]
+    
+    def get_table_sample_with_rows(self, schema: str, table: str, columns: List[str],
+                                   sample_size: int = 100) -> Tuple[Dict[str, List[Any]], Optional[int]]:
+        """Get sample data for several columns of a table and the number of rows the sample fetched"""
+        if not columns:
+            return {}, None
+        rows = self._run(self._table_sample_sql(schema, table, columns, sample_size))
+        return self._split_sample_rows(columns, rows), len(rows)
+    
+    async def get_table_sample_async(self, schema: str, table: str, columns: List[str],
+                                     sample_size: int = 100) -> Dict[str, List[Any]]:
+        """Asynchronous variant of get_table_sample"""
+        return (await self.get_table_sample_with_rows_async(schema, table, columns, sample_size))[0]
+    
+    async def get_table_sample_with_rows_async(self, schema: str, table: str, columns: List[str], sample_size: int = 100
+                                               ) -> Tuple[Dict[str, List[Any]], Optional[int]]:
+        """Asynchronous variant of get_table_sample_with_rows"""
+        if not columns:
+            return {}, None
+        rows = await self._run_async(self._table_sample_sql(schema, table, columns, sample_size))
+        return self._split_sample_rows(columns, rows), len(rows)
+    
+    def _match_counts_sql(self, schema: str, table: str, columns: List[str], patterns: List[Tuple[str, str, str]],
+                          sample_size: int, with_values: bool) -> str:
+        """Build the query counting each pattern's matches over a sample"""
+        aggregates = []
+        for column in columns:
+            aggregates.append(f"COUNT({column})")
+            aggregates.extend(f"COUNT_IF(REGEXP_LIKE({column}, '{regex}', '{parameters}'))"
+                              for _, regex, parameters in patterns)
+            if with_values:
+                aggregates.append(f"ARRAY_AGG({column})")
+        return f"SELECT {', '.join(aggregates)} FROM {schema}.{table} SAMPLE ({sample_size} ROWS)"
+    
+    def _match_counts_answer(self, schema: str, table: str, columns: List[str], patterns: List[Tuple[str, str, str]],
+                             sample_size: int, with_values: bool) -> Tuple[str, List[tuple]]:
+        """Answer a match count query with its single row, evaluating the translated patterns as REGEXP_LIKE would"""
+        compiled = [compile_regexp_like(regex, parameters) for _, regex, parameters in patterns]
+        row = []
+        for column in self._table_columns(schema, table, columns, 'sample'):
+            values = [value for value in self._column_values(schema, table, column, sample_size) if value is not None]
+            texts = [value if isinstance(value, str) else str(value) for value in values]
+            row.append(len(values))
+            row.extend(sum(1 for text in texts if pattern.fullmatch(text)) for pattern in compiled)
+            if with_values:
+                row.append(values)
+        return 'sample', [tuple(row)]
+    
+    def _split_match_counts(self, columns: List[str], patterns: List[Tuple[str, str, str]],
+                            with_values: bool, row: tuple) -> Dict[str, Dict[str, Any]]:
+        """Split the single row of a match count query back into per-column counts and values"""
+        width = 1 + len(patterns) + (1 if with_values else 0)
+        match_counts = {}
+        for position, column in enumerate(columns):
+            cells = row[position * width:(position + 1) * width]
+            counts = {'count': cells[0], 'matches': list(cells[1:1 + len(patterns)])}
+            if with_values:
+                counts['values'] = cells[-1]
+            match_counts[column] = counts
+        return match_counts
+    
+    def get_table_match_counts(self, schema: str, table: str, columns: List[str], patterns: List[Tuple[str, str, str]],
+                               sample_size: int = 100, with_values: bool = False) -> Dict[str, Dict[str, Any]]:
+        """Count the sampled values of several columns each pattern matches with a single query"""
+        if not columns:
+            return {}
+        query = (schema, table, columns, patterns, sample_size, with_values)
+        rows = self._run(self._match_counts_sql(*query), lambda: self._match_counts_answer(*query))
+        return self._split_match_counts(columns, patterns, with_values, rows[0])
+    
+    async def get_table_match_counts_async(self, schema: str, table: str, columns: List[str],
+                                           patterns: List[Tuple[str, str, str]], sample_size: int = 100,
+                                           with_values: bool = False) -> Dict[str, Dict[str, Any]]:
+        """Asynchronous variant of get_table_match_counts"""
+        if not columns:
+            return {}
+        query = (schema, table, columns, patterns, sample_size, with_values)
+        rows = await self._run_async(self._match_counts_sql(*query), lambda: self._match_counts_answer(*query))
+        return self._split_match_counts(columns, patterns, with_values, rows[0])
+    
+    def _qualified_tag(self, schema: str, tag: str, tag_schema: str = "") -> str:
+        """Fully qualified name of a tag kept in tag_schema, or else in the tagged table's schema"""
+        return f"{self.config['database']}.{tag_schema or schema}.{tag}"
+    
+    def _ensure_tag(self, cursor: Any, schema: str, tag: str, tag_schema: str = "") -> str:
+        """Create the tag on first use and return its fully qualified name"""
+        qualified_tag = self._qualified_tag(schema, tag, tag_schema)
+        with self._lock:
+            known = qualified_tag in self._ensured_tags
+            self._ensured_tags.add(qualified_tag)
+        if not known:
+            cursor.execute(f"CREATE TAG IF NOT EXISTS {qualified_tag}")
+        return qualified_tag
+    
+    def _tag_columns_sql(self, schema: str, table: str, column_tags: Dict[str, str], qualified_tag: str) -> str:
+        """Build one ALTER TABLE statement that sets the tag on every given column"""
+        clauses = ", ".join(f"COLUMN {column} SET TAG {qualified_tag} = '{tag_value}'"
+                            for column, tag_value in column_tags.items())
+        return f"ALTER TABLE {schema}.{table} MODIFY {clauses}"
+    
+    def apply_tag(self, schema: str, table: str, column: str, tag: str, tag_value: str, tag_schema: str = "") -> bool:
+        """Apply a tag to a column"""
+        cursor = self.cursor()
+        try:
+            qualified_tag = self._ensure_tag(cursor, schema, tag, tag_schema)
+            cursor.execute(self._tag_columns_sql(schema, table, {column: tag_value}, qualified_tag))
+            return True
+        except Exception as e:
+            logger.error(f"Failed to apply tag: {e}")
+            return False
+        finally:
+            cursor.close()
+    
+    def apply_tags(self, schema: str, table: str, column_tags: Dict[str, str], tag: str,
+                   tag_schema: str = "") -> Dict[str, bool]:
+        """Apply a tag to several columns of a table with a single statement, or column by column if it fails"""
+        if not column_tags:
+            return {}
+        cursor = self.cursor()
+        try:
+            qualified_tag = self._ensure_tag(cursor, schema, tag, tag_schema)
+            cursor.execute(self._tag_columns_sql(schema, table, column_tags, qualified_tag))
+            return {column: True for column in column_tags}
+        except Exception as e:
+            logger.warning(f"Batched tag application failed for {schema}.{table}, retrying per column: {e}")
+        finally:
+            cursor.close()
+        return super().apply_tags(schema, table, column_tags, tag, tag_schema)
+    
+    async def apply_tags_async(self, schema: str, table: str, column_tags: Dict[str, str], tag: str,
+                               tag_schema: str = "") -> Dict[str, bool]:
+        """Asynchronous variant of apply_tags"""
+        if not column_tags:
+            return {}
+        cursor = self.cursor()
+        try:
+            qualified_tag = self._ensure_tag(cursor, schema, tag, tag_schema)
+        finally:
+            cursor.close()
+        try:
+            await self._run_async(self._tag_columns_sql(schema, table, column_tags, qualified_tag))
+            return {column: True for column in column_tags}
+        except Exception as e:
+            logger.warning(f"Batched tag application failed for {schema}.{table}, retrying per column: {e}")
+        
+        outcomes = await asyncio.gather(*(
+            self._run_async(self._tag_columns_sql(schema, table, {column: tag_value}, qualified_tag))
+            for column, tag_value in column_tags.items()
+        ), return_exceptions=True)
+        return {column: not isinstance(outcome, Exception) for column, outcome in zip(column_tags, outcomes)}
+    
+    def plan_tags(self, schema: str, table: str, column_tags: Dict[str, str], tag: str,
+                  tag_schema: str = "") -> Tuple[str, str]:
+        """Build the statements that would tag the columns"""
+        qualified_tag = self._qualified_tag(schema, tag, tag_schema)
+        return (f"CREATE TAG IF NOT EXISTS {qualified_tag}",
+                self._tag_columns_sql(f"{self.config['database']}.{schema}", table, column_tags, qualified_tag))
+    
+    def execute_statements(self, statements: List[str], batch_size: int = 500) -> List[bool]:
+        """Run statements as asynchronous queries, up to batch_size at a time, waiting out one latency per batch"""
+        batch_size = max(1, batch_size)
+        succeeded = []
+        cursor = self.cursor()
+        try:
+            for start in range(0, len(statements), batch_size):
+                query_ids = []
+                for statement in statements[start:start + batch_size]:
+                    cursor.execute_async(statement)
+                    query_ids.append(cursor.sfqid)
+                if self.latency > 0:
+                    time.sleep(self.latency)
+                for query_id in query_ids:
+                    try:
+                        self.conn.get_query_status_throw_if_error(query_id)
+                        cursor.get_results_from_sfqid(query_id)
+                        succeeded.append(True)
+                    except SyntheticError as e:
+                        if self.query_ledger is not None:
+                            self.query_ledger.fail_submitted(query_id, e)
+                        logger.error(f"Statement {query_id} failed: {e}")
+                        succeeded.append(False)
+        finally:
+            cursor.close()
+        return succeeded
+    
+    def _answer(self, statement: str) -> Tuple[str, List[tuple]]:
+        """
+        Work out the kind and result rows of a SQL statement sent through a cursor, carrying out its changes
+        Raises SyntheticError for statements the warehouse would reject
+        """
+        for pattern, kind, answer in self.STATEMENT_SHAPES:
+            match = pattern.match(statement)
+            if match:
+                return kind, getattr(self, answer)(match)
+        return 'other', []
+    
+    def _current_schema(self, match: re.Match) -> List[tuple]:
+        """Answer SELECT CURRENT_SCHEMA() with the first schema"""
+        return [(next(iter(self.catalog), 'PUBLIC'),)]
+    
+    def _show_schemas(self, match: re.Match) -> List[tuple]:
+        """Answer SHOW SCHEMAS"""
+        return [(None, schema) for schema in self.catalog]
+    
+    def _show_tables(self, match: re.Match) -> List[tuple]:
+        """Answer SHOW TABLES IN SCHEMA"""
+        return [(None, table) for table in self.catalog.get(match.group(1), {})]
+    
+    def _describe_table(self, match: re.Match) -> List[tuple]:
+        """Answer DESCRIBE TABLE"""
+        schema, table = match.group(1).split('.')[-2:]
+        return [(column['name'], column['type'], 'COLUMN', column['nullable'])
+                for column in self.catalog.get(schema, {}).get(table, [])]
+    
+    def _wanted_schemas(self, schema_list: Optional[str]) -> Optional[set]:
+        """Schemas named in an UPPER(TABLE_SCHEMA) IN (...) filter, or None without one"""
+        return set(re.findall(r"'([^']*)'", schema_list)) if schema_list else None
+    
+    def _table_stats(self, match: re.Match) -> List[tuple]:
+        """Answer the INFORMATION_SCHEMA.TABLES query for every table"""
+        wanted = self._wanted_schemas(match.group(1))
+        with self._lock:
+            return [(schema, table, self.last_altered.get((schema, table), '2024-01-01 00:00:00'),
+                     int(self.config['rows']))
+                    for schema, tables in self.catalog.items() if wanted is None or schema.upper() in wanted
+                    for table in tables]
+    
+    def _single_table_stats(self, match: re.Match) -> List[tuple]:
+        """Answer the INFORMATION_SCHEMA.TABLES query for one table"""
+        schema, table = match.groups()
+        if table not in self.catalog.get(schema, {}):
+            return []
+        with self._lock:
+            return [(self.last_altered.get((schema, table), '2024-01-01 00:00:00'), int(self.config['rows']))]
+    
+    def _column_types(self, match: re.Match) -> List[tuple]:
+        """Answer the INFORMATION_SCHEMA.COLUMNS query for one table's data types"""
+        columns = self.catalog.get(match.group(1), {}).get(match.group(2), [])
+        return [(column['name'], column['type']) for column in columns]
+    
+    def _catalog_rows(self, match: re.Match) -> List[tuple]:
+        """Answer the INFORMATION_SCHEMA.COLUMNS query for the catalog"""
+        wanted = self._wanted_schemas(match.group(1))
+        return [(schema, table, column['name'], column['type'], column['nullable'])
+                for schema, tables in self.catalog.items() if wanted is None or schema.upper() in wanted
+                for table, columns in tables.items() for column in columns]
+    
+    def _sample_rows(self, match: re.Match) -> List[tuple]:
+        """Answer a sample query with rows of generated values"""
+        schema, table = match.group(2).split('.')[-2:]
+        columns = self._table_columns(schema, table, [name.strip() for name in match.group(1).split(',')], 'sample')
+        return list(zip(*(self._column_values(schema, table, column, int(match.group(3))) for column in columns)))
+    
+    def _create_tag(self, match: re.Match) -> List[tuple]:
+        """Carry out CREATE TAG IF NOT EXISTS"""
+        with self._lock:
+            self.created_tags.add(match.group(1))
+        return []
+    
+    def _set_tags(self, match: re.Match) -> List[tuple]:
+        """Carry out an ALTER TABLE setting tags, which fails as a whole if any column does not exist"""
+        schema, table = match.group(1).split('.')[-2:]
+        clauses = re.findall(r"COLUMN (\S+) SET TAG (\S+) = '([^']*)'", match.group(2))
+        self._table_columns(schema, table, [column for column, _, _ in clauses], 'tag')
+        with self._lock:
+            for column, qualified_tag, tag_value in clauses:
+                self.applied_tags[(schema, table, column)] = (qualified_tag, tag_value)
+            self.last_altered[(schema, table)] = datetime.now().isoformat(sep=' ')
+        return []
+    
+    def _tag_references(self, match: re.Match) -> List[tuple]:
+        """Answer a query on TAG_REFERENCES from the tags applied so far"""
+        statement = match.string
+        database = self.config['database']
+        tag_filter = re.search(r"UPPER\(TAG_NAME\) = '([^']*)'", statement)
+        value_filters = re.findall(r"ILIKE '%([^%']*)%'", statement)
+        with self._lock:
+            references = list(self.applied_tags.items())
+        
+        rows = []
+        for (schema, table, column), (qualified_tag, tag_value) in references:
+            tag_name = qualified_tag.split('.')[-1]
+            if tag_filter and tag_name.upper() != tag_filter.group(1):
+                continue
+            if value_filters and not any(value.upper() in tag_value.upper() for value in value_filters):
+                continue
+            rows.append((database, schema, table, column, tag_name, tag_value))
+        
+        # The queries select distinct tag names, tag name and value pairs, or whole references
+        select = match.group(1).upper()
+        if 'OBJECT_SCHEMA' in select:
+            return rows
+        if 'TAG_VALUE' in select:
+            return list(dict.fromkeys((row[4], row[5]) for row in rows))
+        return list(dict.fromkeys((row[4],) for row in rows))
+    
+    def _show_policies(self, match: re.Match) -> List[tuple]:
+        """Answer SHOW MASKING POLICIES or SHOW ROW ACCESS POLICIES"""
+        kind = match.group(1).upper()
+        with self._lock:
+            names = [name for name, body in self.policies.items() if body == kind]
+        return [(None, name.split('.')[-1]) for name in names]
+    
+    def _define_policy(self, match: re.Match) -> List[tuple]:
+        """Carry out a statement creating or altering a policy"""
+        with self._lock:
+            self.policies[match.group(2).upper()] = match.group(1).upper()
+        return []
+    
+    def _apply_policy(self, match: re.Match) -> List[tuple]:
+        """Carry out a statement setting a policy on a column or table"""
+        table, column, policy = (group.upper() if group else group for group in match.groups())
+        with self._lock:
+            self.policy_references[f"{table}.{column}" if column else table] = policy
+        return []
+    
+    def clone(self) -> 'SyntheticConnector':
+        """Create another connection to the same synthetic account"""
+        clone = SyntheticConnector.__new__(SyntheticConnector)
+        clone.__dict__.update(self.__dict__)
+        clone.conn = None
+        clone._is_clone = True
+        return clone
+    
+    def close(self) -> None:
+        """Close the simulated connection; the original connection reports the queries of all of them"""
+        if self.conn and not self._is_clone:
+            logger.info(f"Synthetic database {self.config['database']} served "
+                        f"{sum(self.query_counts.values())} queries: {dict(self.query_counts)}")
+        self.conn = None
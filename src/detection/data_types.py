@@ -0,0 +1,63 @@
+"""
+Data types module for grouping column types into the families data rules apply to.
+"""
+
+import logging
+from typing import List, Optional, FrozenSet
+
+logger = logging.getLogger(__name__)
+
+# Column types by family, as get_columns reports them without length, precision or scale
+TYPE_FAMILIES = {
+    'text': {'TEXT', 'VARCHAR', 'STRING', 'CHAR', 'CHARACTER', 'NCHAR', 'NVARCHAR', 'NVARCHAR2',
+             'CHAR VARYING', 'NCHAR VARYING'},
+    'number': {'NUMBER', 'DECIMAL', 'NUMERIC', 'INT', 'INTEGER', 'BIGINT', 'SMALLINT', 'TINYINT', 'BYTEINT', 'FIXED'},
+    'float': {'FLOAT', 'FLOAT4', 'FLOAT8', 'DOUBLE', 'DOUBLE PRECISION', 'REAL'},
+    'boolean': {'BOOLEAN'},
+    'date': {'DATE'},
+    'time': {'TIME'},
+    'timestamp': {'TIMESTAMP', 'TIMESTAMP_NTZ', 'TIMESTAMP_LTZ', 'TIMESTAMP_TZ', 'DATETIME'},
+    'binary': {'BINARY', 'VARBINARY'},
+    'semi_structured': {'VARIANT', 'OBJECT', 'ARRAY'},
+    'geospatial': {'GEOGRAPHY', 'GEOMETRY'}
+}
+
+# Families a data rule applies to when neither it nor the rule file says otherwise;
+# numbers are included because identifiers such as SSNs and card numbers are often stored as NUMBER
+DEFAULT_DATA_TYPES = ['text', 'number', 'semi_structured']
+
+FAMILY_OF_TYPE = {data_type: family for family, data_types in TYPE_FAMILIES.items() for data_type in data_types}
+
+def type_family(data_type: Optional[str]) -> Optional[str]:
+    """Family of a column type such as VARCHAR(16777216), or None if missing or unknown"""
+    if not data_type:
+        return None
+    return FAMILY_OF_TYPE.get(data_type.split('(')[0].strip().upper())
+
+def parse_data_types(data_types: List[str], pattern: str = '') -> FrozenSet[str]:
+    """
+    Resolve the data_types of a rule, given as families or column types, to families
+    Unknown entries are ignored with a warning.
+    """
+    families = set()
+    for data_type in data_types:
+        name = str(data_type).strip()
+        if name.lower() in TYPE_FAMILIES:
+            families.add(name.lower())
+        elif type_family(name):
+            families.add(type_family(name))
+        else:
+            logger.warning(f"Ignoring unknown data type '{data_type}'{f' for pattern {pattern}' if pattern else ''}")
+    return frozenset(families)
+
+def applicable_rules(rule_types: List[Optional[FrozenSet[str]]],
+                     data_type: Optional[str]) -> Optional[List[int]]:
+    """
+    Indices of the rules applying to a column type, given the families each rule applies to
+    Returns None when every rule applies, which includes columns of a missing or unknown type.
+    """
+    family = type_family(data_type)
+    if family is None:
+        return None
+    indices = [index for index, families in enumerate(rule_types) if families is None or family in families]
+    return None if len(indices) == len(rule_types) else indices
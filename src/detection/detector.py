@@ -2,56 +2,87 @@
 Detector module for finding PII and sensitive data in database columns.
 """
 
-import re
 import logging
 from typing import Dict, List, Optional, Tuple, Any
 
 from .rule_loader import RuleLoader
+from .vectorized import TableMatcher
+from .sequential import SequentialSampling
+from .pushdown import PushdownRules
+from .name_cache import NameCache
+from .executor import DetectionExecutor
 
 logger = logging.getLogger(__name__)
 
+# Ways of matching sample data against the data rules
+DETECTION_BACKENDS = ['python', 'pandas']
+
 class PIIDetector:
     """Detects PII and sensitive data based on rules loaded from configuration"""
     
-    def __init__(self, rule_loader: Optional[RuleLoader] = None):
-        """Initialize the detector with rules"""
+    def __init__(self, rule_loader: Optional[RuleLoader] = None, backend: str = 'python', sequential: bool = False,
+                 pushdown: bool = False, name_cache_size: int = 10000, processes: int = 1):
+        """
+        Initialize the detector with rules and the backend matching sample data
+        The python backend matches column by column, pandas matches all columns of a table at once.
+        With sequential, columns are sampled with growing sample sizes until their tag is settled.
+        With pushdown, the data patterns of text columns are counted in the warehouse where the connector can.
+        Up to name_cache_size column names keep their name rule decision until the rules are reloaded.
+        With more than one process, large table samples are matched in that many worker processes.
+        """
+        if backend not in DETECTION_BACKENDS:
+            raise ValueError(f"Unknown detection backend '{backend}', expected one of {DETECTION_BACKENDS}")
         self.rule_loader = rule_loader or RuleLoader()
         self.rule_loader.load_rules()
         self.threshold_percent = self.rule_loader.get_threshold('data_pattern_match', 0.05)
+        self.backend = backend
+        self.table_matcher = TableMatcher() if backend == 'pandas' else None
+        self.sequential = (SequentialSampling.from_config(self.rule_loader.get_sequential_sampling())
+                           if sequential else None)
+        if self.sequential:
+            rows_to_rule_out = self.sequential.rows_to_rule_out(self.threshold_percent)
+            if self.sequential.initial_sample_size < rows_to_rule_out:
+                logger.warning(f"Sequential sampling starts with {self.sequential.initial_sample_size} rows, but "
+                               f"columns matching no data pattern need {rows_to_rule_out} to settle")
+        self.pushdown = pushdown
+        self._pushdown_rules: Optional[PushdownRules] = None
+        self.name_cache = NameCache(name_cache_size)
+        self.executor = (DetectionExecutor(self.rule_loader, processes, backend, sequential)
+                         if processes > 1 else None)
     
     def detect_from_name(self, column_name: str) -> Optional[str]:
-        """Detect PII category based on column name"""
-        name_patterns = self.rule_loader.get_name_patterns()
+        """Detect PII category based on column name, remembering the decision for names seen again"""
+        engine = self.rule_loader.get_rule_engine()
+        generation = self.rule_loader.generation
+        category = self.name_cache.get(column_name, generation)
+        if category is not NameCache.MISSING:
+            return category
         
-        for pattern, category in name_patterns.items():
-            if re.search(pattern, column_name):
-                logger.debug(f"Column name '{column_name}' matches pattern '{pattern}'")
-                return category
-        return None
+        category = None
+        match = engine.match_name(column_name)
+        if match:
+            pattern, category = match
+            logger.debug(f"Column name '{column_name}' matches pattern '{pattern}'")
+        self.name_cache.put(column_name, generation, category)
+        return category
+    
+    def has_data_rules(self, data_type: Optional[str] = None) -> bool:
+        """Whether any data rule applies to columns of a type, so sampling them could find a tag"""
+        engine = self.rule_loader.get_rule_engine()
+        indices = engine.data_rules_for(data_type)
+        return bool(engine.data_rules) and (indices is None or bool(indices))
     
-    def detect_from_data(self, data_samples: List[Any]) -> Dict[str, int]:
+    def detect_from_data(self, data_samples: List[Any], data_type: Optional[str] = None) -> Dict[str, int]:
         """
-        Detect PII categories based on data content
+        Detect PII categories based on data content, using the data rules that apply to the column type
         Returns a dictionary of categories and their match counts
         """
-        data_patterns = self.rule_loader.get_data_patterns()
-        
-        # Convert all sample data to strings for regex matching
-        str_samples = [str(sample) for sample in data_samples if sample is not None]
-        
-        results = {}
-        for sample in str_samples:
-            for pattern, category in data_patterns.items():
-                if re.search(pattern, sample):
-                    if category in results:
-                        results[category] += 1
-                    else:
-                        results[category] = 1
-        
-        return results
+        engine = self.rule_loader.get_rule_engine()
+        return engine.count_data_matches(data_samples, engine.data_rules_for(data_type))
     
     def get_tag_for_column(self, column_name: str, sample_data: List[Any], 
-                         overrides: Optional[Dict[str, str]] = None) -> Optional[Tuple[str, str]]:
+                         overrides: Optional[Dict[str, str]] = None,
+                         data_type: Optional[str] = None) -> Optional[Tuple[str, str]]:
         """
         Determine the appropriate tag for a column
         Returns a tuple of (tag_category, tag_reason) or None if no tag applies
@@ -60,6 +91,7 @@ class PIIDetector:
             column_name: The name of the column
             sample_data: Sample data from the column
             overrides: Optional manual overrides by column name
+            data_type: Optional column type, limiting the data rules to those applying to it
         """
         # Check overrides first if provided
         if overrides and column_name.lower() in overrides:
@@ -72,14 +104,147 @@ class PIIDetector:
             return (name_tag, f"Column name pattern: {column_name}")
         
         # Check data patterns if we have sample data
+        return self.get_tag_from_data(sample_data, data_type)
+    
+    def get_tag_from_data(self, sample_data: List[Any], data_type: Optional[str] = None) -> Optional[Tuple[str, str]]:
+        """
+        Determine the tag for a column from its sample data alone
+        Returns a tuple of (tag_category, tag_reason) or None if no tag applies
+        """
         if sample_data:
-            data_tags = self.detect_from_data(sample_data)
-            # Only apply a tag if enough samples match (based on threshold)
-            if data_tags:
-                sample_size = len(sample_data)
-                for tag, count in data_tags.items():
-                    if count / sample_size >= self.threshold_percent:
-                        return (tag, f"Data pattern match: {count}/{sample_size} samples")
+            return self._tag_from_counts(self.detect_from_data(sample_data, data_type), len(sample_data))
         
         # No tag assigned
-        return None
\ No newline at end of file
+        return None
+    
+    def _tag_from_counts(self, data_tags: Dict[str, int], sample_size: int) -> Optional[Tuple[str, str]]:
+        """Pick the first category, in rule order, whose share of matching samples reaches the threshold"""
+        # Only apply a tag if enough samples match (based on threshold)
+        for tag, count in data_tags.items():
+            if count / sample_size >= self.threshold_percent:
+                return (tag, f"Data pattern match: {count}/{sample_size} samples")
+        return None
+    
+    def get_tags_from_table_sample(self, table_sample: Dict[str, List[Any]],
+                                   column_types: Optional[Dict[str, str]] = None) -> Dict[str, Tuple[str, str]]:
+        """
+        Determine the tags of several columns of a table from their sample data
+        Returns (tag_category, tag_reason) for each column a tag applies to; with column_types,
+        each column is only matched against the data rules applying to its type.
+        """
+        if self.executor is not None and self.executor.should_parallelize(table_sample):
+            return self.executor.get_tags_from_table_sample(table_sample, column_types)
+        
+        column_types = column_types or {}
+        if self.table_matcher is not None:
+            engine = self.rule_loader.get_rule_engine()
+            column_rules = [engine.data_rules_for(column_types.get(column_name)) for column_name in table_sample]
+            return self.table_matcher.decide(engine, table_sample, self.threshold_percent, column_rules)
+        
+        decisions = {}
+        for column_name, sample_data in table_sample.items():
+            tag_info = self.get_tag_from_data(sample_data, column_types.get(column_name))
+            if tag_info:
+                decisions[column_name] = tag_info
+        return decisions
+    
+    def get_pushdown_rules(self) -> PushdownRules:
+        """Get the data rules split into those the warehouse evaluates and those matched here, for the current rules"""
+        engine = self.rule_loader.get_rule_engine()
+        if self._pushdown_rules is None or self._pushdown_rules.rule_engine is not engine:
+            self._pushdown_rules = PushdownRules(engine)
+        return self._pushdown_rules
+    
+    def get_tags_from_match_counts(self, match_counts: Dict[str, Dict[str, Any]],
+                                   column_types: Optional[Dict[str, str]] = None) -> Dict[str, Tuple[str, str]]:
+        """
+        Determine the tags of several columns of a table from pattern match counts computed in the warehouse
+        Each column holds its non-null sample count, the matches of each pushed pattern and, when some
+        patterns are matched here, its sample values; decisions are the same as get_tag_from_data's.
+        """
+        column_types = column_types or {}
+        rules = self.get_pushdown_rules()
+        engine = rules.rule_engine
+        decisions = {}
+        for column_name, counts in match_counts.items():
+            if not counts['count']:
+                continue
+            rule_counts = rules.rule_counts(counts['matches'], counts.get('values') or [])
+            indices = engine.data_rules_for(column_types.get(column_name))
+            if indices is not None:
+                # Rules that do not apply to the column's type count no matches
+                applicable = set(indices)
+                rule_counts = [count if index in applicable else 0 for index, count in enumerate(rule_counts)]
+            tag_info = self._tag_from_counts(engine.category_counts(rule_counts), counts['count'])
+            if tag_info:
+                decisions[column_name] = tag_info
+        return decisions
+    
+    def settle_tag_from_data(self, sample_data: List[Any],
+                             data_type: Optional[str] = None) -> Tuple[bool, Optional[Tuple[str, str]]]:
+        """
+        Determine the tag of a column from its sample, and whether a larger sample could still change it
+        Returns (settled, tag_info); the tag is settled when the lower bound of its category's share lies
+        above the threshold and the upper bounds of categories that could take precedence lie below it.
+        """
+        trials = len(sample_data)
+        if not trials:
+            return False, None
+        
+        sequential = self.sequential or SequentialSampling()
+        engine = self.rule_loader.get_rule_engine()
+        indices = engine.data_rules_for(data_type)
+        if indices is None:
+            indices = range(len(engine.data_rules))
+        rule_counts = engine.count_rule_matches(sample_data, indices)
+        categories = {}
+        for index in indices:
+            category, count = engine.data_rules[index][2], rule_counts[index]
+            stats = categories.setdefault(category, {'first_rule': index, 'first_hit': None, 'count': 0})
+            stats['count'] += count
+            if count and stats['first_hit'] is None:
+                stats['first_hit'] = index
+        
+        # As in get_tag_from_data, the passing category whose first matching rule comes first wins
+        passing = [(stats['first_hit'], category) for category, stats in categories.items()
+                   if stats['count'] and stats['count'] / trials >= self.threshold_percent]
+        tag, first_hit = None, len(engine.data_rules)
+        if passing:
+            first_hit, tag = min(passing)
+            if sequential.interval(categories[tag]['count'], trials)[0] < self.threshold_percent:
+                return False, None
+        
+        for category, stats in categories.items():
+            if category == tag or stats['first_rule'] >= first_hit:
+                continue
+            if sequential.interval(stats['count'], trials)[1] >= self.threshold_percent:
+                return False, None
+        
+        if tag is None:
+            return True, None
+        return True, (tag, f"Data pattern match: {categories[tag]['count']}/{trials} samples")
+    
+    def get_settled_tags(self, table_sample: Dict[str, List[Any]], column_types: Optional[Dict[str, str]] = None
+                         ) -> Tuple[Dict[str, Tuple[str, str]], List[str]]:
+        """
+        Determine the tags of the columns whose sample already settles them
+        Returns the tags decided and the columns that need a larger sample
+        """
+        if self.executor is not None and self.executor.should_parallelize(table_sample):
+            return self.executor.get_settled_tags(table_sample, column_types)
+        
+        column_types = column_types or {}
+        decisions = {}
+        unsettled = []
+        for column_name, sample_data in table_sample.items():
+            settled, tag_info = self.settle_tag_from_data(sample_data, column_types.get(column_name))
+            if not settled:
+                unsettled.append(column_name)
+            elif tag_info:
+                decisions[column_name] = tag_info
+        return decisions, unsettled
+    
+    def close(self) -> None:
+        """Stop the detection worker processes, if any"""
+        if self.executor is not None:
+            self.executor.shutdown()
@@ -0,0 +1,138 @@
+"""
+Executor module for matching large table samples against the data rules in worker processes.
+"""
+
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple, Any
+
+from .rule_loader import RuleLoader
+
+logger = logging.getLogger(__name__)
+
+# Detector of each worker process, created once by the pool initializer
+_worker_detector = None
+
+def _init_worker(config: Dict[str, Any], backend: str, sequential: bool) -> None:
+    """Compile the main process's rules once per worker process"""
+    global _worker_detector
+    # Imported here, as the detector module imports this one
+    from .detector import PIIDetector
+    rule_loader = RuleLoader()
+    rule_loader.load_config(config)
+    _worker_detector = PIIDetector(rule_loader, backend, sequential, name_cache_size=0)
+
+def _current_detector(rules_hash: str, config: Dict[str, Any]) -> Any:
+    """The worker's detector, switched to the main process's rules if it reloaded different ones"""
+    if _worker_detector.rule_loader.get_rules_hash() != rules_hash:
+        _worker_detector.rule_loader.load_config(config)
+    return _worker_detector
+
+def _decide_batch(rules_hash: str, config: Dict[str, Any], table_sample: Dict[str, List[Any]],
+                  column_types: Optional[Dict[str, str]]) -> Dict[str, Tuple[str, str]]:
+    """Decide the tags of a batch of columns in a worker process"""
+    return _current_detector(rules_hash, config).get_tags_from_table_sample(table_sample, column_types)
+
+def _settle_batch(rules_hash: str, config: Dict[str, Any], table_sample: Dict[str, List[Any]],
+                  column_types: Optional[Dict[str, str]]) -> Tuple[Dict[str, Tuple[str, str]], List[str]]:
+    """Decide the settled tags of a batch of columns in a worker process"""
+    return _current_detector(rules_hash, config).get_settled_tags(table_sample, column_types)
+
+class DetectionExecutor:
+    """
+    Process pool matching the samples of a table's columns against the data rules in parallel
+    Columns are shipped in batches, one per process, to workers that compiled the main process's rules at start;
+    results come back in column order. Sampling and every other query stay in the calling process.
+    """
+    
+    # Table samples with fewer values are matched in the calling process, where no pickling is needed
+    MIN_PARALLEL_VALUES = 20000
+    
+    def __init__(self, rule_loader: RuleLoader, processes: int, backend: str = 'python', sequential: bool = False):
+        """Initialize with the rules the workers use, the number of worker processes and the detector settings"""
+        if processes < 2:
+            raise ValueError(f"A detection executor needs at least 2 processes, got {processes}")
+        self.rule_loader = rule_loader
+        self.processes = processes
+        self.backend = backend
+        self.sequential = sequential
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+    
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """Start the worker processes on first use"""
+        with self._lock:
+            if self._pool is None:
+                # Spawned workers do not inherit the locks of the scanning threads, as forked ones would
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.processes,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_worker,
+                    initargs=(self.rule_loader.config, self.backend, self.sequential)
+                )
+                logger.info(f"Started {self.processes} detection processes")
+            return self._pool
+    
+    def should_parallelize(self, table_sample: Dict[str, List[Any]]) -> bool:
+        """Whether a table sample has enough columns and values to be worth shipping to the workers"""
+        return (len(table_sample) > 1
+                and sum(len(values) for values in table_sample.values()) >= self.MIN_PARALLEL_VALUES)
+    
+    def _batches(self, table_sample: Dict[str, List[Any]]) -> List[Dict[str, List[Any]]]:
+        """Split a table sample into consecutive batches of columns, up to one per process, of similar total size"""
+        target = sum(len(values) for values in table_sample.values()) / self.processes
+        batches = []
+        batch = {}
+        size = 0
+        for column_name, values in table_sample.items():
+            batch[column_name] = values
+            size += len(values)
+            if size >= target and len(batches) < self.processes - 1:
+                batches.append(batch)
+                batch = {}
+                size = 0
+        if batch:
+            batches.append(batch)
+        return batches
+    
+    def _map(self, function: Any, table_sample: Dict[str, List[Any]],
+             column_types: Optional[Dict[str, str]]) -> List[Any]:
+        """Run a batch function over the batches of a table sample, returning results in batch order"""
+        # The rule configuration travels with each batch, so workers follow reloads without reading the file
+        rules_hash = self.rule_loader.get_rules_hash()
+        config = self.rule_loader.config
+        batches = self._batches(table_sample)
+        futures = [
+            self._get_pool().submit(function, rules_hash, config, batch,
+                                    {name: column_types[name] for name in batch if name in column_types}
+                                    if column_types else None)
+            for batch in batches
+        ]
+        return [future.result() for future in futures]
+    
+    def get_tags_from_table_sample(self, table_sample: Dict[str, List[Any]],
+                                   column_types: Optional[Dict[str, str]] = None) -> Dict[str, Tuple[str, str]]:
+        """Decide the tags of a table's sampled columns in the worker processes"""
+        decisions = {}
+        for batch_decisions in self._map(_decide_batch, table_sample, column_types):
+            decisions.update(batch_decisions)
+        return decisions
+    
+    def get_settled_tags(self, table_sample: Dict[str, List[Any]], column_types: Optional[Dict[str, str]] = None
+                         ) -> Tuple[Dict[str, Tuple[str, str]], List[str]]:
+        """Decide the settled tags of a table's sampled columns in the worker processes"""
+        decisions = {}
+        unsettled = []
+        for batch_decisions, batch_unsettled in self._map(_settle_batch, table_sample, column_types):
+            decisions.update(batch_decisions)
+            unsettled.extend(batch_unsettled)
+        return decisions, unsettled
+    
+    def shutdown(self) -> None:
+        """Stop the worker processes"""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
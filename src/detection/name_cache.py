@@ -0,0 +1,69 @@
+"""
+Name cache module for remembering the category decided for each column name.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Any
+
+logger = logging.getLogger(__name__)
+
+class NameCache:
+    """
+    Bounded least-recently-used memo of column name -> name rule category, or None for no match
+    Entries belong to one generation of the rules, and looking up a newer generation empties the cache.
+    Thread-safe, as a detector is shared by the worker threads of a run.
+    """
+    
+    # Returned by get() for names not cached, since None is a cached decision
+    MISSING = object()
+    
+    def __init__(self, max_size: int = 10000):
+        """Initialize with the number of names kept; 0 disables the cache"""
+        if max_size < 0:
+            raise ValueError(f"max_size must not be negative, got {max_size}")
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries: 'OrderedDict[str, Optional[str]]' = OrderedDict()
+        self._generation: Any = None
+        self._lock = threading.Lock()
+    
+    def get(self, column_name: str, generation: Any) -> Any:
+        """Get the cached category of a column name under a generation of the rules, or MISSING"""
+        with self._lock:
+            if generation != self._generation:
+                if self._entries:
+                    self.invalidations += 1
+                    logger.debug(f"Rules changed, dropping {len(self._entries)} cached column name decisions")
+                self._entries.clear()
+                self._generation = generation
+            if column_name in self._entries:
+                self._entries.move_to_end(column_name)
+                self.hits += 1
+                return self._entries[column_name]
+            self.misses += 1
+            return self.MISSING
+    
+    def put(self, column_name: str, generation: Any, category: Optional[str]) -> None:
+        """Cache the category of a column name, evicting the least recently used name when full"""
+        with self._lock:
+            if not self.max_size or generation != self._generation:
+                return
+            self._entries[column_name] = category
+            self._entries.move_to_end(column_name)
+            if len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+    
+    def info(self) -> Dict[str, int]:
+        """Get the hit and miss counts, invalidations and current and maximum size"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations,
+                'size': len(self._entries),
+                'max_size': self.max_size
+            }
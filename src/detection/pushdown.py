@@ -0,0 +1,330 @@
+"""
+Pushdown module for translating data patterns into Snowflake regular expressions evaluated in the warehouse.
+"""
+
+import re
+import logging
+from typing import List, Optional, Tuple, Any
+
+from .rule_engine import RuleEngine
+from .data_types import type_family
+
+logger = logging.getLogger(__name__)
+
+# Leading inline flags the translation can honour
+LEADING_FLAGS = re.compile(r'^\(\?([a-zA-Z]+)\)')
+SUPPORTED_FLAGS = set('ias')
+
+# Python quantifier braces; anything else starting with { is a literal brace
+QUANTIFIER_BRACES = re.compile(r'\{(\d*)(,?)(\d*)\}')
+
+# Characters with a meaning of their own in POSIX extended regular expressions
+ERE_SPECIALS = set('.[]()*+?{}|^$\\')
+
+# Escapes of control characters, written into the expression as the characters themselves
+CONTROL_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', 'f': '\f', 'v': '\v'}
+
+# Characters a word boundary tells apart, and those a bracket expression is checked against
+WORD_CHARACTER = re.compile(r'\w')
+ASCII = [chr(code) for code in range(128)]
+
+# Class escapes inside brackets, as POSIX character classes
+BRACKET_CLASSES = {'d': '[:digit:]', 's': '[:space:]', 'w': '[:alnum:]_'}
+
+def _kind(char: str) -> str:
+    """Whether a character is a word character, as \\b tells them apart"""
+    return 'word' if WORD_CHARACTER.match(char) else 'other'
+
+def is_text_type(data_type: Optional[str]) -> bool:
+    """Whether a column type, as returned by get_columns, holds text"""
+    return type_family(data_type) == 'text'
+
+class UnsupportedPattern(Exception):
+    """Raised for pattern constructs the Snowflake regex dialect cannot express the same way"""
+
+class _Item:
+    """
+    One translated element of a sequence
+    Its first and last characters are 'word' or 'other' when every match of it starts or ends with
+    such a character, and None when unknown or when it can match nothing.
+    """
+    
+    def __init__(self, text: str, first: Optional[str] = None, last: Optional[str] = None, boundary: bool = False,
+                 base: Optional['_Item'] = None, minimum: int = 1, maximum: Optional[int] = 1):
+        """Initialize with the translated text, its first and last characters and the item it repeats, if any"""
+        self.text = text
+        self.first = first
+        self.last = last
+        self.boundary = boundary
+        self.base = base
+        self.minimum = minimum
+        self.maximum = maximum
+    
+    def once(self) -> '_Item':
+        """The repeated item matching at least once: its base followed by the remaining repetitions"""
+        base = self.base
+        if self.maximum == 1:
+            text = base.text
+        elif self.maximum is None:
+            text = base.text + base.text + '*'
+        else:
+            text = base.text + base.text + '{0,' + str(self.maximum - 1) + '}'
+        return _Item(text, base.first, base.last)
+
+class _Translator:
+    """
+    Recursive-descent translation of a Python regular expression into a POSIX extended one
+    Only constructs whose meaning is the same in both dialects are accepted; anything else raises UnsupportedPattern.
+    """
+    
+    def __init__(self, pattern: str, dotall: bool):
+        """Initialize with the pattern, without its leading flags, and whether . matches newlines"""
+        self.pattern = pattern
+        self.position = 0
+        self.dotall = dotall
+    
+    def translate(self) -> str:
+        """Translate the whole pattern"""
+        alternatives = self._alternatives()
+        if self.position < len(self.pattern):
+            raise UnsupportedPattern(f"unbalanced ')' at position {self.position}")
+        return '|'.join(self._render(variant) for items in alternatives for variant in self._resolve(items))
+    
+    def _peek(self) -> str:
+        """Next character, or an empty string at the end"""
+        return self.pattern[self.position] if self.position < len(self.pattern) else ''
+    
+    def _alternatives(self) -> List[List[_Item]]:
+        """Parse alternatives separated by | up to a closing parenthesis or the end"""
+        alternatives = [[]]
+        while self.position < len(self.pattern) and self._peek() != ')':
+            if self._peek() == '|':
+                self.position += 1
+                alternatives.append([])
+                continue
+            alternatives[-1].append(self._quantified(self._atom()))
+        return alternatives
+    
+    def _render(self, items: List[_Item]) -> str:
+        """Render a sequence free of word boundaries"""
+        if any(item.boundary for item in items):
+            raise UnsupportedPattern("word boundary inside a group or between two elements")
+        return ''.join(item.text for item in items)
+    
+    def _resolve(self, items: List[_Item]) -> List[List[_Item]]:
+        """
+        Replace word boundaries at either end of a top-level alternative by the character they imply
+        Returns the alternatives the sequence becomes; a boundary next to an optional element is
+        resolved separately for the element being present and absent.
+        """
+        if items and items[0].boundary:
+            return [resolved for variant in self._after_boundary(items[1:]) for resolved in self._resolve(variant)]
+        if items and items[-1].boundary:
+            return self._before_boundary(items[:-1])
+        return [items]
+    
+    def _after_boundary(self, items: List[_Item]) -> List[List[_Item]]:
+        """Sequences matching where items follow a word boundary"""
+        first = items[0] if items else None
+        if first is not None and first.first == 'word':
+            return [[_Item('(^|\\W)')] + items]
+        if first is not None and first.first == 'other':
+            return [[_Item('\\w')] + items]
+        if first is not None and first.base is not None and first.minimum == 0:
+            return self._after_boundary([first.once()] + items[1:]) + self._after_boundary(items[1:])
+        raise UnsupportedPattern("word boundary not followed by a known kind of character")
+    
+    def _before_boundary(self, items: List[_Item]) -> List[List[_Item]]:
+        """Sequences matching where items precede a word boundary"""
+        last = items[-1] if items else None
+        if last is not None and last.last == 'word':
+            return [items + [_Item('(\\W|$)')]]
+        if last is not None and last.last == 'other':
+            return [items + [_Item('\\w')]]
+        if last is not None and last.base is not None and last.minimum == 0:
+            return self._before_boundary(items[:-1] + [last.once()]) + self._before_boundary(items[:-1])
+        raise UnsupportedPattern("word boundary not preceded by a known kind of character")
+    
+    def _atom(self) -> _Item:
+        """Parse one atom"""
+        char = self._peek()
+        self.position += 1
+        if char == '(':
+            return self._group()
+        if char == '[':
+            return self._bracket()
+        if char == '\\':
+            return self._escape()
+        if char == '.':
+            return _Item('.' if self.dotall else '[^\n]')
+        if char == '^':
+            return _Item('^', minimum=0)
+        if char == '$':
+            # Python's $ also matches before a trailing newline
+            return _Item('\n?$', minimum=0)
+        if char in '*+?':
+            raise UnsupportedPattern(f"nothing to repeat at position {self.position - 1}")
+        if char in ERE_SPECIALS:
+            return _Item('\\' + char, 'other', 'other')
+        kind = _kind(char)
+        return _Item(char, kind, kind)
+    
+    def _group(self) -> _Item:
+        """Parse a group after its opening parenthesis"""
+        if self.pattern.startswith('?:', self.position):
+            self.position += 2
+        elif self._peek() == '?':
+            raise UnsupportedPattern(f"group construct '(?{self.pattern[self.position + 1:self.position + 2]}' "
+                                     f"at position {self.position - 1}")
+        alternatives = self._alternatives()
+        if self._peek() != ')':
+            raise UnsupportedPattern("missing ')'")
+        self.position += 1
+        text = '(' + '|'.join(self._render(items) for items in alternatives) + ')'
+        firsts = {items[0].first if items else None for items in alternatives}
+        lasts = {items[-1].last if items else None for items in alternatives}
+        return _Item(text, firsts.pop() if len(firsts) == 1 else None, lasts.pop() if len(lasts) == 1 else None)
+    
+    def _bracket(self) -> _Item:
+        """Parse a bracket expression after its opening bracket"""
+        start = self.position - 1
+        negated = self._peek() == '^'
+        if negated:
+            self.position += 1
+        parts = []
+        while True:
+            char = self._peek()
+            if not char:
+                raise UnsupportedPattern("missing ']'")
+            self.position += 1
+            if char == ']' and parts:
+                break
+            if char in '[]':
+                # A leading ] and [ before : . or = mean something else in POSIX brackets
+                raise UnsupportedPattern(f"'{char}' inside brackets")
+            if char == '\\':
+                escaped = self._peek()
+                self.position += 1
+                if escaped in BRACKET_CLASSES:
+                    parts.append(BRACKET_CLASSES[escaped])
+                    continue
+                if escaped in CONTROL_ESCAPES:
+                    char = CONTROL_ESCAPES[escaped]
+                elif escaped and not escaped.isalnum() and escaped not in '\\]^-[':
+                    char = escaped
+                else:
+                    raise UnsupportedPattern(f"escape '\\{escaped}' inside brackets")
+            parts.append(char)
+        
+        # Beyond ASCII a bracket without non-ASCII characters of its own only matches through \d, \w and \s,
+        # which agree with its ASCII matches on the kind of character, so those tell its kind
+        source = self.pattern[start:self.position]
+        kind = None
+        if not negated and source.isascii():
+            compiled = re.compile(source)
+            kinds = {_kind(char) for char in ASCII if compiled.match(char)}
+            kind = kinds.pop() if len(kinds) == 1 else None
+        return _Item('[' + ('^' if negated else '') + ''.join(parts) + ']', kind, kind)
+    
+    def _escape(self) -> _Item:
+        """Parse an escape after its backslash"""
+        char = self._peek()
+        self.position += 1
+        if char in 'dw':
+            return _Item('\\' + char, 'word', 'word')
+        if char in 'Ws':
+            return _Item('\\' + char, 'other', 'other')
+        if char in 'DS':
+            return _Item('\\' + char)
+        if char == 'b':
+            return _Item('', boundary=True, minimum=0)
+        if char in CONTROL_ESCAPES:
+            return _Item(CONTROL_ESCAPES[char], 'other', 'other')
+        if char in ERE_SPECIALS:
+            return _Item('\\' + char, 'other', 'other')
+        if char and not char.isalnum():
+            kind = _kind(char)
+            return _Item(char, kind, kind)
+        raise UnsupportedPattern(f"escape '\\{char}'")
+    
+    def _quantified(self, item: _Item) -> _Item:
+        """Apply a quantifier following an item, if any"""
+        char = self._peek()
+        if char and char in '*+?':
+            self.position += 1
+            suffix = char
+            minimum, maximum = {'*': (0, None), '+': (1, None), '?': (0, 1)}[char]
+        elif char == '{':
+            match = QUANTIFIER_BRACES.match(self.pattern, self.position)
+            if not match or not (match.group(1) or match.group(2)):
+                return item
+            self.position = match.end()
+            low, comma, high = match.group(1) or '0', match.group(2), match.group(3)
+            suffix = '{' + low + comma + high + '}'
+            minimum = int(low)
+            maximum = int(high) if high else (None if comma else minimum)
+        else:
+            return item
+        
+        if item.boundary or item.text in ('^', '\n?$'):
+            raise UnsupportedPattern("quantified anchor")
+        if self._peek() == '+':
+            raise UnsupportedPattern("possessive quantifier")
+        if self._peek() == '?':
+            # Laziness changes which match is found, not whether there is one
+            self.position += 1
+        if minimum > 0:
+            return _Item(item.text + suffix, item.first, item.last, base=item, minimum=minimum, maximum=maximum)
+        return _Item(item.text + suffix, base=item, minimum=minimum, maximum=maximum)
+
+def translate_pattern(pattern: str) -> Tuple[str, str]:
+    """
+    Translate a data pattern into a Snowflake regular expression and REGEXP_LIKE parameters
+    REGEXP_LIKE matches the whole value, so the expression is wrapped to find the pattern anywhere in it,
+    as re.search does. Raises UnsupportedPattern for patterns that cannot be translated faithfully.
+    """
+    flags = ''
+    match = LEADING_FLAGS.match(pattern)
+    if match:
+        flags = match.group(1)
+        unsupported = set(flags) - SUPPORTED_FLAGS
+        if unsupported:
+            raise UnsupportedPattern(f"inline flags '{''.join(sorted(unsupported))}'")
+        pattern = pattern[match.end():]
+    
+    body = _Translator(pattern, 's' in flags).translate()
+    parameters = 's' + ('i' if 'i' in flags else '')
+    return f".*({body}).*", parameters
+
+class PushdownRules:
+    """
+    The data rules split into those evaluated in the warehouse and those still matched client-side
+    Pushed rules are (rule index, Python pattern, Snowflake pattern, REGEXP_LIKE parameters), in rule order.
+    """
+    
+    def __init__(self, rule_engine: RuleEngine):
+        """Translate every data rule of the engine, keeping those that cannot be translated for the client"""
+        self.rule_engine = rule_engine
+        self.pushed: List[Tuple[int, str, str, str]] = []
+        self.client: List[int] = []
+        for index, (pattern, _, category) in enumerate(rule_engine.data_rules):
+            try:
+                self.pushed.append((index, pattern, *translate_pattern(pattern)))
+            except UnsupportedPattern as e:
+                logger.warning(f"Data pattern '{pattern}' for {category} is matched client-side: {e}")
+                self.client.append(index)
+        logger.info(f"Pushing down {len(self.pushed)} of {len(rule_engine.data_rules)} data patterns")
+    
+    def patterns(self) -> List[Tuple[str, str, str]]:
+        """The pushed patterns as (Python pattern, Snowflake pattern, parameters) for the connector"""
+        return [(source, translated, parameters) for _, source, translated, parameters in self.pushed]
+    
+    def rule_counts(self, pushed_counts: List[int], values: List[Any]) -> List[int]:
+        """Combine the warehouse counts of the pushed rules with client-side counts of the rest, in rule order"""
+        if self.client:
+            counts = self.rule_engine.count_rule_matches(values, self.client)
+        else:
+            counts = [0] * len(self.rule_engine.data_rules)
+        for (index, _, _, _), count in zip(self.pushed, pushed_counts):
+            counts[index] = count
+        return counts
@@ -0,0 +1,135 @@
+"""
+Rule engine module for matching column names and data values against precompiled patterns.
+"""
+
+import re
+import logging
+from collections import Counter
+from typing import Dict, List, Optional, Tuple, Any, Pattern, FrozenSet
+
+from .data_types import applicable_rules
+
+logger = logging.getLogger(__name__)
+
+# Global inline flags at the start of a pattern, which are only valid there
+LEADING_FLAGS = re.compile(r'^\(\?([aiLmsux]+)\)')
+
+# Constructs that depend on group numbers or names, which change once patterns are combined
+GROUP_REFERENCES = re.compile(r'\\[1-9]|\(\?P[<=]|\(\?<[A-Za-z_]|\(\?\(')
+
+def _scoped(pattern: str) -> Optional[str]:
+    """
+    Rewrite a pattern so it can be embedded in a larger one
+    Leading global flags become a scoped group; returns None if the pattern cannot be embedded.
+    """
+    if GROUP_REFERENCES.search(pattern):
+        return None
+    match = LEADING_FLAGS.match(pattern)
+    if not match:
+        return pattern
+    flags = match.group(1)
+    # Verbose patterns can comment out the closing parenthesis of the scoped group
+    if 'x' in flags:
+        return None
+    return f"(?{flags}:{pattern[match.end():]})"
+
+class RuleEngine:
+    """
+    Name and data patterns compiled once, evaluated in rule priority order
+    Name rules are combined into one regex whose first matching alternative identifies the rule;
+    patterns that cannot be combined make the engine check the rules one at a time instead.
+    """
+    
+    def __init__(self, name_patterns: Dict[str, str], data_patterns: Dict[str, str],
+                 name_flags: int = 0, data_flags: int = 0, data_types: Optional[Dict[str, FrozenSet[str]]] = None):
+        """
+        Compile the rules, given as pattern -> category in priority order, with the flags to apply
+        data_types maps data patterns to the type families they apply to; other patterns apply to every column.
+        """
+        self.name_rules = self._compile_rules(name_patterns, name_flags)
+        self.data_rules = self._compile_rules(data_patterns, data_flags)
+        self.data_rule_types = [(data_types or {}).get(pattern) for pattern, _, _ in self.data_rules]
+        self.name_matcher = self._combine_name_rules(self.name_rules, name_flags)
+        logger.debug(f"Compiled {len(self.name_rules)} name rules and {len(self.data_rules)} data rules"
+                     f"{'' if self.name_matcher is not None else ', name rules are matched one at a time'}")
+    
+    def _compile_rules(self, patterns: Dict[str, str], flags: int) -> List[Tuple[str, Pattern, str]]:
+        """Compile each pattern, skipping invalid ones, as (pattern, compiled pattern, category)"""
+        rules = []
+        for pattern, category in patterns.items():
+            try:
+                rules.append((pattern, re.compile(pattern, flags), category))
+            except re.error as e:
+                logger.error(f"Skipping invalid pattern '{pattern}' for {category}: {e}")
+        return rules
+    
+    def _combine_name_rules(self, rules: List[Tuple[str, Pattern, str]], flags: int) -> Optional[Pattern]:
+        """
+        Build one regex testing every rule from the start of the name, in priority order
+        Each alternative looks ahead for its rule anywhere in the name, like re.search would,
+        inside a group named after the rule's position.
+        """
+        if not rules:
+            return None
+        alternatives = []
+        for index, (pattern, _, _) in enumerate(rules):
+            scoped = _scoped(pattern)
+            if scoped is None:
+                return None
+            alternatives.append(f"(?=(?s:.*?)(?P<rule{index}>{scoped}))")
+        try:
+            return re.compile(f"(?:{'|'.join(alternatives)})", flags)
+        except re.error as e:
+            logger.warning(f"Could not combine name rules, matching them one at a time: {e}")
+            return None
+    
+    def match_name(self, column_name: str) -> Optional[Tuple[str, str]]:
+        """Find the highest priority name rule matching a column name, as (pattern, category)"""
+        if self.name_matcher is not None:
+            match = self.name_matcher.match(column_name)
+            if match is None:
+                return None
+            pattern, _, category = self.name_rules[int(match.lastgroup[4:])]
+            return pattern, category
+        
+        for pattern, compiled, category in self.name_rules:
+            if compiled.search(column_name):
+                return pattern, category
+        return None
+    
+    def count_rule_matches(self, values: List[Any], indices: Optional[List[int]] = None) -> List[int]:
+        """
+        Count the non-null values each data rule matches, in rule order
+        The values are converted to text in one pass, and each distinct text is matched against
+        every rule once however often it was sampled, so repeated values cost no regex work.
+        With indices, only those rules are matched and the others count zero.
+        """
+        counts = [0] * len(self.data_rules)
+        if indices is None:
+            indices = range(len(self.data_rules))
+        rules = [(index, self.data_rules[index][1]) for index in indices]
+        texts = Counter(value if isinstance(value, str) else str(value) for value in values if value is not None)
+        for text, occurrences in texts.items():
+            for index, compiled in rules:
+                if compiled.search(text):
+                    counts[index] += occurrences
+        return counts
+    
+    def data_rules_for(self, data_type: Optional[str]) -> Optional[List[int]]:
+        """Indices of the data rules applying to a column type, or None when all of them do"""
+        return applicable_rules(self.data_rule_types, data_type)
+    
+    def count_data_matches(self, values: List[Any], indices: Optional[List[int]] = None) -> Dict[str, int]:
+        """
+        Count the data rules matching each non-null value, per category
+        A value matching several rules of a category counts once for each of them.
+        """
+        return self.category_counts(self.count_rule_matches(values, indices))
+    
+    def category_counts(self, rule_counts: List[int]) -> Dict[str, int]:
+        """Sum per-rule match counts by category, in the order of each category's first matching rule"""
+        results = {}
+        for (_, _, category), count in zip(self.data_rules, rule_counts):
+            if count:
+                results[category] = results.get(category, 0) + count
+        return results
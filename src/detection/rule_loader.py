@@ -4,10 +4,15 @@ Support for category IDs to improve maintainability.
 """
 
 import os
+import json
 import yaml
+import hashlib
 import logging
 from typing import Dict, List, Any, Optional
 
+from .rule_engine import RuleEngine
+from .data_types import DEFAULT_DATA_TYPES, parse_data_types
+
 logger = logging.getLogger(__name__)
 
 class RuleLoader:
@@ -18,20 +23,39 @@ class RuleLoader:
         self.config_path = config_path or os.path.join('config', 'tag_rules.yaml')
         self.name_patterns = {}
         self.data_patterns = {}
+        self.data_pattern_types = {}  # Maps data patterns to the type families they apply to
         self.categories = []
         self.category_map = {}  # Maps category_id to category name
         self.thresholds = {}
+        self.sequential_sampling = {}
         self.tag_configuration = {
             'tag_name': 'PII',  # Default value
             'tag_schema': ''
         }
+        self.rules_hash = ''
+        self.config = {}  # Rule configuration as parsed from the file
+        self.rule_engine = None
         self.loaded = False
+        # Incremented whenever the rules may have changed, so caches of their decisions can be dropped
+        self.generation = 0
     
     def load_rules(self) -> bool:
         """Load rules from the configuration file"""
         try:
             with open(self.config_path, 'r') as f:
                 config = yaml.safe_load(f)
+        except Exception as e:
+            logger.error(f"Failed to load rules: {e}")
+            return False
+        return self.load_config(config)
+    
+    def load_config(self, config: Dict[str, Any]) -> bool:
+        """Load rules from a parsed rule configuration, such as one another loader read from its file"""
+        try:
+            # Fingerprint the rule set so results produced under other rules can be told apart
+            self.rules_hash = hashlib.sha256(
+                json.dumps(config, sort_keys=True, default=str).encode('utf-8')
+            ).hexdigest()
             
             # Load tag configuration
             if 'tag_configuration' in config:
@@ -51,7 +75,8 @@ class RuleLoader:
                 self.category_map[category_id] = category_name
                 logger.debug(f"Loaded category: {category_id} -> {category_name}")
             
-            # Load column name patterns
+            # Load column name patterns, replacing those of a previous load
+            self.name_patterns = {}
             for pattern_config in config.get('name_patterns', []):
                 pattern = pattern_config.get('pattern')
                 
@@ -67,7 +92,10 @@ class RuleLoader:
                 if pattern and category:
                     self.name_patterns[pattern] = category
             
-            # Load data content patterns
+            # Load data content patterns, with the column types each applies to
+            default_types = config.get('default_data_types') or DEFAULT_DATA_TYPES
+            self.data_patterns = {}
+            self.data_pattern_types = {}
             for pattern_config in config.get('data_patterns', []):
                 pattern = pattern_config.get('pattern')
                 
@@ -82,10 +110,20 @@ class RuleLoader:
                 
                 if pattern and category:
                     self.data_patterns[pattern] = category
+                    self.data_pattern_types[pattern] = parse_data_types(
+                        pattern_config.get('data_types') or default_types, pattern)
             
             # Load thresholds
             self.thresholds = config.get('thresholds', {})
             
+            # Load sequential sampling settings, used when sequential detection is enabled
+            self.sequential_sampling = config.get('sequential_sampling') or {}
+            
+            # Compile every pattern once, for all detectors sharing this loader
+            self.rule_engine = RuleEngine(self.name_patterns, self.data_patterns, data_types=self.data_pattern_types)
+            
+            self.config = config
+            self.generation += 1
             self.loaded = True
             logger.info(f"Loaded {len(self.name_patterns)} name patterns and {len(self.data_patterns)} data patterns")
             return True
@@ -105,6 +143,15 @@ class RuleLoader:
             self.load_rules()
         return self.data_patterns
     
+    def get_rule_engine(self) -> RuleEngine:
+        """Get the compiled name and data rules"""
+        if not self.loaded:
+            self.load_rules()
+        if self.rule_engine is None:
+            # Rules failed to load; match nothing rather than fail every column
+            self.rule_engine = RuleEngine(self.name_patterns, self.data_patterns, data_types=self.data_pattern_types)
+        return self.rule_engine
+    
     def get_categories(self) -> List[str]:
         """Get the list of tag categories"""
         if not self.loaded:
@@ -117,6 +164,12 @@ class RuleLoader:
             self.load_rules()
         return self.thresholds.get(threshold_name, default_value)
     
+    def get_sequential_sampling(self) -> Dict[str, Any]:
+        """Get the sequential sampling settings"""
+        if not self.loaded:
+            self.load_rules()
+        return self.sequential_sampling
+    
     def get_tag_name(self) -> str:
         """Get the configured tag name"""
         if not self.loaded:
@@ -129,6 +182,12 @@ class RuleLoader:
             self.load_rules()
         return self.tag_configuration.get('tag_schema', '')
     
+    def get_rules_hash(self) -> str:
+        """Get a hash of the loaded rule configuration"""
+        if not self.loaded:
+            self.load_rules()
+        return self.rules_hash
+    
     def reload(self) -> bool:
         """Force reload of the rules"""
         self.loaded = False
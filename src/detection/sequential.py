@@ -0,0 +1,73 @@
+"""
+Sequential sampling module for deciding columns from the smallest sample that settles them.
+"""
+
+import math
+import logging
+from statistics import NormalDist
+from typing import Dict, List, Tuple, Any
+
+logger = logging.getLogger(__name__)
+
+class SequentialSampling:
+    """
+    Growing sample sizes and the confidence a column's decision must reach at each of them
+    Samples start at initial_sample_size and grow by growth_factor up to the run's sample size;
+    a column stops as soon as one-sided Wilson score bounds settle its decision.
+    """
+    
+    DEFAULTS = {'initial_sample_size': 60, 'growth_factor': 5.0, 'confidence': 0.95}
+    
+    def __init__(self, initial_sample_size: int = 60, growth_factor: float = 5.0, confidence: float = 0.95):
+        """Initialize with the first sample size, how fast samples grow and the confidence level of each bound"""
+        if initial_sample_size < 1:
+            raise ValueError(f"initial_sample_size must be at least 1, got {initial_sample_size}")
+        if growth_factor <= 1:
+            raise ValueError(f"growth_factor must be greater than 1, got {growth_factor}")
+        if not 0 < confidence < 1:
+            raise ValueError(f"confidence must be between 0 and 1, got {confidence}")
+        self.initial_sample_size = int(initial_sample_size)
+        self.growth_factor = float(growth_factor)
+        self.confidence = float(confidence)
+        # Each bound is a one-sided test, as a decision only asks whether a share lies above or below the threshold
+        self.z = NormalDist().inv_cdf(confidence)
+    
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'SequentialSampling':
+        """Create the settings from the sequential_sampling section of the tag rules, ignoring unknown keys"""
+        unknown = set(config) - set(cls.DEFAULTS)
+        if unknown:
+            logger.warning(f"Ignoring unknown sequential_sampling settings: {', '.join(sorted(unknown))}")
+        return cls(**{key: config.get(key, default) for key, default in cls.DEFAULTS.items()})
+    
+    def sample_sizes(self, maximum: int) -> List[int]:
+        """Sample sizes to try in turn, ending with the maximum"""
+        sizes = []
+        size = self.initial_sample_size
+        while size < maximum:
+            sizes.append(size)
+            size = self.next_sample_size(size)
+        sizes.append(maximum)
+        return sizes
+    
+    def next_sample_size(self, size: int) -> int:
+        """Sample size of the round after one of the given size"""
+        return max(size + 1, math.ceil(size * self.growth_factor))
+    
+    def rows_to_rule_out(self, threshold: float) -> int:
+        """Smallest sample in which no matches put the upper bound of a share below the threshold"""
+        return math.floor(self.z * self.z * (1 - threshold) / threshold) + 1
+    
+    def interval(self, successes: int, trials: int) -> Tuple[float, float]:
+        """
+        Lower and upper one-sided Wilson score bounds of a proportion
+        They stay inside [0, 1] for small samples and extreme counts.
+        """
+        if trials <= 0:
+            return 0.0, 1.0
+        z = self.z
+        proportion = successes / trials
+        denominator = 1 + z * z / trials
+        center = (proportion + z * z / (2 * trials)) / denominator
+        margin = z * math.sqrt(proportion * (1 - proportion) / trials + z * z / (4 * trials * trials)) / denominator
+        return max(0.0, center - margin), min(1.0, center + margin)
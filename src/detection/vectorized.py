@@ -0,0 +1,100 @@
+"""
+Vectorized detection module for matching the samples of every column of a table at once with pandas.
+"""
+
+import logging
+from typing import Dict, List, Optional, Tuple, Any
+
+from .rule_engine import RuleEngine
+
+logger = logging.getLogger(__name__)
+
+class TableMatcher:
+    """
+    Matches the samples of all columns of a table against the data rules in bulk
+    The distinct sample texts of the whole table are matched once per rule, and the per-column
+    counts, match ratios and decisions are computed with array operations.
+    """
+    
+    def __init__(self):
+        """Import pandas and numpy, which only this backend needs"""
+        # Import here to make the dependency optional
+        try:
+            import numpy
+            import pandas
+            self.np = numpy
+            self.pd = pandas
+        except ImportError:
+            raise ImportError("Required package 'pandas' not installed. Please install it with pip "
+                              "or use the python detection backend.")
+    
+    def count_rule_matches(self, rule_engine: RuleEngine, table_sample: Dict[str, List[Any]]) -> Any:
+        """
+        Count the non-null values of each column each data rule matches
+        Returns an array with a row per column, in sample order, and a count per data rule
+        """
+        np, pd = self.np, self.pd
+        texts = []
+        lengths = []
+        for values in table_sample.values():
+            column_texts = [value if isinstance(value, str) else str(value) for value in values if value is not None]
+            texts.extend(column_texts)
+            lengths.append(len(column_texts))
+        
+        column_ids = np.repeat(np.arange(len(table_sample)), lengths)
+        counts = np.zeros((len(table_sample), len(rule_engine.data_rules)), dtype=np.int64)
+        if not texts:
+            return counts
+        
+        codes, uniques = pd.factorize(np.asarray(texts, dtype=object))
+        for index, (_, compiled, _) in enumerate(rule_engine.data_rules):
+            # Python's re keeps the rules' semantics; mapping it over the texts runs without a Python frame per text
+            hits = np.fromiter(map(bool, map(compiled.search, uniques)), dtype=bool, count=len(uniques))
+            counts[:, index] = np.bincount(column_ids, weights=hits[codes], minlength=len(table_sample))
+        return counts
+    
+    def decide(self, rule_engine: RuleEngine, table_sample: Dict[str, List[Any]], threshold: float,
+               column_rules: Optional[List[Optional[List[int]]]] = None) -> Dict[str, Tuple[str, str]]:
+        """
+        Decide the tag of every sampled column from the share of its samples each category matches
+        A column gets the passing category whose first matching rule comes first, as with per-column detection.
+        column_rules holds, per column in sample order, the indices of the rules applying to it, or None for all.
+        """
+        np = self.np
+        columns = list(table_sample)
+        if not columns or not rule_engine.data_rules:
+            return {}
+        
+        rule_counts = self.count_rule_matches(rule_engine, table_sample)
+        for row, indices in enumerate(column_rules or []):
+            if indices is not None:
+                applicable = np.zeros(len(rule_engine.data_rules), dtype=bool)
+                applicable[indices] = True
+                rule_counts[row, ~applicable] = 0
+        sizes = np.array([len(values) for values in table_sample.values()], dtype=np.float64)
+        
+        # Categories in rule order, with the rules belonging to each
+        categories = list(dict.fromkeys(category for _, _, category in rule_engine.data_rules))
+        rule_categories = np.array([categories.index(category) for _, _, category in rule_engine.data_rules])
+        
+        no_rule = len(rule_engine.data_rules)
+        first_hit = np.where(rule_counts > 0, np.arange(no_rule), no_rule)
+        category_counts = np.zeros((len(columns), len(categories)), dtype=np.int64)
+        category_first_hit = np.full((len(columns), len(categories)), no_rule)
+        for index in range(len(categories)):
+            members = rule_categories == index
+            category_counts[:, index] = rule_counts[:, members].sum(axis=1)
+            category_first_hit[:, index] = first_hit[:, members].min(axis=1)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratios = category_counts / sizes[:, None]
+        passed = (category_counts > 0) & (ratios >= threshold)
+        priority = np.where(passed, category_first_hit, no_rule)
+        chosen = priority.argmin(axis=1)
+        
+        decisions = {}
+        for row in np.flatnonzero(priority.min(axis=1) < no_rule):
+            count = int(category_counts[row, chosen[row]])
+            decisions[columns[row]] = (categories[chosen[row]],
+                                       f"Data pattern match: {count}/{int(sizes[row])} samples")
+        return decisions
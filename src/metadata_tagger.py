@@ -4,21 +4,33 @@ Main entry point for the Metadata Database Tagger.
 
 import os
 import json
+import time
 import logging
+import asyncio
 import argparse
-from typing import Dict, List, Optional, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Any, Tuple, Callable, Iterator
 
 from connectors.base import DatabaseConnector
 from connectors.snowflake import SnowflakeConnector
+from connectors.synthetic import SyntheticConnector
+from connectors.pool import ConnectorPool
 # Import other connectors as they're implemented
 # from connectors.azure import AzureSQLConnector
 # from connectors.bigquery import BigQueryConnector
 # from connectors.databricks import DatabricksConnector
 
-from detection.detector import PIIDetector
+from detection.detector import PIIDetector, DETECTION_BACKENDS
 from detection.rule_loader import RuleLoader
+from detection.pushdown import is_text_type
 from utils.override_handler import OverrideHandler
-from utils.export import export_results
+from utils.export import ResultWriter, read_jsonl_results
+from utils.scan_state import ScanStateStore
+from utils.catalog_cache import CatalogCache
+from utils.checkpoint import ScanCheckpoint
+from utils.tag_plan import TagPlan, write_plan_sql
+from utils.metrics import RunMetrics
+from utils.query_ledger import QueryLedger
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -28,6 +40,8 @@ def create_connector(db_type: str, config: Dict[str, str]) -> DatabaseConnector:
     """Factory function to create the appropriate database connector"""
     if db_type.lower() == 'snowflake':
         return SnowflakeConnector(config)
+    elif db_type.lower() == 'synthetic':
+        return SyntheticConnector(config)
     # Uncomment as other connectors are implemented
     # elif db_type.lower() == 'azure_sql':
     #     return AzureSQLConnector(config)
@@ -38,13 +52,591 @@ def create_connector(db_type: str, config: Dict[str, str]) -> DatabaseConnector:
     else:
         raise ValueError(f"Unsupported database type: {db_type}")
 
+def find_override(overrides: Dict[str, str], database_name: str, schema: str, table: str,
+                  column_name: str, log: bool = True) -> Optional[str]:
+    """Look up a manual override for a column, preferring the database-qualified key"""
+    # Create different column key formats for override lookup
+    column_key = f"{schema}.{table}.{column_name}".lower()
+    db_column_key = f"{database_name}.{schema}.{table}.{column_name}".lower() if database_name else None
+    
+    # Check for overrides using both key formats
+    if db_column_key and db_column_key in overrides:
+        # First try with the database prefix
+        tag_value = overrides.get(db_column_key)
+        if log:
+            logger.info(f"Found database-qualified override for {db_column_key}: {tag_value}")
+        return tag_value
+    if column_key in overrides:
+        # Then try without database prefix
+        tag_value = overrides.get(column_key)
+        if log:
+            logger.info(f"Found override for {column_key}: {tag_value}")
+        return tag_value
+    return None
+
+def decide_without_data(detector: PIIDetector, overrides: Dict[str, str], database_name: str,
+                        schema: str, table: str, columns: List[Dict[str, str]],
+                        metrics: Optional[RunMetrics] = None) -> Tuple[Dict[str, Tuple[str, str]], List[str]]:
+    """
+    Decide tags from overrides and column name rules only
+    Returns the decisions made so far and the columns that still need sample data
+    """
+    decisions = {}
+    undecided = []
+    override_seconds = 0.0
+    detection_seconds = 0.0
+    for column_info in columns:
+        column_name = column_info['name']
+        logger.info(f"Processing column: {schema}.{table}.{column_name}")
+        
+        start = time.perf_counter()
+        tag_value = find_override(overrides, database_name, schema, table, column_name)
+        override_seconds += time.perf_counter() - start
+        if tag_value:
+            # We have an override, use it directly
+            decisions[column_name] = (tag_value, "Manual override")
+            continue
+        
+        # No override, try the column name rules before paying for a sample
+        start = time.perf_counter()
+        name_tag = detector.detect_from_name(column_name)
+        detection_seconds += time.perf_counter() - start
+        if name_tag:
+            decisions[column_name] = (name_tag, f"Column name pattern: {column_name}")
+        else:
+            undecided.append(column_name)
+    
+    if metrics is not None:
+        metrics.add_time('override_lookup', override_seconds)
+        metrics.add_time('detection', detection_seconds)
+    return decisions, undecided
+
+def _count_samples(metrics: RunMetrics, table_sample: Dict[str, List[Any]], queries: int,
+                   rows_fetched: Optional[int]) -> None:
+    """
+    Count the sample queries of a table, the rows they returned and the non-null values among them
+    When the connector cannot report the rows, the largest column's values are counted as a lower bound.
+    """
+    if rows_fetched is None:
+        rows_fetched = max((len(values) for values in table_sample.values()), default=0)
+    metrics.increment('samples_fetched', queries)
+    metrics.increment('rows_fetched', rows_fetched)
+    metrics.increment('sample_values_fetched', sum(len(values) for values in table_sample.values()))
+
+def _count_tag_outcome(metrics: RunMetrics, applied: List[Dict[str, str]], failed: List[Dict[str, str]]) -> None:
+    """Count the tags that applied and those that failed"""
+    metrics.increment('tags_applied', len(applied))
+    metrics.increment('tag_failures', len(failed))
+
+def _ordered_decisions(columns: List[Dict[str, str]],
+                       decisions: Dict[str, Tuple[str, str]]) -> List[Tuple[str, Tuple[str, str]]]:
+    """Put tag decisions back into the table's column order"""
+    return [(column_info['name'], decisions[column_info['name']])
+            for column_info in columns if column_info['name'] in decisions]
+
+def _result_rows(schema: str, table: str, tag_name: str, ordered: List[Tuple[str, Tuple[str, str]]],
+                 applied: Dict[str, bool]) -> Tuple[List[Dict[str, str]], List[Dict[str, str]]]:
+    """Build result rows for the tag decisions, split into applied and failed ones"""
+    results = []
+    failed = []
+    for column_name, (tag_value, reason) in ordered:
+        result = {
+            'schema': schema,
+            'table': table,
+            'column': column_name,
+            'tag_name': tag_name,
+            'tag_value': tag_value,
+            'reason': reason
+        }
+        if applied.get(column_name):
+            results.append(result)
+        else:
+            failed.append(result)
+    return results, failed
+
+def _last_round(rows_fetched: Optional[int], round_size: int, sample_size: int) -> bool:
+    """
+    Whether a sampling round is the last, because it reached the sample size or the table ran out of rows
+    rows_fetched counts the rows the round's sample returned, nulls included, or is None when unknown.
+    """
+    return round_size >= sample_size or (rows_fetched is not None and rows_fetched < round_size)
+
+def detect_from_samples(connector: DatabaseConnector, detector: PIIDetector, schema: str, table: str,
+                        column_names: List[str], sample_size: int = 100, sampling_mode: str = 'table',
+                        metrics: Optional[RunMetrics] = None,
+                        column_types: Optional[Dict[str, str]] = None) -> Dict[str, Tuple[str, str]]:
+    """
+    Sample columns of a table and decide their tags from the data patterns applying to their types
+    With sequential sampling, the columns whose tag is not yet settled are sampled again with
+    more rows, up to sample_size; otherwise every column is sampled once with sample_size rows.
+    """
+    if metrics is None:
+        metrics = RunMetrics()
+    round_sizes = detector.sequential.sample_sizes(sample_size) if detector.sequential else [sample_size]
+    decisions = {}
+    for round_size in round_sizes:
+        with metrics.phase('sampling'):
+            if sampling_mode == 'table':
+                table_sample, rows_fetched = connector.get_table_sample_with_rows(schema, table, column_names,
+                                                                                  round_size)
+            else:
+                rows_fetched = None
+                table_sample = {
+                    column_name: connector.get_sample_data(schema, table, column_name, round_size)
+                    for column_name in column_names
+                }
+        if sampling_mode == 'table':
+            _count_samples(metrics, table_sample, 1, rows_fetched)
+        else:
+            # Each column's query returns a row per non-null value
+            _count_samples(metrics, table_sample, len(column_names),
+                           sum(len(values) for values in table_sample.values()))
+        
+        with metrics.phase('detection'):
+            if _last_round(rows_fetched, round_size, sample_size):
+                decisions.update(detector.get_tags_from_table_sample(table_sample, column_types))
+                break
+            settled, column_names = detector.get_settled_tags(table_sample, column_types)
+            decisions.update(settled)
+        if not column_names:
+            break
+    return decisions
+
+async def detect_from_samples_async(connector: DatabaseConnector, detector: PIIDetector, schema: str, table: str,
+                                    column_names: List[str], sample_size: int = 100,
+                                    metrics: Optional[RunMetrics] = None,
+                                    column_types: Optional[Dict[str, str]] = None) -> Dict[str, Tuple[str, str]]:
+    """Asynchronous variant of detect_from_samples using table sampling"""
+    if metrics is None:
+        metrics = RunMetrics()
+    round_sizes = detector.sequential.sample_sizes(sample_size) if detector.sequential else [sample_size]
+    decisions = {}
+    for round_size in round_sizes:
+        with metrics.phase('sampling'):
+            table_sample, rows_fetched = await connector.get_table_sample_with_rows_async(schema, table, column_names,
+                                                                                          round_size)
+        _count_samples(metrics, table_sample, 1, rows_fetched)
+        
+        with metrics.phase('detection'):
+            if _last_round(rows_fetched, round_size, sample_size):
+                decisions.update(detector.get_tags_from_table_sample(table_sample, column_types))
+                break
+            settled, column_names = detector.get_settled_tags(table_sample, column_types)
+            decisions.update(settled)
+        if not column_names:
+            break
+    return decisions
+
+def _columns_with_data_rules(detector: PIIDetector, column_types: Dict[str, str], column_names: List[str],
+                             metrics: RunMetrics) -> List[str]:
+    """Drop the columns of types no data rule applies to, which sampling could never tag"""
+    kept = [column_name for column_name in column_names if detector.has_data_rules(column_types.get(column_name))]
+    if len(kept) < len(column_names):
+        logger.debug(f"Skipping {len(column_names) - len(kept)} columns no data rule applies to")
+        metrics.increment('columns_skipped_by_type', len(column_names) - len(kept))
+    return kept
+
+def _split_for_pushdown(detector: PIIDetector, column_types: Dict[str, str],
+                        column_names: List[str]) -> Tuple[List[str], List[str]]:
+    """Split the columns needing data patterns into text columns counted in the warehouse and columns sampled"""
+    if not detector.pushdown:
+        return [], column_names
+    pushed = [column_name for column_name in column_names if is_text_type(column_types.get(column_name))]
+    return pushed, [column_name for column_name in column_names if column_name not in pushed]
+
+def _count_match_counts(metrics: RunMetrics, match_counts: Dict[str, Dict[str, Any]]) -> None:
+    """Count a pushdown query, the single row it returns and the sample values in it for client-side patterns"""
+    metrics.increment('samples_fetched')
+    metrics.increment('rows_fetched')
+    metrics.increment('sample_values_fetched', sum(len(counts.get('values') or []) for counts in match_counts.values()))
+
+def detect_in_warehouse(connector: DatabaseConnector, detector: PIIDetector, schema: str, table: str,
+                        column_names: List[str], sample_size: int = 100, metrics: Optional[RunMetrics] = None,
+                        column_types: Optional[Dict[str, str]] = None) -> Optional[Dict[str, Tuple[str, str]]]:
+    """
+    Decide the tags of text columns from data pattern matches counted in the warehouse
+    Returns None if the connector cannot run the query, so the columns are sampled instead
+    """
+    if metrics is None:
+        metrics = RunMetrics()
+    rules = detector.get_pushdown_rules()
+    try:
+        with metrics.phase('sampling'):
+            match_counts = connector.get_table_match_counts(schema, table, column_names, rules.patterns(),
+                                                            sample_size, bool(rules.client))
+    except NotImplementedError:
+        return None
+    except Exception as e:
+        logger.warning(f"Pushdown query failed for {schema}.{table}, sampling its columns instead: {e}")
+        return None
+    _count_match_counts(metrics, match_counts)
+    
+    with metrics.phase('detection'):
+        return detector.get_tags_from_match_counts(match_counts, column_types)
+
+async def detect_in_warehouse_async(connector: DatabaseConnector, detector: PIIDetector, schema: str, table: str,
+                                    column_names: List[str], sample_size: int = 100,
+                                    metrics: Optional[RunMetrics] = None, column_types: Optional[Dict[str, str]] = None
+                                    ) -> Optional[Dict[str, Tuple[str, str]]]:
+    """Asynchronous variant of detect_in_warehouse"""
+    if metrics is None:
+        metrics = RunMetrics()
+    rules = detector.get_pushdown_rules()
+    try:
+        with metrics.phase('sampling'):
+            match_counts = await connector.get_table_match_counts_async(schema, table, column_names, rules.patterns(),
+                                                                        sample_size, bool(rules.client))
+    except NotImplementedError:
+        return None
+    except Exception as e:
+        logger.warning(f"Pushdown query failed for {schema}.{table}, sampling its columns instead: {e}")
+        return None
+    _count_match_counts(metrics, match_counts)
+    
+    with metrics.phase('detection'):
+        return detector.get_tags_from_match_counts(match_counts, column_types)
+
+def detect_table(connector: DatabaseConnector, detector: PIIDetector, overrides: Dict[str, str],
+                 database_name: str, schema: str, table: str, columns: List[Dict[str, str]],
+                 sample_size: int = 100, sampling_mode: str = 'table',
+                 metrics: Optional[RunMetrics] = None) -> List[Tuple[str, Tuple[str, str]]]:
+    """
+    Decide tags for the columns of one table without applying them
+    Returns (column, (tag value, reason)) pairs in column order
+    
+    Overrides and column name rules are checked first; only columns they leave
+    undecided are sampled and matched against the data patterns.
+    """
+    if metrics is None:
+        metrics = RunMetrics()
+    decisions, undecided = decide_without_data(detector, overrides, database_name, schema, table, columns, metrics)
+    
+    # Columns of types no data rule applies to need neither a sample nor matching
+    column_types = {column_info['name']: column_info.get('type') for column_info in columns}
+    undecided = _columns_with_data_rules(detector, column_types, undecided, metrics)
+    
+    # Count data patterns in the warehouse for text columns if enabled, and sample the rest
+    pushed, sampled = _split_for_pushdown(detector, column_types, undecided)
+    if pushed:
+        pushed_decisions = detect_in_warehouse(connector, detector, schema, table, pushed, sample_size, metrics,
+                                               column_types)
+        if pushed_decisions is None:
+            sampled = undecided
+        else:
+            decisions.update(pushed_decisions)
+    
+    # Sample only the columns that still need data patterns
+    if sampled:
+        decisions.update(detect_from_samples(connector, detector, schema, table, sampled, sample_size,
+                                             sampling_mode, metrics, column_types))
+    
+    return _ordered_decisions(columns, decisions)
+
+def process_table(connector: DatabaseConnector, detector: PIIDetector, overrides: Dict[str, str],
+                  database_name: str, schema: str, table: str, columns: List[Dict[str, str]],
+                  tag_name: str, tag_schema: str, sample_size: int = 100, sampling_mode: str = 'table',
+                  metrics: Optional[RunMetrics] = None) -> Tuple[List[Dict[str, str]], List[Dict[str, str]]]:
+    """
+    Decide and apply tags for the columns of one table
+    Returns the result rows for the columns that were tagged, and those whose tag failed to apply
+    """
+    if metrics is None:
+        metrics = RunMetrics()
+    ordered = detect_table(connector, detector, overrides, database_name, schema, table, columns,
+                           sample_size, sampling_mode, metrics)
+    if not ordered:
+        return [], []
+    
+    # Apply every tag decision for the table in one batch, in column order
+    column_tags = {column_name: tag_value for column_name, (tag_value, _) in ordered}
+    with metrics.phase('tag_ddl'):
+        applied = connector.apply_tags(schema, table, column_tags, tag_name, tag_schema)
+    
+    outcome = _result_rows(schema, table, tag_name, ordered, applied)
+    _count_tag_outcome(metrics, *outcome)
+    return outcome
+
+async def process_table_async(connector: DatabaseConnector, detector: PIIDetector, overrides: Dict[str, str],
+                              database_name: str, schema: str, table: str, columns: List[Dict[str, str]],
+                              tag_name: str, tag_schema: str, sample_size: int = 100,
+                              metrics: Optional[RunMetrics] = None) -> Tuple[List[Dict[str, str]], List[Dict[str, str]]]:
+    """
+    Asynchronous variant of process_table using table sampling
+    The sample query and the ALTER TABLE are awaited, so other tables progress meanwhile;
+    their phase timings include that waiting.
+    """
+    if metrics is None:
+        metrics = RunMetrics()
+    decisions, undecided = decide_without_data(detector, overrides, database_name, schema, table, columns, metrics)
+    column_types = {column_info['name']: column_info.get('type') for column_info in columns}
+    undecided = _columns_with_data_rules(detector, column_types, undecided, metrics)
+    
+    pushed, sampled = _split_for_pushdown(detector, column_types, undecided)
+    if pushed:
+        pushed_decisions = await detect_in_warehouse_async(connector, detector, schema, table, pushed,
+                                                           sample_size, metrics, column_types)
+        if pushed_decisions is None:
+            sampled = undecided
+        else:
+            decisions.update(pushed_decisions)
+    
+    if sampled:
+        decisions.update(await detect_from_samples_async(connector, detector, schema, table, sampled,
+                                                         sample_size, metrics, column_types))
+    
+    if not decisions:
+        return [], []
+    
+    ordered = _ordered_decisions(columns, decisions)
+    column_tags = {column_name: tag_value for column_name, (tag_value, _) in ordered}
+    with metrics.phase('tag_ddl'):
+        applied = await connector.apply_tags_async(schema, table, column_tags, tag_name, tag_schema)
+    
+    outcome = _result_rows(schema, table, tag_name, ordered, applied)
+    _count_tag_outcome(metrics, *outcome)
+    return outcome
+
+def _merge_retried(columns: List[Dict[str, str]], applied: List[Dict[str, str]], failed: List[Dict[str, str]],
+                   retried: Dict[str, bool]) -> Tuple[List[Dict[str, str]], List[Dict[str, str]]]:
+    """Move the rows whose tags now applied over to the applied rows, keeping column order"""
+    position = {column_info['name']: index for index, column_info in enumerate(columns)}
+    applied = applied + [row for row in failed if retried.get(row['column'])]
+    applied.sort(key=lambda row: position.get(row['column'], len(position)))
+    return applied, [row for row in failed if not retried.get(row['column'])]
+
+def retry_failed_tags(connector: DatabaseConnector, schema: str, table: str, columns: List[Dict[str, str]],
+                      tag_schema: str, applied: List[Dict[str, str]], failed: List[Dict[str, str]],
+                      metrics: Optional[RunMetrics] = None) -> Tuple[List[Dict[str, str]], List[Dict[str, str]]]:
+    """
+    Apply again the tags of a table that failed in an earlier run, without re-detecting
+    Returns the table's applied and still failing result rows
+    """
+    if metrics is None:
+        metrics = RunMetrics()
+    logger.info(f"Retrying {len(failed)} failed tags on {schema}.{table}")
+    column_tags = {row['column']: row['tag_value'] for row in failed}
+    with metrics.phase('tag_ddl'):
+        retried = connector.apply_tags(schema, table, column_tags, failed[0]['tag_name'], tag_schema)
+    _count_tag_outcome(metrics, [row for row in failed if retried.get(row['column'])],
+                       [row for row in failed if not retried.get(row['column'])])
+    return _merge_retried(columns, applied, failed, retried)
+
+async def retry_failed_tags_async(connector: DatabaseConnector, schema: str, table: str,
+                                  columns: List[Dict[str, str]], tag_schema: str, applied: List[Dict[str, str]],
+                                  failed: List[Dict[str, str]], metrics: Optional[RunMetrics] = None
+                                  ) -> Tuple[List[Dict[str, str]], List[Dict[str, str]]]:
+    """Asynchronous variant of retry_failed_tags"""
+    if metrics is None:
+        metrics = RunMetrics()
+    logger.info(f"Retrying {len(failed)} failed tags on {schema}.{table}")
+    column_tags = {row['column']: row['tag_value'] for row in failed}
+    with metrics.phase('tag_ddl'):
+        retried = await connector.apply_tags_async(schema, table, column_tags, failed[0]['tag_name'], tag_schema)
+    _count_tag_outcome(metrics, [row for row in failed if retried.get(row['column'])],
+                       [row for row in failed if not retried.get(row['column'])])
+    return _merge_retried(columns, applied, failed, retried)
+
+def load_catalog(connector: DatabaseConnector, schemas: Optional[List[str]] = None,
+                 catalog_cache: Optional[CatalogCache] = None,
+                 refresh_catalog: bool = False,
+                 metrics: Optional[RunMetrics] = None) -> Dict[str, Dict[str, List[Dict[str, str]]]]:
+    """Discover the catalog, through the on-disk cache when one is configured"""
+    if metrics is None:
+        metrics = RunMetrics()
+    with metrics.phase('discovery'):
+        if catalog_cache is None:
+            catalog = connector.get_catalog(schemas)
+        else:
+            catalog = catalog_cache.load(connector, schemas, refresh=refresh_catalog)
+    
+    metrics.increment('schemas', len(catalog))
+    metrics.increment('tables', sum(len(tables) for tables in catalog.values()))
+    metrics.increment('columns', sum(len(columns) for tables in catalog.values() for columns in tables.values()))
+    return catalog
+
+def table_fingerprint(stats: Optional[Dict[str, Any]], columns: List[Dict[str, str]], rules_hash: str,
+                      table_overrides: Dict[str, str]) -> Optional[Dict[str, Any]]:
+    """
+    Describe everything a table's tag decisions depend on
+    Returns None when the connector cannot tell whether the table changed
+    """
+    if not stats or stats.get('last_altered') is None:
+        return None
+    return {
+        'last_altered': stats['last_altered'],
+        'row_count': stats.get('row_count'),
+        'columns': [f"{column_info['name']}:{column_info['type']}" for column_info in columns],
+        'rules_hash': rules_hash,
+        'overrides': table_overrides
+    }
+
+def _state_scope(connector: DatabaseConnector, database_name: str) -> str:
+    """Identify the database in the scan state, so equally named databases in other accounts stay apart"""
+    return f"{connector.config.get('account', '')}/{database_name}"
+
+def _reuse_unchanged_tables(connector: DatabaseConnector, rule_loader: RuleLoader, overrides: Dict[str, str],
+                            database_name: str, schemas: Optional[List[str]],
+                            units: List[Tuple[str, str, List[Dict[str, str]]]], scan_state: ScanStateStore,
+                            full_scan: bool = False) -> Tuple[Dict[Tuple[str, str], List[Dict[str, str]]],
+                                                              Dict[Tuple[str, str], Dict[str, Any]]]:
+    """
+    Fingerprint every table and pick up the previous results of the unchanged ones
+    The scan state forgets tables that are no longer in the catalog.
+    Returns the reused results and the fingerprints, both keyed by (schema, table)
+    """
+    table_stats = connector.get_table_stats(schemas)
+    rules_hash = rule_loader.get_rules_hash()
+    scope = _state_scope(connector, database_name)
+    dropped = scan_state.prune(scope, [(schema, table) for schema, table, _ in units], schemas)
+    if dropped:
+        logger.info(f"Forgetting the scan state of {dropped} tables no longer in the catalog")
+    
+    reused = {}
+    fingerprints = {}
+    for schema, table, columns in units:
+        table_overrides = {}
+        for column_info in columns:
+            tag_value = find_override(overrides, database_name, schema, table, column_info['name'], log=False)
+            if tag_value:
+                table_overrides[column_info['name']] = tag_value
+        
+        fingerprint = table_fingerprint(table_stats.get((schema, table)), columns, rules_hash, table_overrides)
+        if fingerprint is None:
+            continue
+        fingerprints[(schema, table)] = fingerprint
+        
+        if not full_scan:
+            previous = scan_state.get_unchanged(scope, schema, table, fingerprint)
+            if previous is not None:
+                reused[(schema, table)] = previous
+    
+    logger.info(f"Reusing results for {len(reused)} of {len(units)} tables unchanged since the last scan")
+    return reused, fingerprints
+
+def _record_scan_state(connector: DatabaseConnector, database_name: str,
+                       scanned: Dict[Tuple[str, str], Tuple[List[Dict[str, str]], List[Dict[str, str]]]],
+                       fingerprints: Dict[Tuple[str, str], Dict[str, Any]],
+                       tagged_stats: Dict[Tuple[str, str], Optional[Dict[str, Any]]],
+                       scan_state: ScanStateStore) -> None:
+    """
+    Remember the fingerprint and results of every table scanned without tag failures
+    Tables tagged during the run are fingerprinted with the statistics read right after their ALTER,
+    unless their row count moved since the scan started, in which case they are scanned again next time.
+    """
+    scope = _state_scope(connector, database_name)
+    
+    for (schema, table), (applied, failed) in scanned.items():
+        fingerprint = fingerprints.get((schema, table))
+        # Tables with failed tags are scanned again next time so the failures are retried
+        if fingerprint is None or failed:
+            continue
+        if (schema, table) in tagged_stats:
+            stats = tagged_stats[(schema, table)]
+            if not stats or stats.get('row_count') != fingerprint['row_count']:
+                logger.info(f"{schema}.{table} changed while it was scanned, it will be scanned again next time")
+                continue
+            fingerprint = dict(fingerprint, **stats)
+        scan_state.record(scope, schema, table, fingerprint, applied)
+
+def _altered(outcome: Tuple[List[Dict[str, str]], List[Dict[str, str]]],
+             previous: Optional[Tuple[List[Dict[str, str]], List[Dict[str, str]]]]) -> bool:
+    """Whether scanning a table ran tagging DDL on it, given its outcome and the checkpointed outcome it retried"""
+    if previous is None:
+        return bool(outcome[0])
+    return bool(previous[1])
+
+def _resumed_tables(checkpoint: Optional[ScanCheckpoint], scope: str,
+                    units: List[Tuple[str, str, List[Dict[str, str]]]]) -> Dict[Tuple[str, str], List[Dict[str, str]]]:
+    """Get the results of the tables the checkpointed run completed with every tag applied"""
+    if checkpoint is None:
+        return {}
+    resumed = {}
+    for schema, table, _ in units:
+        previous = checkpoint.get(scope, schema, table)
+        if previous is not None and not previous[1]:
+            resumed[(schema, table)] = previous[0]
+    if resumed:
+        logger.info(f"Skipping {len(resumed)} tables completed before the checkpoint")
+    return resumed
+
+def _process_tables_concurrently(connector: DatabaseConnector, units: List[Tuple[str, str, List[Dict[str, str]]]],
+                                 scan_unit: Callable[..., Any], workers: int) -> Iterator[Tuple[Tuple[str, str], Any]]:
+    """
+    Process tables on a thread pool, one pooled connection per running table
+    Yields each table's outcome in the order of units, as soon as it and those before it are done
+    """
+    pool = ConnectorPool(connector, workers)
+    
+    def run_table(schema: str, table: str, columns: List[Dict[str, str]]) -> Any:
+        with pool.acquire() as pooled_connector:
+            return scan_unit(pooled_connector, schema, table, columns)
+    
+    logger.info(f"Processing tables with {workers} workers")
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [((schema, table), executor.submit(run_table, schema, table, columns))
+                       for schema, table, columns in units]
+            try:
+                # Yield in catalog order so the output does not depend on completion order
+                for key, future in futures:
+                    yield key, future.result()
+            except BaseException:
+                # A failed table, Ctrl-C or an abandoned scan stops the run instead of tagging the queued tables
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise
+    finally:
+        pool.close()
+
+def _scan_tables(connector: DatabaseConnector, units: List[Tuple[str, str, List[Dict[str, str]]]],
+                 scan_unit: Callable[..., Any], workers: int) -> Iterator[Tuple[Tuple[str, str], Any]]:
+    """
+    Run scan_unit over tables one after another or on a thread pool
+    Yields outcomes in the order of units
+    """
+    if workers > 1:
+        yield from _process_tables_concurrently(connector, units, scan_unit, workers)
+        return
+    
+    for schema, table, columns in units:
+        yield (schema, table), scan_unit(connector, schema, table, columns)
+
+def _emit_rows(results: Dict[str, List[Dict[str, str]]], schema: str, rows: List[Dict[str, str]],
+               result_sink: Optional[Callable[[Dict[str, str]], None]]) -> None:
+    """Hand a table's result rows to the sink, or keep them under their schema when there is none"""
+    if result_sink is None:
+        results[schema].extend(rows)
+        return
+    for row in rows:
+        result_sink(row)
+
 def process_database(connector: DatabaseConnector, detector: PIIDetector, rule_loader: RuleLoader,
                      overrides: Dict[str, str], schemas: Optional[List[str]] = None,
-                     sample_size: int = 100) -> Dict[str, List[Dict[str, str]]]:
+                     sample_size: int = 100, sampling_mode: str = 'table', workers: int = 1,
+                     scan_state: Optional[ScanStateStore] = None, full_scan: bool = False,
+                     catalog_cache: Optional[CatalogCache] = None, refresh_catalog: bool = False,
+                     result_sink: Optional[Callable[[Dict[str, str]], None]] = None,
+                     checkpoint: Optional[ScanCheckpoint] = None,
+                     metrics: Optional[RunMetrics] = None) -> Dict[str, List[Dict[str, str]]]:
     """
     Process the database and assign tags to columns
     Returns a dictionary of applied tags
+    
+    With sampling_mode 'table' every column of a table is sampled with one query,
+    with 'column' each column is sampled with its own query. With more than one
+    worker, tables are processed concurrently over a pool of that many connections;
+    results keep the catalog order either way. With a scan_state, tables unchanged
+    since the previous run are skipped and their earlier results reused, unless
+    full_scan is set. With a catalog_cache, discovery is served from the cache
+    while it is fresh, unless refresh_catalog is set. With a result_sink, each
+    result row is passed to it as soon as its table is done instead of being
+    returned, and the returned dictionary is empty. With a checkpoint, every
+    completed table is recorded in it; tables it already holds are not scanned
+    again, only their failed tags are retried. With metrics, the time spent in
+    each phase and the work done are added to them.
     """
+    if metrics is None:
+        metrics = RunMetrics()
+    
     # Connect to the database
     connector.connect()
     
@@ -57,90 +649,290 @@ def process_database(connector: DatabaseConnector, detector: PIIDetector, rule_l
     
     logger.info(f"Using tag name: {tag_name} and tag schema: {tag_schema or 'default'}")
     
+    scope = _state_scope(connector, database_name)
+    # Statistics of the tables tagged during the run, read right after their ALTER
+    tagged_stats = {}
+    
+    def scan_unit(unit_connector: DatabaseConnector, schema: str, table: str,
+                  columns: List[Dict[str, str]]) -> Tuple[List[Dict[str, str]], List[Dict[str, str]]]:
+        previous = checkpoint.get(scope, schema, table) if checkpoint is not None else None
+        if previous is not None:
+            outcome = retry_failed_tags(unit_connector, schema, table, columns, tag_schema, *previous, metrics)
+        else:
+            logger.info(f"Processing table: {schema}.{table}")
+            outcome = process_table(
+                unit_connector, detector, overrides, database_name, schema, table, columns,
+                tag_name, tag_schema, sample_size, sampling_mode, metrics
+            )
+        if scan_state is not None and _altered(outcome, previous):
+            tagged_stats[(schema, table)] = unit_connector.get_single_table_stats(schema, table)
+        if checkpoint is not None:
+            checkpoint.record(scope, schema, table, *outcome)
+        return outcome
+    
     results = {}
     
     try:
-        # Get schemas to process
-        if not schemas:
-            schemas = connector.get_schemas()
+        # Discover every schema, table and column up front
+        catalog = load_catalog(connector, schemas, catalog_cache, refresh_catalog, metrics)
+        units = [(schema, table, columns) for schema, tables in catalog.items() for table, columns in tables.items()]
         
-        # Process each schema
-        for schema in schemas:
-            logger.info(f"Processing schema: {schema}")
-            results[schema] = []
-            
-            # Get tables in schema
-            tables = connector.get_tables(schema)
-            
-            # Process each table
-            for table in tables:
-                logger.info(f"Processing table: {schema}.{table}")
-                
-                # Get columns in table
-                columns = connector.get_columns(schema, table)
-                
-                # Process each column
-                for column_info in columns:
-                    column_name = column_info['name']
-                    logger.info(f"Processing column: {schema}.{table}.{column_name}")
-                    
-                    # Get sample data
-                    sample_data = connector.get_sample_data(schema, table, column_name, sample_size)
-                    
-                    # Create different column key formats for override lookup
-                    column_key = f"{schema}.{table}.{column_name}".lower()
-                    db_column_key = f"{database_name}.{schema}.{table}.{column_name}".lower() if database_name else None
-                    
-                    # Check for overrides using both key formats
-                    tag_value = None
-                    if db_column_key and db_column_key in overrides:
-                        # First try with the database prefix
-                        tag_value = overrides.get(db_column_key)
-                        logger.info(f"Found database-qualified override for {db_column_key}: {tag_value}")
-                    elif column_key in overrides:
-                        # Then try without database prefix
-                        tag_value = overrides.get(column_key)
-                        logger.info(f"Found override for {column_key}: {tag_value}")
-                        
-                    if tag_value:
-                        # We have an override, apply it directly
-                        success = connector.apply_tag(schema, table, column_name, tag_name, tag_value, tag_schema)
-                        
-                        if success:
-                            result = {
-                                'schema': schema,
-                                'table': table,
-                                'column': column_name,
-                                'tag_name': tag_name, 
-                                'tag_value': tag_value,
-                                'reason': "Manual override"
-                            }
-                            results[schema].append(result)
-                    else:
-                        # No override, use the detector
-                        tag_info = detector.get_tag_for_column(column_name, sample_data)
-                        
-                        if tag_info:
-                            tag_value, reason = tag_info
-                            # Apply tag to column using tag name from configuration
-                            success = connector.apply_tag(schema, table, column_name, tag_name, tag_value, tag_schema)
-                            
-                            if success:
-                                result = {
-                                    'schema': schema,
-                                    'table': table,
-                                    'column': column_name,
-                                    'tag_name': tag_name,
-                                    'tag_value': tag_value,
-                                    'reason': reason
-                                }
-                                results[schema].append(result)
+        # Skip tables that have not changed since the last run
+        reused = {}
+        fingerprints = {}
+        if scan_state is not None:
+            reused, fingerprints = _reuse_unchanged_tables(
+                connector, rule_loader, overrides, database_name, schemas, units, scan_state, full_scan
+            )
+        resumed = _resumed_tables(checkpoint, scope, units)
+        pending = [unit for unit in units if (unit[0], unit[1]) not in reused and (unit[0], unit[1]) not in resumed]
+        outcomes = _scan_tables(connector, pending, scan_unit, workers)
+        
+        # Emit every table's rows in catalog order, reused, resumed and scanned tables alike
+        results = {} if result_sink else {schema: [] for schema in catalog}
+        scanned = {}
+        for schema, table, _ in units:
+            if (schema, table) in reused:
+                _emit_rows(results, schema, reused[(schema, table)], result_sink)
+                continue
+            if (schema, table) in resumed:
+                applied, failed = resumed[(schema, table)], []
+            else:
+                _, (applied, failed) = next(outcomes)
+            if scan_state is not None:
+                scanned[(schema, table)] = (applied, failed)
+            _emit_rows(results, schema, applied, result_sink)
+        
+        if scan_state is not None:
+            _record_scan_state(connector, database_name, scanned, fingerprints, tagged_stats, scan_state)
     finally:
         # Close the connection
         connector.close()
     
     return results
 
+async def process_database_async(connector: DatabaseConnector, detector: PIIDetector, rule_loader: RuleLoader,
+                                 overrides: Dict[str, str], schemas: Optional[List[str]] = None,
+                                 sample_size: int = 100, max_in_flight: int = 16,
+                                 scan_state: Optional[ScanStateStore] = None, full_scan: bool = False,
+                                 catalog_cache: Optional[CatalogCache] = None, refresh_catalog: bool = False,
+                                 result_sink: Optional[Callable[[Dict[str, str]], None]] = None,
+                                 checkpoint: Optional[ScanCheckpoint] = None,
+                                 metrics: Optional[RunMetrics] = None) -> Dict[str, List[Dict[str, str]]]:
+    """
+    Asynchronous variant of process_database
+    Sampling and tagging queries for up to max_in_flight tables run at the same time
+    on the connector's single session; results keep the catalog order.
+    """
+    if metrics is None:
+        metrics = RunMetrics()
+    connector.connect()
+    
+    tag_name = rule_loader.get_tag_name()
+    tag_schema = rule_loader.get_tag_schema()
+    database_name = connector.config.get('database', '')
+    
+    logger.info(f"Using tag name: {tag_name} and tag schema: {tag_schema or 'default'}")
+    logger.info(f"Processing tables asynchronously with up to {max_in_flight} tables in flight")
+    
+    semaphore = asyncio.Semaphore(max(1, max_in_flight))
+    scope = _state_scope(connector, database_name)
+    tagged_stats = {}
+    
+    async def run_table(schema: str, table: str,
+                        columns: List[Dict[str, str]]) -> Tuple[List[Dict[str, str]], List[Dict[str, str]]]:
+        async with semaphore:
+            previous = checkpoint.get(scope, schema, table) if checkpoint is not None else None
+            if previous is not None:
+                outcome = await retry_failed_tags_async(connector, schema, table, columns, tag_schema, *previous,
+                                                        metrics)
+            else:
+                logger.info(f"Processing table: {schema}.{table}")
+                outcome = await process_table_async(
+                    connector, detector, overrides, database_name, schema, table, columns,
+                    tag_name, tag_schema, sample_size, metrics
+                )
+            if scan_state is not None and _altered(outcome, previous):
+                tagged_stats[(schema, table)] = await connector.get_single_table_stats_async(schema, table)
+            if checkpoint is not None:
+                checkpoint.record(scope, schema, table, *outcome)
+            return outcome
+    
+    results = {}
+    try:
+        catalog = load_catalog(connector, schemas, catalog_cache, refresh_catalog, metrics)
+        units = [(schema, table, columns) for schema, tables in catalog.items() for table, columns in tables.items()]
+        
+        reused = {}
+        fingerprints = {}
+        if scan_state is not None:
+            reused, fingerprints = _reuse_unchanged_tables(
+                connector, rule_loader, overrides, database_name, schemas, units, scan_state, full_scan
+            )
+        resumed = _resumed_tables(checkpoint, scope, units)
+        tasks = {(schema, table): asyncio.ensure_future(run_table(schema, table, columns))
+                 for schema, table, columns in units if (schema, table) not in reused and (schema, table) not in resumed}
+        
+        # Await in catalog order so the output matches the sequential run
+        results = {} if result_sink else {schema: [] for schema in catalog}
+        scanned = {}
+        try:
+            for schema, table, _ in units:
+                if (schema, table) in reused:
+                    _emit_rows(results, schema, reused[(schema, table)], result_sink)
+                    continue
+                if (schema, table) in resumed:
+                    applied, failed = resumed[(schema, table)], []
+                else:
+                    applied, failed = await tasks[(schema, table)]
+                if scan_state is not None:
+                    scanned[(schema, table)] = (applied, failed)
+                _emit_rows(results, schema, applied, result_sink)
+        finally:
+            for task in tasks.values():
+                task.cancel()
+        
+        if scan_state is not None:
+            _record_scan_state(connector, database_name, scanned, fingerprints, tagged_stats, scan_state)
+    finally:
+        connector.close()
+    
+    return results
+
+def plan_database(connector: DatabaseConnector, detector: PIIDetector, rule_loader: RuleLoader,
+                  overrides: Dict[str, str], plan: TagPlan, schemas: Optional[List[str]] = None,
+                  sample_size: int = 100, sampling_mode: str = 'table', workers: int = 1,
+                  catalog_cache: Optional[CatalogCache] = None, refresh_catalog: bool = False,
+                  execute: bool = True, batch_size: int = 500, ddl_warehouse: Optional[str] = None,
+                  result_sink: Optional[Callable[[Dict[str, str]], None]] = None,
+                  metrics: Optional[RunMetrics] = None) -> Dict[str, List[Dict[str, str]]]:
+    """
+    Process the database in two phases and return the applied tags like process_database
+    
+    The detection phase samples every table and adds its tag DDL to the plan
+    without running any. Unless execute is False, the execution phase then runs
+    the plan's statements in batches of batch_size, on ddl_warehouse if given.
+    Tables whose statement fails are tagged again column by column. Without
+    execute, the planned tags are returned as if applied.
+    """
+    if metrics is None:
+        metrics = RunMetrics()
+    connector.connect()
+    
+    tag_name = rule_loader.get_tag_name()
+    tag_schema = rule_loader.get_tag_schema()
+    database_name = connector.config.get('database', '')
+    
+    logger.info(f"Using tag name: {tag_name} and tag schema: {tag_schema or 'default'}")
+    
+    def scan_unit(unit_connector: DatabaseConnector, schema: str, table: str,
+                  columns: List[Dict[str, str]]) -> List[Tuple[str, Tuple[str, str]]]:
+        logger.info(f"Detecting tags for table: {schema}.{table}")
+        return detect_table(unit_connector, detector, overrides, database_name, schema, table, columns,
+                            sample_size, sampling_mode, metrics)
+    
+    results = {}
+    try:
+        catalog = load_catalog(connector, schemas, catalog_cache, refresh_catalog, metrics)
+        units = [(schema, table, columns) for schema, tables in catalog.items() for table, columns in tables.items()]
+        
+        # Detection phase: plan the DDL of every table before running any of it
+        for (schema, table), ordered in _scan_tables(connector, units, scan_unit, workers):
+            if ordered:
+                column_tags = {column_name: tag_value for column_name, (tag_value, _) in ordered}
+                plan.add_table(schema, table, tag_name, tag_schema, ordered,
+                               *connector.plan_tags(schema, table, column_tags, tag_name, tag_schema))
+        logger.info(f"Planned tags for {len(plan.tables)} of {len(units)} tables")
+        
+        # Execution phase: tag definitions first, then the tagging statements in batches
+        succeeded = [True] * len(plan.tables)
+        if execute and plan.tables:
+            with metrics.phase('tag_ddl'):
+                if ddl_warehouse and not all(connector.execute_statements([f"USE WAREHOUSE {ddl_warehouse}"])):
+                    logger.warning(f"Could not switch to warehouse {ddl_warehouse}, running DDL on the current one")
+                connector.execute_statements(plan.definitions(), batch_size)
+                succeeded = connector.execute_statements(plan.statements(), batch_size)
+        
+        results = {} if result_sink else {schema: [] for schema in catalog}
+        for planned, statement_succeeded in zip(plan.tables, succeeded):
+            column_tags = {column_name: tag_value for column_name, (tag_value, _) in planned['decisions']}
+            if statement_succeeded:
+                applied = {column_name: True for column_name in column_tags}
+            else:
+                with metrics.phase('tag_ddl'):
+                    applied = connector.apply_tags(planned['schema'], planned['table'], column_tags,
+                                                   tag_name, tag_schema)
+            rows, failed = _result_rows(planned['schema'], planned['table'], tag_name, planned['decisions'], applied)
+            if execute:
+                _count_tag_outcome(metrics, rows, failed)
+            _emit_rows(results, planned['schema'], rows, result_sink)
+    finally:
+        connector.close()
+    
+    return results
+
+def _timed_sink(write: Callable[[Dict[str, str]], None],
+               metrics: RunMetrics) -> Callable[[Dict[str, str]], None]:
+    """Wrap a result sink so the time spent writing rows counts towards the export phase"""
+    def timed_write(row: Dict[str, str]) -> None:
+        with metrics.phase('export'):
+            write(row)
+    return timed_write
+
+def run_database(db_config: Dict[str, Any], args: argparse.Namespace, detector: PIIDetector,
+                 rule_loader: RuleLoader, overrides: Dict[str, str],
+                 scan_state: Optional[ScanStateStore] = None,
+                 catalog_cache: Optional[CatalogCache] = None,
+                 result_sink: Optional[Callable[[Dict[str, str]], None]] = None,
+                 checkpoint: Optional[ScanCheckpoint] = None,
+                 plan: Optional[TagPlan] = None,
+                 metrics: Optional[RunMetrics] = None,
+                 query_ledger: Optional[QueryLedger] = None) -> Dict[str, List[Dict[str, str]]]:
+    """
+    Process one configured database on its own connector and return its results
+    With a result_sink, rows are labelled with the database name and streamed to it instead.
+    With a plan, the database is processed in two phases and its tag DDL collected in the plan.
+    With a query_ledger, every statement run on the database is recorded in it.
+    """
+    logger.info(f"Processing database: {db_config['name']}")
+    
+    # Create connector for this database
+    connector = create_connector(args.db_type, db_config['config'])
+    connector.query_ledger = query_ledger
+    
+    database_sink = None
+    if result_sink is not None:
+        def database_sink(row: Dict[str, str]) -> None:
+            row['database'] = db_config['name']
+            result_sink(row)
+    
+    # Process this database - pass rule_loader to process_database
+    if plan is not None:
+        results = plan_database(connector, detector, rule_loader, overrides, plan, args.schemas, args.sample_size,
+                                args.sampling_mode, args.workers,
+                                catalog_cache=catalog_cache, refresh_catalog=args.refresh_catalog,
+                                execute=not args.plan_only, batch_size=args.plan_batch_size,
+                                ddl_warehouse=args.ddl_warehouse, result_sink=database_sink, metrics=metrics)
+    elif args.async_queries > 0:
+        results = asyncio.run(process_database_async(
+            connector, detector, rule_loader, overrides, args.schemas, args.sample_size, args.async_queries,
+            scan_state=scan_state, full_scan=args.full_scan,
+            catalog_cache=catalog_cache, refresh_catalog=args.refresh_catalog, result_sink=database_sink,
+            checkpoint=checkpoint, metrics=metrics
+        ))
+    else:
+        results = process_database(connector, detector, rule_loader, overrides, args.schemas, args.sample_size,
+                                   args.sampling_mode, args.workers,
+                                   scan_state=scan_state, full_scan=args.full_scan,
+                                   catalog_cache=catalog_cache, refresh_catalog=args.refresh_catalog,
+                                   result_sink=database_sink, checkpoint=checkpoint, metrics=metrics)
+    
+    # Persist progress after every database so a later failure does not lose it
+    if scan_state is not None:
+        scan_state.save()
+    
+    return results
+
 def main():
     """Main entry point for the script"""
     # Parse command line arguments
@@ -150,7 +942,7 @@ def main():
     parser.add_argument('--rules', default='config/tag_rules.yaml', 
                         help='Path to tag rules configuration file (YAML)')
     parser.add_argument('--db-type', default='snowflake', 
-                        choices=['snowflake', 'azure_sql', 'bigquery', 'databricks'], 
+                        choices=['snowflake', 'azure_sql', 'bigquery', 'databricks', 'synthetic'], 
                         help='Database type')
     parser.add_argument('--db-name', 
                         help='Name of the database to process (as defined in config file)')
@@ -162,21 +954,95 @@ def main():
                         help='Override file format')
     parser.add_argument('--sample-size', type=int, default=100, 
                         help='Number of sample rows to check per column')
+    parser.add_argument('--sampling-mode', default='table', choices=['table', 'column'],
+                        help='Sample all columns of a table in one query (table) or one query per column (column)')
+    parser.add_argument('--detection-backend', default='python', choices=DETECTION_BACKENDS,
+                        help='Match sample data column by column (python) or all columns of a table at once (pandas)')
+    parser.add_argument('--sequential-sampling', action='store_true',
+                        help='Start with small samples and sample columns again with more rows, up to --sample-size, '
+                             'only while their tag is not settled')
+    parser.add_argument('--pushdown', action='store_true',
+                        help='Count data pattern matches of text columns in the warehouse with one aggregate query '
+                             'per table instead of fetching their sample values')
+    parser.add_argument('--detection-processes', type=int, default=1,
+                        help='Number of worker processes matching large table samples against the data patterns '
+                             '(1 matches in the scanning process)')
+    parser.add_argument('--name-cache-size', type=int, default=10000,
+                        help='Number of distinct column names whose name rule decision is remembered (0 disables)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Number of tables to process concurrently, each on its own connection')
+    parser.add_argument('--async-queries', type=int, default=0,
+                        help='Pipeline sampling and tagging with asynchronous queries, keeping up to N tables in flight (0 disables)')
+    parser.add_argument('--parallel-databases', type=int, default=1,
+                        help='Number of configured databases to process concurrently')
+    parser.add_argument('--state-file',
+                        help='Scan state file; tables unchanged since the run that wrote it are skipped')
+    parser.add_argument('--full-scan', action='store_true',
+                        help='Scan every table even if unchanged, refreshing the scan state')
+    parser.add_argument('--catalog-cache',
+                        help='SQLite file caching schema/table/column metadata between runs')
+    parser.add_argument('--catalog-ttl', type=float, default=CatalogCache.DEFAULT_TTL,
+                        help='Seconds a cached catalog stays valid')
+    parser.add_argument('--refresh-catalog', action='store_true',
+                        help='Ignore the cached catalog and fetch it again')
+    parser.add_argument('--checkpoint-file',
+                        help='File recording completed tables, kept until a run finishes without failed tags '
+                             f'(default with --resume: {ScanCheckpoint.DEFAULT_FILE})')
+    parser.add_argument('--resume', action='store_true',
+                        help='Continue from the checkpoint file, retrying only tags that failed to apply')
+    parser.add_argument('--plan', action='store_true',
+                        help='Detect tags for every table first, then run the tag DDL as batches of concurrent queries')
+    parser.add_argument('--plan-only', action='store_true',
+                        help='Write the tag DDL plan without running it')
+    parser.add_argument('--plan-file', default='tagging_plan.sql',
+                        help='SQL file the tag DDL plan is written to')
+    parser.add_argument('--plan-batch-size', type=int, default=500,
+                        help='Number of plan statements submitted together before waiting for them to finish')
+    parser.add_argument('--ddl-warehouse',
+                        help='Warehouse to run the plan\'s tag DDL on (default: the connection\'s warehouse)')
     parser.add_argument('--output', default='tagging_results.json', 
                         help='Output file for tagging results')
-    parser.add_argument('--output-format', default='json', choices=['json', 'csv'], 
+    parser.add_argument('--output-format', default='json', choices=['json', 'jsonl', 'csv'], 
                         help='Output file format')
+    parser.add_argument('--metrics-out', nargs='+',
+                        help='Files the run\'s phase timings and counters are written to: '
+                             'a JSON summary for .json paths, Prometheus text format otherwise')
+    parser.add_argument('--query-ledger',
+                        help='JSONL file every SQL statement is appended to with its latency, rows and query id')
     
     args = parser.parse_args()
     
+    plan_mode = args.plan or args.plan_only
+    if plan_mode and (args.async_queries > 0 or args.state_file or args.resume or args.checkpoint_file):
+        parser.error('--plan and --plan-only cannot be combined with --async-queries, --state-file, --resume '
+                     'or --checkpoint-file')
+    if args.async_queries > 0 and (args.workers > 1 or args.sampling_mode == 'column'):
+        parser.error('--async-queries keeps tables in flight on one connection and samples whole tables; '
+                     'it cannot be combined with --workers or --sampling-mode column')
+    
+    metrics = RunMetrics()
+    query_ledger = None
+    detector = None
+    
     try:
+        # Record every statement the run sends if requested
+        if args.query_ledger:
+            query_ledger = QueryLedger(args.query_ledger)
+        
         # Load database configuration
         with open(args.config, 'r') as f:
             db_configs = json.load(f)
         
         # Create rule loader and detector
         rule_loader = RuleLoader(args.rules)
-        detector = PIIDetector(rule_loader)
+        detector = PIIDetector(rule_loader, args.detection_backend, args.sequential_sampling, args.pushdown,
+                               args.name_cache_size, args.detection_processes)
+        if detector.sequential:
+            second_round = detector.sequential.next_sample_size(detector.sequential.initial_sample_size)
+            if args.sample_size < second_round:
+                logger.warning(f"--sample-size {args.sample_size} caps sequential sampling before its second "
+                               f"round of {second_round} rows; use at least {second_round} for unsettled "
+                               f"columns to be sampled again with more rows")
         
         # Load tag overrides
         override_handler = OverrideHandler()
@@ -189,8 +1055,16 @@ def main():
             overrides = {}
             logger.info(f"No override file found at {args.override}, proceeding without overrides")
         
+        # Load the scan state of previous runs for incremental scanning
+        scan_state = None
+        if args.state_file:
+            scan_state = ScanStateStore(args.state_file)
+            scan_state.load()
+        
+        # Open the on-disk catalog cache if requested
+        catalog_cache = CatalogCache(args.catalog_cache, args.catalog_ttl) if args.catalog_cache else None
+        
         # Handle multiple database configurations
-        all_results = {}
         
         # Determine which databases to process
         databases_to_process = []
@@ -219,44 +1093,62 @@ def main():
             # Legacy single database config format
             databases_to_process = [{'name': 'default', 'config': db_configs}]
         
-        # Process each database
-        for db_config in databases_to_process:
-            logger.info(f"Processing database: {db_config['name']}")
-            
-            # Create connector for this database
-            connector = create_connector(args.db_type, db_config['config'])
-            
-            # Process this database - pass rule_loader to process_database
-            results = process_database(connector, detector, rule_loader, overrides, args.schemas, args.sample_size)
-            
-            # Store results for this database
-            all_results[db_config['name']] = results
-        
-        # Export combined results
-        # Flatten nested dictionary for export
-        flat_results = []
-        for db_name, db_results in all_results.items():
-            for schema, schema_results in db_results.items():
-                for result in schema_results:
-                    # Add database name to each result
-                    result['database'] = db_name
-                    flat_results.append(result)
+        # Record completed tables so an interrupted run can be resumed, when asked to
+        checkpoint = None
+        checkpoint_file = args.checkpoint_file or (ScanCheckpoint.DEFAULT_FILE if args.resume else None)
+        if checkpoint_file:
+            checkpoint = ScanCheckpoint(checkpoint_file)
+            checkpoint.open(resume=args.resume)
+        plans = [TagPlan(db_config['name']) if plan_mode else None for db_config in databases_to_process]
         
-        # Use the export function but with our flattened structure
-        if args.output_format.lower() == 'json':
-            with open(args.output, 'w') as f:
-                json.dump(flat_results, f, indent=2)
-        else:  # CSV format
-            import csv
-            with open(args.output, 'w', newline='') as f:
-                if flat_results:
-                    fieldnames = flat_results[0].keys()
-                    writer = csv.DictWriter(f, fieldnames=fieldnames)
-                    writer.writeheader()
-                    writer.writerows(flat_results)
+        try:
+            # Stream results to the output file as each table completes
+            with ResultWriter(args.output, args.output_format) as writer:
+                if args.parallel_databases > 1 and len(databases_to_process) > 1:
+                    # Each database streams to its own part file; parts are appended in configuration order
+                    logger.info(f"Processing up to {args.parallel_databases} databases concurrently")
+                    part_files = [f"{args.output}.{index}.part" for index in range(len(databases_to_process))]
+                    
+                    def run_to_part(db_config: Dict[str, Any], part_file: str, plan: Optional[TagPlan]) -> None:
+                        with ResultWriter(part_file, 'jsonl') as part_writer:
+                            run_database(db_config, args, detector, rule_loader, overrides, scan_state,
+                                         catalog_cache, _timed_sink(part_writer.write, metrics), checkpoint,
+                                         plan, metrics, query_ledger)
+                    
+                    try:
+                        with ThreadPoolExecutor(max_workers=args.parallel_databases) as executor:
+                            futures = [executor.submit(run_to_part, db_config, part_file, plan)
+                                       for db_config, part_file, plan in zip(databases_to_process, part_files, plans)]
+                        
+                        # Keep the tables every database completed, including one that failed, before raising
+                        for part_file in part_files:
+                            if os.path.exists(part_file):
+                                with metrics.phase('export'):
+                                    writer.write_rows(read_jsonl_results(part_file))
+                        for future in futures:
+                            future.result()
+                    finally:
+                        for part_file in part_files:
+                            if os.path.exists(part_file):
+                                os.remove(part_file)
                 else:
-                    writer = csv.writer(f)
-                    writer.writerow(['No results found'])
+                    for db_config, plan in zip(databases_to_process, plans):
+                        run_database(db_config, args, detector, rule_loader, overrides, scan_state,
+                                     catalog_cache, _timed_sink(writer.write, metrics), checkpoint, plan, metrics,
+                                     query_ledger)
+        except BaseException:
+            if checkpoint is not None:
+                checkpoint.close()
+            raise
+        
+        if plan_mode:
+            write_plan_sql(args.plan_file, plans)
+        elif checkpoint is not None and checkpoint.failed_tables:
+            logger.warning(f"Tags failed to apply on {len(checkpoint.failed_tables)} tables, "
+                           f"rerun with --resume --checkpoint-file {checkpoint_file} to retry them")
+            checkpoint.close()
+        elif checkpoint is not None:
+            checkpoint.close(remove=True)
         
         logger.info(f"Successfully processed {len(databases_to_process)} database(s) and saved results to {args.output}")
         print(f"Successfully processed {len(databases_to_process)} database(s) and saved results to {args.output}")
@@ -274,6 +1166,18 @@ def main():
         logger.error(f"Unexpected error: {e}", exc_info=True)
         print(f"Unexpected error occurred: {e}")
         print("Check the logs for more details.")
+    finally:
+        # Failed runs report their metrics too, so they show where the time went before the failure
+        if detector is not None:
+            name_cache = detector.name_cache.info()
+            metrics.increment('name_cache_hits', name_cache['hits'])
+            metrics.increment('name_cache_misses', name_cache['misses'])
+            logger.info(f"Column name cache: {name_cache['hits']} hits, {name_cache['misses']} misses")
+            detector.close()
+        for metrics_file in args.metrics_out or []:
+            metrics.write(metrics_file)
+        if query_ledger is not None:
+            query_ledger.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -14,6 +14,9 @@ from dotenv import load_dotenv
 
 # Import from existing project
 from connectors.snowflake import SnowflakeConnector
+from utils.catalog_cache import CatalogCache
+from utils.metrics import RunMetrics, POLICY_PHASES, POLICY_COUNTERS
+from utils.query_ledger import QueryLedger
 
 # Import policy manager modules
 from policy_manager.policy_loader import PolicyLoader
@@ -59,6 +62,15 @@ def main():
     parser.add_argument('--verbose', '-v', action='store_true', help='Enable verbose logging')
     parser.add_argument('--env-file', default='.env', help='Path to environment variables file')
     parser.add_argument('--schema', help='Schema to use for policy creation (overrides dynamic detection)')
+    parser.add_argument('--catalog-cache', help='SQLite file caching schema/table/column metadata between runs')
+    parser.add_argument('--catalog-ttl', type=float, default=CatalogCache.DEFAULT_TTL,
+                        help='Seconds a cached catalog stays valid')
+    parser.add_argument('--refresh-catalog', action='store_true', help='Ignore the cached catalog and fetch it again')
+    parser.add_argument('--metrics-out', nargs='+',
+                        help='Files the run\'s phase timings and counters are written to: '
+                             'a JSON summary for .json paths, Prometheus text format otherwise')
+    parser.add_argument('--query-ledger',
+                        help='JSONL file every SQL statement is appended to with its latency, rows and query id')
     
     # Policy-specific options
     parser.add_argument('--row-access-only', action='store_true', help='Apply only row access policies')
@@ -135,12 +147,22 @@ def main():
         
         # Create Snowflake connector
         connector = create_connector('snowflake', selected_db['config'])
+        if args.query_ledger:
+            connector.query_ledger = QueryLedger(args.query_ledger)
         connector.connect()
+        metrics = RunMetrics(POLICY_PHASES, POLICY_COUNTERS)
         
         try:
+            # Warm the catalog cache so column data types are looked up locally
+            catalog_cache = None
+            if args.catalog_cache:
+                catalog_cache = CatalogCache(args.catalog_cache, args.catalog_ttl)
+                with metrics.phase('discovery'):
+                    catalog_cache.load(connector, refresh=args.refresh_catalog)
+            
             # Create policy engine and applier
-            policy_engine = PolicyEngine(connector)
-            policy_applier = PolicyApplier(policy_engine)
+            policy_engine = PolicyEngine(connector, catalog_cache)
+            policy_applier = PolicyApplier(policy_engine, metrics)
             
             # If a specific schema was provided, set it as active
             if args.schema:
@@ -173,15 +195,20 @@ def main():
             else:
                 # Apply all policies
                 policy_applier.apply_all_policies(policies)
-                
-            logger.info("Successfully applied policies to Snowflake")
             
+            logger.info("Successfully applied policies to Snowflake")
+        
         finally:
             # Close the connection
             connector.close()
+            if connector.query_ledger is not None:
+                connector.query_ledger.close()
+            # Failed runs report their metrics too, so they show where the time went before the failure
+            for metrics_file in args.metrics_out or []:
+                metrics.write(metrics_file, prefix='policy_manager')
         
         return 0
-        
+    
     except Exception as e:
         logger.error(f"Error: {e}", exc_info=True)
         return 1
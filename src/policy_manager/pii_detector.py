@@ -6,6 +6,8 @@ import re
 import logging
 from typing import Dict, List, Optional, Any, Tuple
 
+from detection.rule_engine import RuleEngine
+
 logger = logging.getLogger(__name__)
 
 class PIIDetector:
@@ -17,6 +19,7 @@ class PIIDetector:
         self.threshold = threshold
         self.name_patterns = {}
         self.data_patterns = {}
+        self.rule_engine = None
         
         # Process rules into usable dictionaries
         self._process_rules()
@@ -40,14 +43,17 @@ class PIIDetector:
                 if pattern:
                     self.data_patterns[pattern] = category
         
+        # Column names are matched case-insensitively
+        self.rule_engine = RuleEngine(self.name_patterns, self.data_patterns, name_flags=re.IGNORECASE)
         logger.debug(f"Loaded {len(self.name_patterns)} name patterns and {len(self.data_patterns)} data patterns")
     
     def detect_from_name(self, column_name: str) -> Optional[str]:
         """Detect PII category based on column name"""
-        for pattern, category in self.name_patterns.items():
-            if re.search(pattern, column_name, re.IGNORECASE):
-                logger.debug(f"Column name '{column_name}' matches pattern '{pattern}'")
-                return category
+        match = self.rule_engine.match_name(column_name)
+        if match:
+            pattern, category = match
+            logger.debug(f"Column name '{column_name}' matches pattern '{pattern}'")
+            return category
         return None
     
     def detect_from_data(self, data_samples: List[Any]) -> Dict[str, int]:
@@ -55,19 +61,7 @@ class PIIDetector:
         Detect PII categories based on data content
         Returns a dictionary of categories and their match counts
         """
-        # Convert all sample data to strings for regex matching
-        str_samples = [str(sample) for sample in data_samples if sample is not None]
-        
-        results = {}
-        for sample in str_samples:
-            for pattern, category in self.data_patterns.items():
-                if re.search(pattern, sample):
-                    if category in results:
-                        results[category] += 1
-                    else:
-                        results[category] = 1
-        
-        return results
+        return self.rule_engine.count_data_matches(data_samples)
     
     def detect_pii(self, column_name: str, sample_data: List[Any]) -> Optional[str]:
         """
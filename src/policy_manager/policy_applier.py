@@ -6,14 +6,22 @@ import logging
 import re
 from typing import Dict, List, Optional, Any, Tuple
 
+from utils.metrics import RunMetrics, POLICY_PHASES, POLICY_COUNTERS
+
 logger = logging.getLogger(__name__)
 
 class PolicyApplier:
     """Applies Snowflake security policies based on configuration"""
     
-    def __init__(self, policy_engine):
-        """Initialize with a policy engine"""
+    def __init__(self, policy_engine, metrics: Optional[RunMetrics] = None):
+        """Initialize with a policy engine, and the metrics that time and count the work done"""
         self.policy_engine = policy_engine
+        self.metrics = metrics or RunMetrics(POLICY_PHASES, POLICY_COUNTERS)
+    
+    def _count_outcome(self, succeeded: bool, counter: str) -> bool:
+        """Count a policy statement as done or failed and pass its outcome on"""
+        self.metrics.increment(counter if succeeded else 'policy_failures')
+        return succeeded
     
     def apply_all_policies(self, policies: Dict[str, Any]) -> bool:
         """Apply all policies from configuration"""
@@ -28,7 +36,8 @@ class PolicyApplier:
         # Get the policy schema - if not specified, use the active schema
         policy_schema = global_settings.get('policy_schema')
         if not policy_schema:
-            policy_schema = self.policy_engine.get_active_schema(database)
+            with self.metrics.phase('discovery'):
+                policy_schema = self.policy_engine.get_active_schema(database)
             if not policy_schema:  # Add check for None
                 policy_schema = "PUBLIC"  # Default to PUBLIC if no schema detected
                 logger.warning("No active schema detected, defaulting to PUBLIC")
@@ -173,14 +182,17 @@ class PolicyApplier:
                     if admin_role != 'ACCOUNTADMIN':
                         expression = expression.replace("current_role() = 'ACCOUNTADMIN'", f"current_role() = '{admin_role}'")
                 
-                if not self.policy_engine.create_category_masking_policy(
-                    database, policy_schema, policy_name, data_type, expression, comment
-                ):
+                with self.metrics.phase('policy_ddl'):
+                    created = self.policy_engine.create_category_masking_policy(
+                        database, policy_schema, policy_name, data_type, expression, comment
+                    )
+                if not self._count_outcome(created, 'policies_created'):
                     success = False
                     continue
             
             # Get columns with this tag category
-            tagged_columns = self.policy_engine.get_tagged_columns(database, tag_name, [category])
+            with self.metrics.phase('discovery'):
+                tagged_columns = self.policy_engine.get_tagged_columns(database, tag_name, [category])
             
             # Apply appropriate masking policy to each column based on its data type
             for column in tagged_columns:
@@ -193,11 +205,13 @@ class PolicyApplier:
                     continue
                 
                 # Apply the policy
-                if not self.policy_engine.apply_masking_policy_by_data_type(
-                    database, policy_schema, policy_name,
-                    column['schema'], column['table'], column['column'],
-                    col_data_type
-                ):
+                with self.metrics.phase('policy_apply'):
+                    applied = self.policy_engine.apply_masking_policy_by_data_type(
+                        database, policy_schema, policy_name,
+                        column['schema'], column['table'], column['column'],
+                        col_data_type
+                    )
+                if not self._count_outcome(applied, 'policies_applied'):
                     success = False
         
         return success
@@ -250,7 +264,8 @@ class PolicyApplier:
         
         try:
             # First, check what tags are available in the database
-            available_tags = self.policy_engine.list_available_tags(database)
+            with self.metrics.phase('discovery'):
+                available_tags = self.policy_engine.list_available_tags(database)
             
             # Verify the specified tag exists
             if tag_name not in [tag.upper() for tag in available_tags]:
@@ -284,12 +299,15 @@ class PolicyApplier:
                 'comment': comment
             }
             
-            if not self.policy_engine.create_row_access_policy(row_policy):
+            with self.metrics.phase('policy_ddl'):
+                created = self.policy_engine.create_row_access_policy(row_policy)
+            if not self._count_outcome(created, 'policies_created'):
                 success = False
                 continue
             
             # Find tables with columns tagged with any of the specified categories
-            tables = self.policy_engine.get_tables_with_tagged_columns(database, tag_name, categories)
+            with self.metrics.phase('discovery'):
+                tables = self.policy_engine.get_tables_with_tagged_columns(database, tag_name, categories)
             
             if not tables:
                 logger.warning(f"No tables found with columns tagged with categories: {categories}")
@@ -305,7 +323,9 @@ class PolicyApplier:
                     'policy_schema': schema  # The schema where the policy is defined
                 }
                 
-                if not self.policy_engine.apply_row_access_policy(table_policy):
+                with self.metrics.phase('policy_apply'):
+                    applied = self.policy_engine.apply_row_access_policy(table_policy)
+                if not self._count_outcome(applied, 'policies_applied'):
                     success = False
         
         return success
@@ -318,12 +338,16 @@ class PolicyApplier:
         
         for policy in policies:
             # Create the policy
-            if not self.policy_engine.create_row_access_policy(policy):
+            with self.metrics.phase('policy_ddl'):
+                created = self.policy_engine.create_row_access_policy(policy)
+            if not self._count_outcome(created, 'policies_created'):
                 success = False
                 continue
             
             # Apply the policy to the specified table
-            if not self.policy_engine.apply_row_access_policy(policy):
+            with self.metrics.phase('policy_apply'):
+                applied = self.policy_engine.apply_row_access_policy(policy)
+            if not self._count_outcome(applied, 'policies_applied'):
                 success = False
         
         return success
@@ -352,15 +376,19 @@ class PolicyApplier:
         logger.info(f"Running PII detection with {len(rules)} rule categories")
         
         # Run PII detection
-        findings = self.policy_engine.run_pii_detection(rules, auto_tagging)
+        with self.metrics.phase('pii_detection'):
+            findings = self.policy_engine.run_pii_detection(rules, auto_tagging)
+        total_findings = sum(len(schema_findings) for schema_findings in findings.values())
+        self.metrics.increment('pii_columns_found', total_findings)
         
         # Apply tags if auto-tagging is enabled
         if auto_tagging.get('enabled', False):
-            tagged_count = self.policy_engine.apply_pii_tags(findings, auto_tagging)
+            with self.metrics.phase('tag_ddl'):
+                tagged_count = self.policy_engine.apply_pii_tags(findings, auto_tagging)
+            self.metrics.increment('tags_applied', tagged_count)
             logger.info(f"Auto-tagged {tagged_count} columns with PII tags")
         else:
             # Just log the findings
-            total_findings = sum(len(schema_findings) for schema_findings in findings.values())
             logger.info(f"Found {total_findings} PII columns (auto-tagging disabled)")
         
         return success
\ No newline at end of file
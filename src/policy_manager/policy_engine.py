@@ -10,9 +10,10 @@ logger = logging.getLogger(__name__)
 class PolicyEngine:
     """Executes Snowflake security policies"""
     
-    def __init__(self, connector):
-        """Initialize with a database connector"""
+    def __init__(self, connector, catalog_cache=None):
+        """Initialize with a database connector and an optional on-disk catalog cache"""
         self.connector = connector
+        self.catalog_cache = catalog_cache
         self._active_schema = None
     
     def get_tagged_columns(self, database: str, tag_name: str, categories: List[str]) -> List[Dict[str, str]]:
@@ -21,7 +22,7 @@ class PolicyEngine:
         Using SNOWFLAKE.ACCOUNT_USAGE.TAG_REFERENCES view with improved detection
         """
         try:
-            cursor = self.connector.conn.cursor()
+            cursor = self.connector.cursor()
             
             # Convert tag_name to uppercase for case-insensitive comparison
             tag_name_upper = tag_name.upper()
@@ -124,7 +125,7 @@ class PolicyEngine:
         This bypasses ACCOUNT_USAGE and might pick up more recent changes
         """
         try:
-            cursor = self.connector.conn.cursor()
+            cursor = self.connector.cursor()
             
             # Convert inputs for case-insensitive matching
             tag_name_upper = tag_name.upper()
@@ -197,7 +198,7 @@ class PolicyEngine:
     def list_schemas(self, database: str) -> List[str]:
         """List all schemas in the database"""
         try:
-            cursor = self.connector.conn.cursor()
+            cursor = self.connector.cursor()
             sql = f"SHOW SCHEMAS IN DATABASE {database}"
             cursor.execute(sql)
             schemas = [row[1] for row in cursor.fetchall()]
@@ -211,9 +212,16 @@ class PolicyEngine:
     
     def get_column_data_types(self, database: str, schema: str, table: str) -> Dict[str, str]:
         """Get data types for all columns in a table"""
+        # Serve the lookup from the catalog cache when it has a fresh copy of the table
+        if self.catalog_cache:
+            account = self.connector.config.get('account', '')
+            cached_types = self.catalog_cache.get_column_types(account, database, schema, table)
+            if cached_types is not None:
+                return cached_types
+        
         data_types = {}
         try:
-            cursor = self.connector.conn.cursor()
+            cursor = self.connector.cursor()
             sql = f"""
             SELECT COLUMN_NAME, DATA_TYPE 
             FROM {database}.INFORMATION_SCHEMA.COLUMNS 
@@ -241,7 +249,7 @@ class PolicyEngine:
         
         # If no active schema is set, try to detect the current schema
         try:
-            cursor = self.connector.conn.cursor()
+            cursor = self.connector.cursor()
             cursor.execute("SELECT CURRENT_SCHEMA()")
             current_schema = cursor.fetchone()[0]
             self._active_schema = current_schema
@@ -273,7 +281,7 @@ class PolicyEngine:
     def create_row_access_policy(self, policy: Dict[str, str]) -> bool:
         """Create a row access policy"""
         try:
-            cursor = self.connector.conn.cursor()
+            cursor = self.connector.cursor()
             
             name = policy.get('name')
             database = policy.get('database')
@@ -324,7 +332,7 @@ class PolicyEngine:
     def apply_row_access_policy(self, policy: Dict[str, str]) -> bool:
         """Apply a row access policy to a table"""
         try:
-            cursor = self.connector.conn.cursor()
+            cursor = self.connector.cursor()
             
             name = policy.get('name')
             database = policy.get('database')
@@ -356,7 +364,7 @@ class PolicyEngine:
                                       data_type: str, expression: str, comment: str = '') -> bool:
         """Create a masking policy for a specific data type and category"""
         try:
-            cursor = self.connector.conn.cursor()
+            cursor = self.connector.cursor()
             
             # Fix: Changed how we check if the policy exists
             policy_name = f"{name}_{data_type}"
@@ -402,7 +410,7 @@ class PolicyEngine:
                                         schema: str, table: str, column: str, data_type: str) -> bool:
         """Apply a masking policy to a column based on its data type"""
         try:
-            cursor = self.connector.conn.cursor()
+            cursor = self.connector.cursor()
             
             # Full policy name includes the data type
             full_policy_name = f"{policy_name}_{data_type}"
@@ -427,7 +435,7 @@ class PolicyEngine:
     def list_available_tags(self, database: str) -> List[str]:
         """List all available tags in the database"""
         try:
-            cursor = self.connector.conn.cursor()
+            cursor = self.connector.cursor()
             
             # Query to get all unique tag names
             sql = f"""
@@ -0,0 +1,202 @@
+"""
+Catalog cache module for keeping schema, table and column metadata on disk between runs.
+"""
+
+import os
+import time
+import sqlite3
+import logging
+from contextlib import closing
+from typing import Dict, List, Optional, Any
+
+logger = logging.getLogger(__name__)
+
+class CatalogCache:
+    """
+    SQLite-backed cache of column metadata keyed by account and database
+    Entries older than the TTL are treated as missing and fetched again
+    """
+    
+    DEFAULT_TTL = 3600
+    
+    def __init__(self, filepath: str, ttl_seconds: float = DEFAULT_TTL):
+        """Initialize with the path of the cache database and the entry lifetime in seconds"""
+        self.filepath = filepath
+        self.ttl_seconds = ttl_seconds
+        
+        directory = os.path.dirname(filepath)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        with closing(self._connect()) as conn, conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS catalogs (
+                    account TEXT NOT NULL,
+                    database_name TEXT NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    PRIMARY KEY (account, database_name)
+                );
+                CREATE TABLE IF NOT EXISTS schemas (
+                    account TEXT NOT NULL,
+                    database_name TEXT NOT NULL,
+                    schema_name TEXT NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    PRIMARY KEY (account, database_name, schema_name)
+                );
+                CREATE TABLE IF NOT EXISTS columns (
+                    account TEXT NOT NULL,
+                    database_name TEXT NOT NULL,
+                    schema_name TEXT NOT NULL,
+                    table_name TEXT NOT NULL,
+                    ordinal INTEGER NOT NULL,
+                    column_name TEXT NOT NULL,
+                    data_type TEXT,
+                    nullable TEXT
+                );
+                CREATE INDEX IF NOT EXISTS idx_columns_table
+                    ON columns (account, database_name, schema_name, table_name);
+            """)
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection to the cache; each call gets its own so threads never share one"""
+        return sqlite3.connect(self.filepath, timeout=30)
+    
+    def _fresh_since(self) -> float:
+        """Oldest fetch time that is still within the TTL"""
+        return time.time() - self.ttl_seconds
+    
+    def get_catalog(self, account: str, database: str,
+                    schemas: Optional[List[str]] = None) -> Optional[Dict[str, Dict[str, List[Dict[str, str]]]]]:
+        """
+        Get a cached catalog in the shape of DatabaseConnector.get_catalog
+        Returns None if any requested part is missing or older than the TTL
+        """
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT fetched_at FROM catalogs WHERE account = ? AND database_name = ?",
+                (account, database)
+            ).fetchone()
+            whole_catalog_fresh = row is not None and row[0] >= self._fresh_since()
+            
+            if schemas:
+                cached = {
+                    name.upper(): name for name, fetched_at in conn.execute(
+                        "SELECT schema_name, fetched_at FROM schemas WHERE account = ? AND database_name = ?",
+                        (account, database)
+                    ) if whole_catalog_fresh or fetched_at >= self._fresh_since()
+                }
+                if any(schema.upper() not in cached for schema in schemas):
+                    return None
+                schema_names = [cached[schema.upper()] for schema in schemas]
+            elif whole_catalog_fresh:
+                schema_names = [name for (name,) in conn.execute(
+                    "SELECT schema_name FROM schemas WHERE account = ? AND database_name = ? ORDER BY schema_name",
+                    (account, database)
+                )]
+            else:
+                return None
+            
+            catalog = {schema: {} for schema in schema_names}
+            for schema in schema_names:
+                rows = conn.execute(
+                    "SELECT table_name, column_name, data_type, nullable FROM columns "
+                    "WHERE account = ? AND database_name = ? AND schema_name = ? ORDER BY table_name, ordinal",
+                    (account, database, schema)
+                )
+                for table, column, data_type, nullable in rows:
+                    catalog[schema].setdefault(table, []).append({
+                        'name': column,
+                        'type': data_type,
+                        'nullable': nullable
+                    })
+        
+        logger.info(f"Using cached catalog for {account}/{database} from {self.filepath}")
+        return catalog
+    
+    def store_catalog(self, account: str, database: str, catalog: Dict[str, Dict[str, List[Dict[str, str]]]],
+                      complete: bool = True) -> None:
+        """
+        Replace the cached metadata of every schema in the catalog
+        complete marks the catalog as covering every schema of the database
+        """
+        fetched_at = time.time()
+        with closing(self._connect()) as conn, conn:
+            if complete:
+                # Schemas that no longer exist must not linger in a complete catalog
+                conn.execute("DELETE FROM columns WHERE account = ? AND database_name = ?", (account, database))
+                conn.execute("DELETE FROM schemas WHERE account = ? AND database_name = ?", (account, database))
+                conn.execute(
+                    "INSERT OR REPLACE INTO catalogs (account, database_name, fetched_at) VALUES (?, ?, ?)",
+                    (account, database, fetched_at)
+                )
+            
+            for schema, tables in catalog.items():
+                conn.execute(
+                    "DELETE FROM columns WHERE account = ? AND database_name = ? AND schema_name = ?",
+                    (account, database, schema)
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO schemas (account, database_name, schema_name, fetched_at) VALUES (?, ?, ?, ?)",
+                    (account, database, schema, fetched_at)
+                )
+                conn.executemany(
+                    "INSERT INTO columns (account, database_name, schema_name, table_name, ordinal, column_name, "
+                    "data_type, nullable) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (account, database, schema, table, ordinal, column_info['name'],
+                         column_info.get('type'), column_info.get('nullable'))
+                        for table, columns in tables.items()
+                        for ordinal, column_info in enumerate(columns)
+                    ]
+                )
+        
+        table_count = sum(len(tables) for tables in catalog.values())
+        logger.info(f"Cached catalog of {table_count} tables for {account}/{database} in {self.filepath}")
+    
+    def get_column_types(self, account: str, database: str, schema: str, table: str) -> Optional[Dict[str, str]]:
+        """
+        Get the data types of a table's columns from the cache
+        Returns None if the table's schema is not cached or is older than the TTL
+        """
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT s.fetched_at, c.fetched_at FROM schemas s "
+                "LEFT JOIN catalogs c ON c.account = s.account AND c.database_name = s.database_name "
+                "WHERE s.account = ? AND s.database_name = ? AND UPPER(s.schema_name) = UPPER(?)",
+                (account, database, schema)
+            ).fetchone()
+            if row is None or max(row[0], row[1] or 0) < self._fresh_since():
+                return None
+            
+            rows = conn.execute(
+                "SELECT column_name, data_type FROM columns "
+                "WHERE account = ? AND database_name = ? AND UPPER(schema_name) = UPPER(?) AND table_name = ?",
+                (account, database, schema, table)
+            )
+            data_types = {column: data_type for column, data_type in rows}
+            # A table the cache has never seen is left to the caller to look up
+            return data_types or None
+    
+    def invalidate(self, account: str, database: str) -> None:
+        """Drop everything cached for a database"""
+        with closing(self._connect()) as conn, conn:
+            for table in ('columns', 'schemas', 'catalogs'):
+                conn.execute(f"DELETE FROM {table} WHERE account = ? AND database_name = ?", (account, database))
+    
+    def load(self, connector: Any, schemas: Optional[List[str]] = None,
+             refresh: bool = False) -> Dict[str, Dict[str, List[Dict[str, str]]]]:
+        """
+        Get the catalog for a connector's database, from the cache when fresh
+        Otherwise the connector is asked for it and the result is cached
+        """
+        account = connector.config.get('account', '')
+        database = connector.config.get('database', '')
+        
+        if not refresh:
+            catalog = self.get_catalog(account, database, schemas)
+            if catalog is not None:
+                return catalog
+        
+        catalog = connector.get_catalog(schemas)
+        self.store_catalog(account, database, catalog, complete=not schemas)
+        return catalog
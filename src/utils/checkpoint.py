@@ -0,0 +1,106 @@
+"""
+Checkpoint module for resuming interrupted scans from the tables they completed.
+"""
+
+import os
+import json
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class ScanCheckpoint:
+    """
+    Append-only JSONL log of completed (database, schema, table) units
+    Each line holds a table's applied and failed result rows; the last line for a table wins
+    """
+    
+    # Checkpoint file used by --resume when no file is named
+    DEFAULT_FILE = 'tagging_checkpoint.jsonl'
+    
+    def __init__(self, filepath: str):
+        """Initialize with the path of the checkpoint file"""
+        self.filepath = filepath
+        self.completed: Dict[Tuple[str, str, str], Tuple[List[Dict[str, str]], List[Dict[str, str]]]] = {}
+        self.failed_tables = set()
+        self._lock = threading.Lock()
+        self._file = None
+    
+    def open(self, resume: bool = False) -> None:
+        """
+        Start writing the checkpoint
+        With resume, the units completed by the previous run are loaded first and the file is appended to
+        """
+        if resume:
+            self._load()
+            self._drop_partial_line()
+        elif os.path.exists(self.filepath):
+            logger.info(f"Starting a new checkpoint at {self.filepath}, the previous one is discarded")
+        
+        directory = os.path.dirname(self.filepath)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(self.filepath, 'a' if resume else 'w')
+    
+    def _load(self) -> None:
+        """Read the completed units of a previous run"""
+        if not os.path.exists(self.filepath):
+            logger.info(f"No checkpoint found at {self.filepath}, starting from the beginning")
+            return
+        
+        with open(self.filepath, 'r') as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A run killed mid-write leaves a partial last line
+                    logger.warning(f"Ignoring unreadable checkpoint line {line_number} in {self.filepath}")
+                    continue
+                key = (entry['database'], entry['schema'], entry['table'])
+                self.completed[key] = (entry.get('applied', []), entry.get('failed', []))
+        
+        self.failed_tables = {key for key, (_, failed) in self.completed.items() if failed}
+        logger.info(f"Resuming from {len(self.completed)} completed tables in {self.filepath}, "
+                    f"{len(self.failed_tables)} with tags to retry")
+    
+    def _drop_partial_line(self) -> None:
+        """Cut off a last line a killed run left unfinished, so appended entries start on a line of their own"""
+        if not os.path.exists(self.filepath):
+            return
+        with open(self.filepath, 'rb+') as f:
+            content = f.read()
+            if content and not content.endswith(b'\n'):
+                f.truncate(content.rfind(b'\n') + 1)
+    
+    def get(self, database: str, schema: str,
+            table: str) -> Optional[Tuple[List[Dict[str, str]], List[Dict[str, str]]]]:
+        """Return the applied and failed rows of a table completed by the previous run, or None"""
+        with self._lock:
+            return self.completed.get((database, schema, table))
+    
+    def record(self, database: str, schema: str, table: str,
+               applied: List[Dict[str, str]], failed: List[Dict[str, str]]) -> None:
+        """Append a completed table and flush it to disk right away"""
+        entry = {'database': database, 'schema': schema, 'table': table, 'applied': applied, 'failed': failed}
+        with self._lock:
+            self._file.write(json.dumps(entry) + '\n')
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            
+            if failed:
+                self.failed_tables.add((database, schema, table))
+            else:
+                self.failed_tables.discard((database, schema, table))
+    
+    def close(self, remove: bool = False) -> None:
+        """Close the checkpoint, deleting it when the scan it tracks is finished"""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            if remove and os.path.exists(self.filepath):
+                os.remove(self.filepath)
+                logger.info(f"Scan complete, removed checkpoint {self.filepath}")
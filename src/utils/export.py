@@ -5,10 +5,92 @@ Export module for saving tagging results.
 import csv
 import json
 import logging
-from typing import Dict, List, Any
+import os
+import threading
+from typing import Dict, List, Any, Iterable, Iterator, Optional
 
 logger = logging.getLogger(__name__)
 
+class ResultWriter:
+    """
+    Streams result rows to a file as they are produced
+    Supports 'json' (one array, same layout as json.dump with indent=2), 'jsonl' and 'csv'
+    (columns sorted by name, taken from the first row unless fieldnames are given).
+    Rows go to a temporary file that replaces filepath on close, so an interrupted
+    run never leaves a truncated file behind.
+    """
+    
+    def __init__(self, filepath: str, format_type: str = 'json', flush_every: int = 100,
+                 fieldnames: Optional[List[str]] = None):
+        """Open the temporary output file and write any header the format needs"""
+        self.filepath = filepath
+        self.format_type = format_type.lower()
+        if self.format_type not in ('json', 'jsonl', 'csv'):
+            raise ValueError(f"Unsupported export format: {format_type}")
+        
+        self.flush_every = max(1, flush_every)
+        self.count = 0
+        self.fieldnames = fieldnames
+        self._lock = threading.Lock()
+        self._temp_path = f"{filepath}.tmp"
+        self._file = open(self._temp_path, 'w', newline='' if self.format_type == 'csv' else None)
+        self._csv_writer = None
+        
+        if self.format_type == 'json':
+            self._file.write('[')
+    
+    def write(self, row: Dict[str, str]) -> None:
+        """Append one result row, flushing to disk every flush_every rows"""
+        with self._lock:
+            if self.format_type == 'csv':
+                if self._csv_writer is None:
+                    self._write_csv_header(self.fieldnames or sorted(row))
+                self._csv_writer.writerow(row)
+            elif self.format_type == 'jsonl':
+                self._file.write(json.dumps(row) + '\n')
+            else:
+                separator = ',\n' if self.count else '\n'
+                self._file.write(separator + '  ' + json.dumps(row, indent=2).replace('\n', '\n  '))
+            
+            self.count += 1
+            if self.count % self.flush_every == 0:
+                self._file.flush()
+    
+    def _write_csv_header(self, fieldnames: List[str]) -> None:
+        """Start the CSV file once its columns are known"""
+        self._csv_writer = csv.DictWriter(self._file, fieldnames=fieldnames, extrasaction='ignore')
+        self._csv_writer.writeheader()
+    
+    def write_rows(self, rows: Iterable[Dict[str, str]]) -> None:
+        """Append several result rows"""
+        for row in rows:
+            self.write(row)
+    
+    def close(self) -> None:
+        """Finish the file, close it and move it into place"""
+        with self._lock:
+            if self._file.closed:
+                return
+            if self.format_type == 'json':
+                self._file.write('\n]' if self.count else ']')
+            elif self.format_type == 'csv' and self._csv_writer is None:
+                self._write_csv_header(self.fieldnames or [])
+            self._file.close()
+            os.replace(self._temp_path, self.filepath)
+    
+    def __enter__(self) -> 'ResultWriter':
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+def read_jsonl_results(filepath: str) -> Iterator[Dict[str, str]]:
+    """Read result rows back from a JSONL file one at a time"""
+    with open(filepath, 'r') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
 def export_results(results: Dict[str, List[Dict[str, str]]], 
                   filepath: str, format_type: str = 'json') -> bool:
     """
@@ -17,21 +99,18 @@ def export_results(results: Dict[str, List[Dict[str, str]]],
     Args:
         results: Dictionary of results by schema
         filepath: Path to output file
-        format_type: Output format ('json' or 'csv')
+        format_type: Output format ('json', 'jsonl' or 'csv')
     
     Returns:
         bool: Success status
     """
     try:
-        # Flatten results for easier export
-        flat_results = []
-        for schema, schema_results in results.items():
-            flat_results.extend(schema_results)
-        
         if format_type.lower() == 'csv':
-            return export_to_csv(flat_results, filepath)
+            return export_to_csv(_flatten(results), filepath)
         elif format_type.lower() == 'json':
-            return export_to_json(flat_results, filepath)
+            return export_to_json(_flatten(results), filepath)
+        elif format_type.lower() == 'jsonl':
+            return export_to_jsonl(_flatten(results), filepath)
         else:
             logger.error(f"Unsupported export format: {format_type}")
             return False
@@ -39,33 +118,31 @@ def export_results(results: Dict[str, List[Dict[str, str]]],
         logger.error(f"Error exporting results: {e}")
         return False
 
-def export_to_csv(results: List[Dict[str, str]], filepath: str) -> bool:
-    """Export results to CSV file"""
+def _flatten(results: Dict[str, List[Dict[str, str]]]) -> Iterator[Dict[str, str]]:
+    """Yield the results of every schema without building a combined list"""
+    for schema, schema_results in results.items():
+        yield from schema_results
+
+def _export(results: Iterable[Dict[str, str]], filepath: str, format_type: str) -> bool:
+    """Stream results to a file in the given format"""
     try:
-        with open(filepath, 'w', newline='') as f:
-            # Extract all possible fieldnames from the results
-            fieldnames = set()
-            for result in results:
-                fieldnames.update(result.keys())
-            
-            writer = csv.DictWriter(f, fieldnames=sorted(fieldnames))
-            writer.writeheader()
-            writer.writerows(results)
+        with ResultWriter(filepath, format_type) as writer:
+            writer.write_rows(results)
         
-        logger.info(f"Exported {len(results)} tagged columns to CSV file: {filepath}")
+        logger.info(f"Exported {writer.count} tagged columns to {format_type.upper()} file: {filepath}")
         return True
     except Exception as e:
-        logger.error(f"Error exporting to CSV: {e}")
+        logger.error(f"Error exporting to {format_type.upper()}: {e}")
         return False
 
-def export_to_json(results: List[Dict[str, str]], filepath: str) -> bool:
+def export_to_csv(results: Iterable[Dict[str, str]], filepath: str) -> bool:
+    """Export results to CSV file"""
+    return _export(results, filepath, 'csv')
+
+def export_to_json(results: Iterable[Dict[str, str]], filepath: str) -> bool:
     """Export results to JSON file"""
-    try:
-        with open(filepath, 'w') as f:
-            json.dump(results, f, indent=2)
-        
-        logger.info(f"Exported {len(results)} tagged columns to JSON file: {filepath}")
-        return True
-    except Exception as e:
-        logger.error(f"Error exporting to JSON: {e}")
-        return False
\ No newline at end of file
+    return _export(results, filepath, 'json')
+
+def export_to_jsonl(results: Iterable[Dict[str, str]], filepath: str) -> bool:
+    """Export results to JSON Lines file"""
+    return _export(results, filepath, 'jsonl')
\ No newline at end of file
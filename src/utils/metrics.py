@@ -0,0 +1,116 @@
+"""
+Metrics module for timing the phases of a run and counting the work it did.
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from datetime import datetime
+from contextlib import contextmanager
+from collections import Counter, defaultdict
+from typing import Dict, Iterator, List, Any
+
+logger = logging.getLogger(__name__)
+
+# Phases and counters reported even when a run never reached them, so dashboards see zeros
+SCAN_PHASES = ['discovery', 'sampling', 'detection', 'override_lookup', 'tag_ddl', 'export']
+SCAN_COUNTERS = ['schemas', 'tables', 'columns', 'columns_skipped_by_type', 'name_cache_hits', 'name_cache_misses',
+                 'samples_fetched', 'rows_fetched', 'sample_values_fetched', 'tags_applied', 'tag_failures']
+POLICY_PHASES = ['discovery', 'policy_ddl', 'policy_apply', 'pii_detection', 'tag_ddl']
+POLICY_COUNTERS = ['policies_created', 'policies_applied', 'policy_failures', 'pii_columns_found', 'tags_applied']
+
+class RunMetrics:
+    """
+    Thread-safe phase timings and counters of one run
+    Phase time is summed over every thread, so concurrent phases can add up to more than the run's wall time
+    """
+    
+    def __init__(self, phases: List[str] = SCAN_PHASES, counters: List[str] = SCAN_COUNTERS):
+        """Initialize with the phases and counters to report even when unused"""
+        self.started_at = datetime.now()
+        self._started = time.perf_counter()
+        self.phase_seconds: Dict[str, float] = defaultdict(float, {phase: 0.0 for phase in phases})
+        self.phase_calls: Counter = Counter({phase: 0 for phase in phases})
+        self.counters: Counter = Counter({counter: 0 for counter in counters})
+        self._lock = threading.Lock()
+    
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time the enclosed block as part of a phase"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+    
+    def add_time(self, name: str, seconds: float, calls: int = 1) -> None:
+        """Add time measured elsewhere to a phase"""
+        with self._lock:
+            self.phase_seconds[name] += seconds
+            self.phase_calls[name] += calls
+    
+    def increment(self, name: str, amount: int = 1) -> None:
+        """Add to a counter"""
+        with self._lock:
+            self.counters[name] += amount
+    
+    def summary(self) -> Dict[str, Any]:
+        """Get the metrics as a JSON-serializable dictionary"""
+        with self._lock:
+            return {
+                'started_at': self.started_at.isoformat(timespec='seconds'),
+                'wall_seconds': round(time.perf_counter() - self._started, 3),
+                'phases': {
+                    name: {'seconds': round(seconds, 3), 'calls': self.phase_calls[name]}
+                    for name, seconds in self.phase_seconds.items()
+                },
+                'counters': dict(self.counters)
+            }
+    
+    def to_prometheus(self, prefix: str = 'metadata_tagger') -> str:
+        """Render the metrics in the Prometheus text exposition format"""
+        summary = self.summary()
+        lines = [
+            f"# HELP {prefix}_run_seconds Wall-clock duration of the run.",
+            f"# TYPE {prefix}_run_seconds gauge",
+            f"{prefix}_run_seconds {summary['wall_seconds']}",
+            f"# HELP {prefix}_phase_seconds_total Time spent in each phase, summed over threads.",
+            f"# TYPE {prefix}_phase_seconds_total counter"
+        ]
+        lines.extend(f'{prefix}_phase_seconds_total{{phase="{name}"}} {phase["seconds"]}'
+                     for name, phase in summary['phases'].items())
+        lines.extend([
+            f"# HELP {prefix}_phase_calls_total Number of times each phase was entered.",
+            f"# TYPE {prefix}_phase_calls_total counter"
+        ])
+        lines.extend(f'{prefix}_phase_calls_total{{phase="{name}"}} {phase["calls"]}'
+                     for name, phase in summary['phases'].items())
+        for name, value in summary['counters'].items():
+            lines.extend([f"# TYPE {prefix}_{name}_total counter", f"{prefix}_{name}_total {value}"])
+        return '\n'.join(lines) + '\n'
+    
+    def write(self, filepath: str, prefix: str = 'metadata_tagger') -> bool:
+        """
+        Write the metrics to a file, as a JSON summary if it ends in .json and in Prometheus text format otherwise
+        The file is replaced atomically so a scraper never reads a partial one
+        """
+        try:
+            directory = os.path.dirname(filepath)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            
+            temp_path = f"{filepath}.tmp"
+            with open(temp_path, 'w') as f:
+                if filepath.lower().endswith('.json'):
+                    json.dump(self.summary(), f, indent=2)
+                else:
+                    f.write(self.to_prometheus(prefix))
+            os.replace(temp_path, filepath)
+            
+            logger.info(f"Wrote run metrics to {filepath}")
+            return True
+        except Exception as e:
+            logger.error(f"Error writing metrics to {filepath}: {e}")
+            return False
@@ -0,0 +1,271 @@
+"""
+Query ledger module for recording every SQL statement a run sends, with its latency and rows.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import logging
+import argparse
+import threading
+from datetime import datetime
+from collections import defaultdict
+from typing import Dict, List, Optional, Any, Iterator, Tuple
+
+logger = logging.getLogger(__name__)
+
+# String literals can hold tag values, policy expressions or credentials
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+
+def redact_sql(sql: str) -> str:
+    """Replace the string literals of a statement with ? so the ledger never holds data values, on one line"""
+    return ' '.join(STRING_LITERAL.sub('?', sql).split())
+
+def statement_kind(sql: str) -> str:
+    """Classify a statement by its leading keyword, e.g. SHOW, DESCRIBE, SELECT or ALTER"""
+    keyword = sql.lstrip(' \t\r\n(').split(None, 1)[0].upper() if sql.strip() else ''
+    if keyword == 'DESC':
+        return 'DESCRIBE'
+    if keyword == 'WITH':
+        return 'SELECT'
+    return keyword or 'UNKNOWN'
+
+class QueryLedger:
+    """
+    Thread-safe JSONL log of executed statements
+    Each line holds the statement's kind, redacted text, query id, elapsed seconds and rows returned
+    """
+    
+    def __init__(self, filepath: str):
+        """Initialize with the path of the ledger file, which is appended to"""
+        self.filepath = filepath
+        self._lock = threading.Lock()
+        # Statements submitted asynchronously, keyed by query id, until their results are read
+        self._submitted: Dict[str, Tuple[str, float]] = {}
+        
+        directory = os.path.dirname(filepath)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(filepath, 'a')
+    
+    def wrap(self, cursor: Any) -> 'LedgerCursor':
+        """Wrap a DB-API cursor so the statements it runs are recorded"""
+        return LedgerCursor(cursor, self)
+    
+    def record(self, sql: str, query_id: Optional[str], elapsed: float, rows: Optional[int],
+               error: Optional[str] = None) -> None:
+        """Append one executed statement to the ledger"""
+        entry = {
+            'timestamp': datetime.now().isoformat(timespec='milliseconds'),
+            'kind': statement_kind(sql),
+            'query_id': query_id,
+            'elapsed_seconds': round(elapsed, 6),
+            'rows': rows,
+            'sql': redact_sql(sql)
+        }
+        if error is not None:
+            # Driver errors may quote the statement, literals included
+            entry['error'] = redact_sql(error)
+        
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(json.dumps(entry) + '\n')
+            self._file.flush()
+    
+    def submitted(self, query_id: str, sql: str) -> None:
+        """Remember an asynchronously submitted statement until its results are fetched"""
+        with self._lock:
+            self._submitted[query_id] = (sql, time.perf_counter())
+    
+    def take_submitted(self, query_id: str) -> Optional[Tuple[str, float]]:
+        """Get and forget the statement and submission time of an asynchronous query"""
+        with self._lock:
+            return self._submitted.pop(query_id, None)
+    
+    def fail_submitted(self, query_id: str, error: Exception) -> None:
+        """Record an asynchronous query that failed before its results could be fetched"""
+        submitted = self.take_submitted(query_id)
+        if submitted is not None:
+            sql, started = submitted
+            self.record(sql, query_id, time.perf_counter() - started, None, error=str(error))
+    
+    def close(self) -> None:
+        """Close the ledger file"""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+                logger.info(f"Recorded executed statements in query ledger {self.filepath}")
+
+class LedgerCursor:
+    """
+    Cursor wrapper that records each statement in a QueryLedger
+    A statement is recorded when the next one runs or the cursor closes, so its elapsed time
+    includes fetching its rows; anything else is passed through to the wrapped cursor.
+    """
+    
+    def __init__(self, cursor: Any, ledger: QueryLedger):
+        """Initialize with the cursor to wrap and the ledger to record into"""
+        self._cursor = cursor
+        self._ledger = ledger
+        self._pending: Optional[Dict[str, Any]] = None
+    
+    def __getattr__(self, name: str) -> Any:
+        """Pass attributes such as sfqid, rowcount and description through to the wrapped cursor"""
+        return getattr(self._cursor, name)
+    
+    def __iter__(self) -> Iterator[Any]:
+        """Iterate over the rows of the current statement, counting them"""
+        if self._pending is not None:
+            self._pending['fetched'] = True
+        for row in self._cursor:
+            if self._pending is not None:
+                self._pending['rows'] += 1
+            yield row
+    
+    def _start(self, sql: str, started: float, query_id: Optional[str] = None) -> None:
+        """Track a statement whose rows may still be fetched"""
+        self._pending = {'sql': sql, 'started': started, 'query_id': query_id, 'rows': 0, 'fetched': False}
+    
+    def _finish(self) -> None:
+        """Record the tracked statement, if any"""
+        if self._pending is None:
+            return
+        pending, self._pending = self._pending, None
+        # Statements whose rows were never fetched report the driver's row count, e.g. rows altered
+        rows = pending['rows'] if pending['fetched'] else getattr(self._cursor, 'rowcount', None)
+        # A later submission moves the cursor's sfqid on, so asynchronous queries keep their own id
+        query_id = pending['query_id'] or getattr(self._cursor, 'sfqid', None)
+        self._ledger.record(pending['sql'], query_id, time.perf_counter() - pending['started'], rows)
+    
+    def execute(self, command: str, *args, **kwargs) -> Any:
+        """Run a statement, recording it in the ledger even if it fails"""
+        self._finish()
+        started = time.perf_counter()
+        try:
+            result = self._cursor.execute(command, *args, **kwargs)
+        except Exception as e:
+            self._ledger.record(command, getattr(self._cursor, 'sfqid', None), time.perf_counter() - started,
+                                None, error=str(e))
+            raise
+        self._start(command, started)
+        # Drivers return the cursor itself for chaining; keep the chain on the wrapper
+        return self if result is self._cursor else result
+    
+    def execute_async(self, command: str, *args, **kwargs) -> Any:
+        """Submit a statement; it is recorded once its results are fetched by query id, or now if rejected"""
+        self._finish()
+        started = time.perf_counter()
+        try:
+            result = self._cursor.execute_async(command, *args, **kwargs)
+        except Exception as e:
+            self._ledger.record(command, getattr(self._cursor, 'sfqid', None), time.perf_counter() - started,
+                                None, error=str(e))
+            raise
+        self._ledger.submitted(self._cursor.sfqid, command)
+        return result
+    
+    def get_results_from_sfqid(self, query_id: str) -> Any:
+        """Attach to an asynchronous query's results, timing it from its submission"""
+        self._finish()
+        submitted = self._ledger.take_submitted(query_id)
+        result = self._cursor.get_results_from_sfqid(query_id)
+        if submitted is not None:
+            self._start(*submitted, query_id)
+        return result
+    
+    def _fetched(self, rows: List[Any]) -> List[Any]:
+        """Count fetched rows towards the current statement"""
+        if self._pending is not None:
+            self._pending['rows'] += len(rows)
+            self._pending['fetched'] = True
+        return rows
+    
+    def fetchone(self) -> Any:
+        """Fetch the next row"""
+        row = self._cursor.fetchone()
+        self._fetched([row] if row is not None else [])
+        return row
+    
+    def fetchmany(self, *args, **kwargs) -> List[Any]:
+        """Fetch the next batch of rows"""
+        return self._fetched(self._cursor.fetchmany(*args, **kwargs))
+    
+    def fetchall(self) -> List[Any]:
+        """Fetch the remaining rows"""
+        return self._fetched(self._cursor.fetchall())
+    
+    def close(self) -> Any:
+        """Record the last statement and close the wrapped cursor"""
+        self._finish()
+        return self._cursor.close()
+
+def read_ledger(filepath: str) -> Iterator[Dict[str, Any]]:
+    """Read the entries of a ledger, skipping lines a killed run left partial"""
+    with open(filepath, 'r') as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning(f"Ignoring unreadable ledger line {line_number} in {filepath}")
+
+def summarize_ledger(entries: Iterator[Dict[str, Any]], top: int = 20) -> Dict[str, Any]:
+    """Get the top slowest statements and the count, time, rows and errors per statement kind"""
+    slowest = []
+    kinds = defaultdict(lambda: {'statements': 0, 'elapsed_seconds': 0.0, 'rows': 0, 'errors': 0})
+    for entry in entries:
+        totals = kinds[entry.get('kind', 'UNKNOWN')]
+        totals['statements'] += 1
+        totals['elapsed_seconds'] += entry.get('elapsed_seconds') or 0.0
+        totals['rows'] += entry.get('rows') or 0
+        totals['errors'] += 1 if 'error' in entry else 0
+        slowest.append(entry)
+        # Trim now and then so a large ledger is never held whole
+        if len(slowest) > max(top, 1) * 20:
+            slowest = sorted(slowest, key=lambda item: item.get('elapsed_seconds') or 0.0, reverse=True)[:top]
+    
+    slowest = sorted(slowest, key=lambda item: item.get('elapsed_seconds') or 0.0, reverse=True)[:top]
+    for totals in kinds.values():
+        totals['elapsed_seconds'] = round(totals['elapsed_seconds'], 6)
+    ordered = sorted(kinds.items(), key=lambda item: item[1]['elapsed_seconds'], reverse=True)
+    return {'slowest': slowest, 'kinds': dict(ordered)}
+
+def main():
+    """Print the slowest statements of a ledger and the totals per statement kind"""
+    parser = argparse.ArgumentParser(description='Summarize a query ledger')
+    parser.add_argument('ledger', help='Query ledger file (JSONL)')
+    parser.add_argument('--top', type=int, default=20, help='Number of slowest statements to show')
+    parser.add_argument('--width', type=int, default=120, help='Characters of each statement to show')
+    parser.add_argument('--json', action='store_true', help='Print the summary as JSON')
+    args = parser.parse_args()
+    
+    if not os.path.exists(args.ledger):
+        print(f"Error: File not found: {args.ledger}")
+        sys.exit(1)
+    summary = summarize_ledger(read_ledger(args.ledger), args.top)
+    
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+    
+    print(f"Top {len(summary['slowest'])} slowest statements:")
+    for entry in summary['slowest']:
+        marker = ' FAILED' if 'error' in entry else ''
+        print(f"  {entry.get('elapsed_seconds', 0):10.3f}s  {str(entry.get('rows')):>8} rows  "
+              f"{entry.get('query_id') or '-'}{marker}")
+        print(f"      {entry.get('sql', '')[:args.width]}")
+    
+    print("\nTotals per kind:")
+    print(f"  {'KIND':<12}{'STATEMENTS':>12}{'SECONDS':>12}{'AVG MS':>10}{'ROWS':>12}{'ERRORS':>8}")
+    for kind, totals in summary['kinds'].items():
+        average_ms = 1000 * totals['elapsed_seconds'] / totals['statements'] if totals['statements'] else 0
+        print(f"  {kind:<12}{totals['statements']:>12}{totals['elapsed_seconds']:>12.3f}{average_ms:>10.1f}"
+              f"{totals['rows']:>12}{totals['errors']:>8}")
+
+if __name__ == "__main__":
+    main()
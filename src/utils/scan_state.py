@@ -0,0 +1,97 @@
+"""
+Scan state module for remembering table fingerprints and tag decisions between runs.
+"""
+
+import os
+import json
+import logging
+import threading
+from typing import Dict, List, Optional, Any, Tuple
+
+logger = logging.getLogger(__name__)
+
+class ScanStateStore:
+    """
+    Persists, per table, the fingerprint it was scanned with and the tags applied to it
+    A table whose fingerprint is unchanged on the next run can reuse its earlier results
+    """
+    
+    VERSION = 1
+    
+    def __init__(self, filepath: str):
+        """Initialize with the path of the JSON state file"""
+        self.filepath = filepath
+        self.tables: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+    
+    def load(self) -> bool:
+        """Load state from disk, starting empty if the file is missing or unreadable"""
+        if not os.path.exists(self.filepath):
+            logger.info(f"No scan state found at {self.filepath}, every table will be scanned")
+            return False
+        try:
+            with open(self.filepath, 'r') as f:
+                state = json.load(f)
+            if state.get('version') != self.VERSION:
+                logger.warning(f"Ignoring scan state with unsupported version {state.get('version')}")
+                return False
+            self.tables = state.get('tables', {})
+            logger.info(f"Loaded scan state for {len(self.tables)} tables from {self.filepath}")
+            return True
+        except Exception as e:
+            logger.error(f"Error loading scan state from {self.filepath}: {e}")
+            return False
+    
+    def save(self) -> bool:
+        """Write state to disk atomically so an interrupted save keeps the previous file"""
+        try:
+            with self._lock:
+                state = {'version': self.VERSION, 'tables': self.tables}
+                temp_path = f"{self.filepath}.tmp"
+                with open(temp_path, 'w') as f:
+                    json.dump(state, f)
+                os.replace(temp_path, self.filepath)
+            logger.info(f"Saved scan state for {len(self.tables)} tables to {self.filepath}")
+            return True
+        except Exception as e:
+            logger.error(f"Error saving scan state to {self.filepath}: {e}")
+            return False
+    
+    def _key(self, database: str, schema: str, table: str) -> str:
+        """Build the state key of a table"""
+        return f"{database}.{schema}.{table}"
+    
+    def prune(self, database: str, tables: List[Tuple[str, str]], schemas: Optional[List[str]] = None) -> int:
+        """
+        Forget the tables of a database that are no longer in its catalog, so dropped tables do not pile up
+        With schemas, only tables in those schemas are considered, as the others were not listed.
+        Returns the number of tables forgotten.
+        """
+        prefix = f"{database}."
+        kept = {self._key(database, schema, table) for schema, table in tables}
+        listed = {schema.upper() for schema in schemas} if schemas else None
+        with self._lock:
+            dropped = [key for key in self.tables
+                       if key.startswith(prefix) and key not in kept
+                       and (listed is None or key[len(prefix):].split('.', 1)[0].upper() in listed)]
+            for key in dropped:
+                del self.tables[key]
+        return len(dropped)
+    
+    def get_unchanged(self, database: str, schema: str, table: str,
+                      fingerprint: Dict[str, Any]) -> Optional[List[Dict[str, str]]]:
+        """Return the previous results for a table if its fingerprint has not changed, otherwise None"""
+        with self._lock:
+            entry = self.tables.get(self._key(database, schema, table))
+        if entry and entry.get('fingerprint') == fingerprint:
+            return [dict(result) for result in entry.get('results', [])]
+        return None
+    
+    def record(self, database: str, schema: str, table: str, fingerprint: Dict[str, Any],
+               results: List[Dict[str, str]]) -> None:
+        """Remember the fingerprint and results of a scanned table"""
+        with self._lock:
+            self.tables[self._key(database, schema, table)] = {
+                'fingerprint': fingerprint,
+                'results': [dict(result) for result in results]
+            }
@@ -0,0 +1,66 @@
+"""
+Tag plan module for collecting tag DDL before it is executed.
+"""
+
+import logging
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+class TagPlan:
+    """
+    Tag DDL decided for the tables of one database, kept apart from its execution
+    Each planned table holds its tag decisions, the statement defining the tag and the tagging statement
+    """
+    
+    def __init__(self, database: str):
+        """Initialize an empty plan for a database"""
+        self.database = database
+        self.tables: List[Dict[str, object]] = []
+    
+    def add_table(self, schema: str, table: str, tag_name: str, tag_schema: str,
+                  decisions: List[Tuple[str, Tuple[str, str]]], definition: str, statement: str) -> None:
+        """Add a table's tag decisions, in column order, with the DDL that applies them"""
+        self.tables.append({
+            'schema': schema,
+            'table': table,
+            'tag_name': tag_name,
+            'tag_schema': tag_schema,
+            'decisions': decisions,
+            'definition': definition,
+            'statement': statement
+        })
+    
+    def definitions(self) -> List[str]:
+        """Get the distinct tag definitions the plan needs, in first-use order"""
+        return list(dict.fromkeys(planned['definition'] for planned in self.tables))
+    
+    def statements(self) -> List[str]:
+        """Get the tagging statements, one per table"""
+        return [planned['statement'] for planned in self.tables]
+
+def write_plan_sql(filepath: str, plans: List[TagPlan]) -> bool:
+    """
+    Write plans to a SQL script, tag definitions before the statements that use them
+    Each tagging statement is preceded by comments giving the reason for every column
+    """
+    try:
+        with open(filepath, 'w') as f:
+            f.write(f"-- Tag plan generated {datetime.now().isoformat(timespec='seconds')}\n")
+            for plan in plans:
+                f.write(f"\n-- Database: {plan.database} ({len(plan.tables)} tables)\n")
+                for definition in plan.definitions():
+                    f.write(f"{definition};\n")
+                for planned in plan.tables:
+                    f.write(f"\n-- {planned['schema']}.{planned['table']}\n")
+                    for column_name, (tag_value, reason) in planned['decisions']:
+                        f.write(f"--   {column_name} = '{tag_value}': {reason}\n")
+                    f.write(f"{planned['statement']};\n")
+        
+        table_count = sum(len(plan.tables) for plan in plans)
+        logger.info(f"Wrote tag plan for {table_count} tables to {filepath}")
+        return True
+    except Exception as e:
+        logger.error(f"Error writing tag plan to {filepath}: {e}")
+        return False
@@ -0,0 +1,60 @@
+"""
+Shared test setup: the tagger runs from src/, so its packages are imported from there.
+"""
+
+import os
+import sys
+import shutil
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+from connectors.synthetic import SyntheticConnector
+from detection.detector import PIIDetector
+from detection.rule_loader import RuleLoader
+
+RULES_PATH = os.path.join(ROOT, 'config', 'tag_rules.yaml')
+
+class RulesFile:
+    """Copy of the shipped rules that a test may edit"""
+    
+    def __init__(self, path):
+        shutil.copy(RULES_PATH, path)
+        self.path = str(path)
+    
+    def replace(self, old, new):
+        """Replace text in the rules, which must contain it"""
+        with open(self.path) as f:
+            rules = f.read()
+        assert old in rules, f"{old} is not in the rules"
+        with open(self.path, 'w') as f:
+            f.write(rules.replace(old, new))
+
+@pytest.fixture
+def rules_path():
+    """Path of the shipped rules"""
+    return RULES_PATH
+
+@pytest.fixture
+def rules_file(tmp_path):
+    return RulesFile(tmp_path / 'tag_rules.yaml')
+
+@pytest.fixture
+def rule_loader(rules_path):
+    return RuleLoader(rules_path)
+
+@pytest.fixture
+def detector(rule_loader):
+    """Detector with the shipped rules and default settings"""
+    return PIIDetector(rule_loader)
+
+@pytest.fixture
+def make_connector():
+    """Build connected synthetic connectors from their configuration"""
+    def make(**config):
+        connector = SyntheticConnector(config)
+        connector.connect()
+        return connector
+    return make
@@ -0,0 +1,72 @@
+"""
+Tests for the on-disk catalog cache and its time-to-live.
+"""
+
+import types
+
+import pytest
+
+from utils import catalog_cache
+from utils.catalog_cache import CatalogCache
+from connectors.synthetic import SyntheticConnector
+
+CATALOG = {
+    'PUBLIC': {'CUSTOMER': [{'name': 'EMAIL', 'type': 'TEXT', 'nullable': 'Y'}]},
+    'SALES': {'ORDERS': [{'name': 'ID', 'type': 'NUMBER', 'nullable': 'N'}]}
+}
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Settable clock standing in for time.time() in the cache module"""
+    clock = types.SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(catalog_cache, 'time', types.SimpleNamespace(time=lambda: clock.now))
+    return clock
+
+def test_catalog_is_served_until_it_expires(tmp_path, clock):
+    cache = CatalogCache(str(tmp_path / 'catalog.sqlite'), ttl_seconds=60)
+    cache.store_catalog('acct', 'DB', CATALOG)
+    
+    clock.now += 60
+    assert cache.get_catalog('acct', 'DB') == CATALOG
+    assert cache.get_column_types('acct', 'DB', 'PUBLIC', 'CUSTOMER') == {'EMAIL': 'TEXT'}
+    
+    clock.now += 1
+    assert cache.get_catalog('acct', 'DB') is None
+    assert cache.get_column_types('acct', 'DB', 'PUBLIC', 'CUSTOMER') is None
+
+def test_schemas_expire_on_their_own_fetch_time(tmp_path, clock):
+    cache = CatalogCache(str(tmp_path / 'catalog.sqlite'), ttl_seconds=60)
+    cache.store_catalog('acct', 'DB', {'PUBLIC': CATALOG['PUBLIC']}, complete=False)
+    clock.now += 45
+    cache.store_catalog('acct', 'DB', {'SALES': CATALOG['SALES']}, complete=False)
+    
+    clock.now += 30
+    
+    # A partial catalog never answers for the whole database
+    assert cache.get_catalog('acct', 'DB') is None
+    assert cache.get_catalog('acct', 'DB', ['sales']) == {'SALES': CATALOG['SALES']}
+    assert cache.get_catalog('acct', 'DB', ['PUBLIC', 'SALES']) is None
+
+def test_load_fetches_again_after_expiry(tmp_path, clock):
+    connector = SyntheticConnector({'schemas': 1, 'tables': 2, 'columns': 3})
+    connector.connect()
+    cache = CatalogCache(str(tmp_path / 'catalog.sqlite'), ttl_seconds=60)
+    
+    first = cache.load(connector)
+    clock.now += 30
+    assert cache.load(connector) == first
+    assert connector.query_counts['catalog'] == 1
+    
+    clock.now += 31
+    assert cache.load(connector) == first
+    assert connector.query_counts['catalog'] == 2
+
+def test_refresh_ignores_a_fresh_catalog(tmp_path, clock):
+    connector = SyntheticConnector({'schemas': 1, 'tables': 2, 'columns': 3})
+    connector.connect()
+    cache = CatalogCache(str(tmp_path / 'catalog.sqlite'), ttl_seconds=60)
+    
+    cache.load(connector)
+    cache.load(connector, refresh=True)
+    
+    assert connector.query_counts['catalog'] == 2
@@ -0,0 +1,114 @@
+"""
+Tests for recording completed tables and resuming interrupted scans from them.
+"""
+
+import os
+import sys
+import json
+
+import pytest
+
+import metadata_tagger
+from utils.checkpoint import ScanCheckpoint
+
+def row(table, column, tag_value='PII - Customer Information'):
+    return {'schema': 'PUBLIC', 'table': table, 'column': column, 'tag_name': 'PII', 'tag_value': tag_value,
+            'reason': 'test'}
+
+def test_resume_loads_completed_tables(tmp_path):
+    path = str(tmp_path / 'checkpoint.jsonl')
+    checkpoint = ScanCheckpoint(path)
+    checkpoint.open()
+    checkpoint.record('DB', 'PUBLIC', 'CUSTOMER', [row('CUSTOMER', 'EMAIL')], [])
+    checkpoint.record('DB', 'PUBLIC', 'ORDERS', [], [row('ORDERS', 'PHONE')])
+    checkpoint.close()
+    
+    resumed = ScanCheckpoint(path)
+    resumed.open(resume=True)
+    
+    assert resumed.get('DB', 'PUBLIC', 'CUSTOMER') == ([row('CUSTOMER', 'EMAIL')], [])
+    assert resumed.get('DB', 'PUBLIC', 'ORDERS') == ([], [row('ORDERS', 'PHONE')])
+    assert resumed.get('DB', 'PUBLIC', 'OTHER') is None
+    assert resumed.failed_tables == {('DB', 'PUBLIC', 'ORDERS')}
+    resumed.close()
+
+def test_resume_ignores_a_truncated_last_line(tmp_path):
+    path = str(tmp_path / 'checkpoint.jsonl')
+    checkpoint = ScanCheckpoint(path)
+    checkpoint.open()
+    checkpoint.record('DB', 'PUBLIC', 'CUSTOMER', [row('CUSTOMER', 'EMAIL')], [])
+    checkpoint.close()
+    # A run killed while writing the next table leaves half a line behind
+    with open(path, 'a') as f:
+        f.write(json.dumps({'database': 'DB', 'schema': 'PUBLIC', 'table': 'ORDERS', 'applied': []})[:30])
+    
+    resumed = ScanCheckpoint(path)
+    resumed.open(resume=True)
+    resumed.record('DB', 'PUBLIC', 'ORDERS', [row('ORDERS', 'PHONE')], [])
+    resumed.close()
+    
+    again = ScanCheckpoint(path)
+    again.open(resume=True)
+    assert again.get('DB', 'PUBLIC', 'CUSTOMER') == ([row('CUSTOMER', 'EMAIL')], [])
+    assert again.get('DB', 'PUBLIC', 'ORDERS') == ([row('ORDERS', 'PHONE')], [])
+    again.close()
+
+def test_last_line_for_a_table_wins(tmp_path):
+    path = str(tmp_path / 'checkpoint.jsonl')
+    checkpoint = ScanCheckpoint(path)
+    checkpoint.open()
+    checkpoint.record('DB', 'PUBLIC', 'ORDERS', [], [row('ORDERS', 'PHONE')])
+    checkpoint.record('DB', 'PUBLIC', 'ORDERS', [row('ORDERS', 'PHONE')], [])
+    assert checkpoint.failed_tables == set()
+    checkpoint.close()
+    
+    resumed = ScanCheckpoint(path)
+    resumed.open(resume=True)
+    assert resumed.get('DB', 'PUBLIC', 'ORDERS') == ([row('ORDERS', 'PHONE')], [])
+    assert resumed.failed_tables == set()
+    resumed.close()
+
+def test_open_without_resume_discards_the_previous_checkpoint(tmp_path):
+    path = str(tmp_path / 'checkpoint.jsonl')
+    checkpoint = ScanCheckpoint(path)
+    checkpoint.open()
+    checkpoint.record('DB', 'PUBLIC', 'CUSTOMER', [row('CUSTOMER', 'EMAIL')], [])
+    checkpoint.close()
+    
+    fresh = ScanCheckpoint(path)
+    fresh.open()
+    fresh.close()
+    
+    resumed = ScanCheckpoint(path)
+    resumed.open(resume=True)
+    assert resumed.completed == {}
+    resumed.close()
+
+@pytest.fixture
+def run_main(monkeypatch, tmp_path, rules_path):
+    """Run the tagger's command line against a small synthetic database from tmp_path"""
+    config_path = tmp_path / 'database_config.json'
+    config_path.write_text(json.dumps({'database': 'SYNTHETIC', 'schemas': 1, 'tables': 3, 'columns': 4}))
+    monkeypatch.chdir(tmp_path)
+    
+    def run(*arguments):
+        monkeypatch.setattr(sys, 'argv', ['metadata_tagger.py', '--db-type', 'synthetic', '--config', str(config_path),
+                                          '--rules', rules_path, '--sample-size', '20', *arguments])
+        metadata_tagger.main()
+    return run
+
+def test_no_checkpoint_is_written_unless_asked_for(monkeypatch, tmp_path, run_main):
+    opened = []
+    open_checkpoint = ScanCheckpoint.open
+    monkeypatch.setattr(ScanCheckpoint, 'open', lambda self, resume=False: (opened.append(self.filepath),
+                                                                            open_checkpoint(self, resume)))
+    
+    run_main()
+    assert opened == []
+    
+    run_main('--checkpoint-file', 'run.jsonl')
+    run_main('--resume')
+    assert opened == ['run.jsonl', ScanCheckpoint.DEFAULT_FILE]
+    # Both runs finished with every tag applied, so their checkpoints are gone
+    assert not os.path.exists(tmp_path / 'run.jsonl')
+    assert not os.path.exists(tmp_path / ScanCheckpoint.DEFAULT_FILE)
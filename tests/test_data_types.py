@@ -0,0 +1,104 @@
+"""
+Tests for limiting data rules to the column types they can match.
+"""
+
+import logging
+
+import pytest
+
+import metadata_tagger
+from detection.data_types import DEFAULT_DATA_TYPES, applicable_rules, parse_data_types, type_family
+from detection.detector import PIIDetector
+from detection.rule_loader import RuleLoader
+from utils.metrics import RunMetrics
+
+RULES = """
+categories:
+  - id: "contact"
+    name: "Contact"
+data_patterns:
+  - pattern: '@'
+    category_id: "contact"
+  - pattern: '\\d{3}-\\d{4}'
+    category_id: "contact"
+    data_types: ["text", "NUMBER(38,0)"]
+"""
+
+@pytest.mark.parametrize('data_type, family', [
+    ('VARCHAR(16777216)', 'text'), ('text', 'text'), ('NUMBER(38,0)', 'number'), (' double precision ', 'float'),
+    ('TIMESTAMP_NTZ(9)', 'timestamp'), ('VARIANT', 'semi_structured'), ('GEOGRAPHY', 'geospatial'),
+    ('INTERVAL', None), ('', None), (None, None)
+])
+def test_column_types_belong_to_families(data_type, family):
+    assert type_family(data_type) == family
+
+def test_rule_data_types_accept_families_and_column_types(caplog):
+    with caplog.at_level(logging.WARNING):
+        families = parse_data_types(['text', 'Number', 'VARCHAR(20)', 'TIMESTAMP_LTZ', 'bogus'], 'pattern')
+    
+    assert families == frozenset({'text', 'number', 'timestamp'})
+    assert "Ignoring unknown data type 'bogus' for pattern pattern" in caplog.text
+
+def test_rules_apply_to_the_families_they_list():
+    rule_types = [None, frozenset({'text'}), frozenset({'text', 'number'})]
+    
+    assert applicable_rules(rule_types, 'VARCHAR') is None
+    assert applicable_rules(rule_types, 'NUMBER(10,2)') == [0, 2]
+    assert applicable_rules(rule_types, 'BOOLEAN') == [0]
+    # Columns of a missing or unknown type are matched against every rule
+    assert applicable_rules(rule_types, None) is None
+    assert applicable_rules(rule_types, 'INTERVAL') is None
+
+@pytest.mark.parametrize('default_types, expected', [
+    (None, frozenset(DEFAULT_DATA_TYPES)), (['text'], frozenset({'text'}))
+])
+def test_rules_without_data_types_use_the_default_ones(tmp_path, default_types, expected):
+    path = tmp_path / 'rules.yaml'
+    path.write_text(RULES + (f"default_data_types: {default_types}\n" if default_types else ""))
+    
+    rule_loader = RuleLoader(str(path))
+    rule_loader.load_rules()
+    
+    assert rule_loader.data_pattern_types == {'@': expected, r'\d{3}-\d{4}': frozenset({'text', 'number'})}
+
+def test_rules_skip_columns_of_other_types(detector):
+    addresses = ['10.0.0.1'] * 10
+    
+    assert detector.get_tag_from_data(addresses, 'VARCHAR')[0] == 'PII - Technical Data'
+    assert detector.get_tag_from_data(addresses, 'NUMBER') is None
+    assert detector.get_tag_from_data(addresses) is not None
+    assert detector.get_tags_from_table_sample({'a': addresses, 'b': addresses}, {'a': 'NUMBER'}) == {
+        'b': detector.get_tag_from_data(addresses)
+    }
+
+def test_columns_no_rule_applies_to_are_not_sampled(detector, make_connector, monkeypatch):
+    assert detector.has_data_rules('VARCHAR') and detector.has_data_rules(None)
+    assert not detector.has_data_rules('BOOLEAN') and not detector.has_data_rules('TIMESTAMP_NTZ')
+    connector = make_connector(schemas=1, tables=1, columns=16, pii_ratio=0.0, seed=6)
+    columns = connector.get_columns('SCHEMA_0', 'TABLE_0')
+    sampled = []
+    get_table_sample_with_rows = connector.get_table_sample_with_rows
+    
+    def sample(schema, table, names, *args):
+        sampled.extend(names)
+        return get_table_sample_with_rows(schema, table, names, *args)
+    
+    monkeypatch.setattr(connector, 'get_table_sample_with_rows', sample)
+    metrics = RunMetrics()
+    
+    metadata_tagger.detect_table(connector, detector, {}, 'SYNTHETIC', 'SCHEMA_0', 'TABLE_0', columns, 20,
+                                 metrics=metrics)
+    
+    skipped = [column['name'] for column in columns if not detector.has_data_rules(column['type'])]
+    assert skipped and sampled
+    assert set(sampled) == {column['name'] for column in columns} - set(skipped)
+    assert metrics.counters['columns_skipped_by_type'] == len(skipped)
+
+def test_rules_for_no_column_type_mean_nothing_to_sample(tmp_path):
+    path = tmp_path / 'rules.yaml'
+    path.write_text(RULES + "default_data_types: ['text']\n")
+    detector = PIIDetector(RuleLoader(str(path)))
+    
+    assert detector.has_data_rules('NUMBER')
+    assert not detector.has_data_rules('FLOAT')
+    assert not PIIDetector(RuleLoader(str(tmp_path / 'missing.yaml'))).has_data_rules('VARCHAR')
@@ -0,0 +1,35 @@
+"""
+Tests for deciding column tags from the data rules their samples match.
+"""
+
+import pytest
+
+from detection.detector import PIIDetector
+
+# IP addresses come first in the sample, but the SSN rule comes before the IP address rule
+TIED_SAMPLE = ['10.0.0.1'] * 30 + ['123-45-6789'] * 30 + ['plain text'] * 140
+WINNER = ('PII - Customer Information', "Data pattern match: 30/200 samples")
+
+@pytest.mark.parametrize('sample', [TIED_SAMPLE, TIED_SAMPLE[::-1]])
+def test_passing_category_of_the_first_matching_rule_wins(detector, sample):
+    assert detector.detect_from_data(sample) == {'PII - Customer Information': 30, 'PII - Technical Data': 30}
+    assert detector.get_tag_from_data(sample) == WINNER
+    assert detector.get_tags_from_table_sample({'value': sample}) == {'value': WINNER}
+
+def test_pandas_backend_breaks_ties_by_rule_order(rule_loader):
+    detector = PIIDetector(rule_loader, backend='pandas')
+    
+    assert detector.get_tags_from_table_sample({'value': TIED_SAMPLE, 'other': TIED_SAMPLE[::-1]}) == {
+        'value': WINNER, 'other': WINNER
+    }
+
+def test_settled_tag_breaks_ties_by_rule_order(detector):
+    assert detector.settle_tag_from_data(TIED_SAMPLE) == (True, WINNER)
+    assert detector.settle_tag_from_data(TIED_SAMPLE[::-1]) == (True, WINNER)
+
+def test_match_counts_break_ties_by_rule_order(detector):
+    engine = detector.rule_loader.get_rule_engine()
+    match_counts = {'value': {'count': len(TIED_SAMPLE), 'matches': engine.count_rule_matches(TIED_SAMPLE)}}
+    
+    assert detector.get_pushdown_rules().client == []
+    assert detector.get_tags_from_match_counts(match_counts) == {'value': WINNER}
@@ -0,0 +1,85 @@
+"""
+Tests for matching table samples against the data rules in worker processes.
+"""
+
+import pytest
+
+from detection.detector import PIIDetector
+from detection.executor import DetectionExecutor
+from detection.rule_loader import RuleLoader
+
+def table_sample(rows):
+    """Sample of a table with PII and plain columns"""
+    return {
+        'contact': [f"user{i}@example.com" for i in range(rows)],
+        'reference': [f"{100 + i % 800:03d}-{10 + i % 90}-{1000 + i % 9000}" for i in range(rows)],
+        'host': [f"10.0.{i % 250}.{i % 200}" for i in range(rows)],
+        'status': ['OPEN'] * rows
+    }
+
+@pytest.fixture
+def detectors(rule_loader, detector):
+    parallel = PIIDetector(rule_loader, processes=2)
+    yield parallel, detector
+    parallel.close()
+
+def test_at_least_two_processes_are_required(rule_loader):
+    with pytest.raises(ValueError):
+        DetectionExecutor(rule_loader, 1)
+
+def test_small_samples_are_matched_in_process(detectors):
+    parallel, in_process = detectors
+    sample = table_sample(100)
+    
+    assert not parallel.executor.should_parallelize(sample)
+    assert parallel.get_tags_from_table_sample(sample) == in_process.get_tags_from_table_sample(sample)
+    assert parallel.get_settled_tags(sample) == in_process.get_settled_tags(sample)
+    assert parallel.executor._pool is None
+
+def test_single_columns_are_matched_in_process(detectors):
+    parallel, _ = detectors
+    
+    sample = {'contact': ['a@example.com'] * DetectionExecutor.MIN_PARALLEL_VALUES}
+    
+    assert not parallel.executor.should_parallelize(sample)
+
+def test_batches_keep_column_order_and_balance_values(rule_loader):
+    executor = DetectionExecutor(rule_loader, 3)
+    sample = {'a': [1] * 10, 'b': [1] * 10, 'c': [1] * 10, 'd': [1] * 10, 'e': [1]}
+    
+    batches = executor._batches(sample)
+    
+    assert [list(batch) for batch in batches] == [['a', 'b'], ['c', 'd'], ['e']]
+    assert len(executor._batches({'a': [1], 'b': [1], 'c': [1], 'd': [1], 'e': [1], 'f': [1]})) == 3
+
+def test_large_samples_are_matched_in_worker_processes(detectors, monkeypatch):
+    parallel, in_process = detectors
+    monkeypatch.setattr(DetectionExecutor, 'MIN_PARALLEL_VALUES', 100)
+    sample = table_sample(100)
+    
+    decisions = in_process.get_tags_from_table_sample(sample)
+    
+    assert sorted(decisions) == ['contact', 'host', 'reference']
+    assert parallel.get_tags_from_table_sample(sample) == decisions
+    assert parallel.get_settled_tags(sample) == in_process.get_settled_tags(sample)
+    assert parallel.executor._pool is not None
+
+def test_workers_use_the_rules_of_the_main_process(rules_file, monkeypatch):
+    monkeypatch.setattr(DetectionExecutor, 'MIN_PARALLEL_VALUES', 100)
+    rule_loader = RuleLoader(rules_file.path)
+    parallel = PIIDetector(rule_loader, processes=2)
+    sample = table_sample(100)
+    try:
+        assert parallel.get_tags_from_table_sample(sample)['host'][0] == 'PII - Technical Data'
+        
+        rules_file.replace('name: "PII - Technical Data"', 'name: "PII - Network Data"')
+        rule_loader.reload()
+        # Workers take the reloaded rules from the main process, not from the file
+        with open(rules_file.path, 'w') as f:
+            f.write('categories: [')
+        
+        decisions = parallel.get_tags_from_table_sample(sample)
+        assert decisions['host'][0] == 'PII - Network Data'
+        assert decisions == PIIDetector(rule_loader).get_tags_from_table_sample(sample)
+    finally:
+        parallel.close()
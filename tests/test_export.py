@@ -0,0 +1,70 @@
+"""
+Tests for streaming result rows to JSON, JSON Lines and CSV files.
+"""
+
+import csv
+import json
+
+import pytest
+
+from utils.export import ResultWriter, export_results, read_jsonl_results
+
+ROWS = [
+    {'schema': 'PUBLIC', 'table': 'CUSTOMER', 'column': 'EMAIL', 'tag_name': 'PII', 'tag_value': 'PII - Contact',
+     'reason': 'Column name pattern: EMAIL', 'database': 'DB'},
+    {'schema': 'PUBLIC', 'table': 'CUSTOMER', 'column': 'NOTE', 'tag_name': 'PII', 'tag_value': 'PII - Contact',
+     'reason': 'Data pattern match: 3/4 samples, "quoted", comma', 'database': 'DB'}
+]
+
+def read_back(path, format_type):
+    with open(path, newline='') as f:
+        if format_type == 'csv':
+            return list(csv.DictReader(f))
+        if format_type == 'json':
+            return json.load(f)
+    return list(read_jsonl_results(path))
+
+@pytest.mark.parametrize('format_type', ['json', 'jsonl', 'csv'])
+@pytest.mark.parametrize('rows', [ROWS, []])
+def test_written_rows_read_back_unchanged(tmp_path, format_type, rows):
+    path = str(tmp_path / f'results.{format_type}')
+    
+    with ResultWriter(path, format_type, flush_every=1) as writer:
+        writer.write_rows(rows)
+    
+    assert writer.count == len(rows)
+    assert read_back(path, format_type) == rows
+    assert not (tmp_path / f'results.{format_type}.tmp').exists()
+
+@pytest.mark.parametrize('rows', [ROWS, []])
+def test_files_match_the_previous_export_layout(tmp_path, rows):
+    assert export_results({'PUBLIC': rows}, str(tmp_path / 'results.json'), 'json')
+    assert export_results({'PUBLIC': rows}, str(tmp_path / 'results.csv'), 'csv')
+    
+    assert (tmp_path / 'results.json').read_text() == json.dumps(rows, indent=2)
+    with open(tmp_path / 'expected.csv', 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=sorted({key for row in rows for key in row}))
+        writer.writeheader()
+        writer.writerows(rows)
+    assert (tmp_path / 'results.csv').read_text() == (tmp_path / 'expected.csv').read_text()
+
+def test_unfinished_file_does_not_replace_the_output(tmp_path):
+    path = tmp_path / 'results.json'
+    path.write_text('[]')
+    
+    writer = ResultWriter(str(path), 'json', flush_every=1)
+    writer.write(ROWS[0])
+    
+    assert path.read_text() == '[]'
+    writer.close()
+    assert json.loads(path.read_text()) == ROWS[:1]
+
+def test_rows_written_before_an_error_are_kept(tmp_path):
+    path = str(tmp_path / 'results.json')
+    
+    with pytest.raises(RuntimeError):
+        with ResultWriter(path, 'json') as writer:
+            writer.write(ROWS[0])
+            raise RuntimeError('connection lost')
+    
+    assert read_back(path, 'json') == ROWS[:1]
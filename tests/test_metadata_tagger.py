@@ -0,0 +1,73 @@
+"""
+Tests for the table scanning loop of the metadata tagger.
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+
+import pytest
+
+import metadata_tagger
+
+def test_concurrent_scan_cancels_queued_tables_when_a_table_fails(make_connector):
+    units = [('SCHEMA_0', f"TABLE_{index}", []) for index in range(40)]
+    scanned = []
+    lock = threading.Lock()
+    
+    def scan_unit(connector, schema, table, columns):
+        with lock:
+            scanned.append(table)
+        time.sleep(0.02)
+        if table == 'TABLE_0':
+            raise RuntimeError('table failed')
+        return table
+    
+    with pytest.raises(RuntimeError):
+        for _ in metadata_tagger._process_tables_concurrently(make_connector(), units, scan_unit, 2):
+            pass
+    
+    # Give any table still queued the time it would take to run
+    time.sleep(0.3)
+    assert len(scanned) < len(units)
+
+def test_concurrent_scan_yields_tables_in_order(make_connector):
+    units = [('SCHEMA_0', f"TABLE_{index}", []) for index in range(10)]
+    
+    def scan_unit(connector, schema, table, columns):
+        time.sleep(0.01 * (10 - int(table.split('_')[1])))
+        return table
+    
+    outcomes = list(metadata_tagger._process_tables_concurrently(make_connector(), units, scan_unit, 4))
+    
+    assert outcomes == [((schema, table), table) for schema, table, _ in units]
+
+def test_failed_parallel_database_keeps_the_results_of_completed_ones(monkeypatch, tmp_path, rules_path):
+    config_path = tmp_path / 'database_config.json'
+    config_path.write_text(json.dumps({'databases': [
+        {'name': name, 'config': {'database': name, 'schemas': 1, 'tables': 3, 'columns': 6, 'pii_ratio': 0.5}}
+        for name in ['A', 'B', 'C']
+    ]}))
+    monkeypatch.chdir(tmp_path)
+    run_database = metadata_tagger.run_database
+    
+    def fail_after_b(db_config, *args):
+        results = run_database(db_config, *args)
+        if db_config['name'] == 'B':
+            raise RuntimeError('connection lost')
+        return results
+    
+    monkeypatch.setattr(metadata_tagger, 'run_database', fail_after_b)
+    monkeypatch.setattr(sys, 'argv', ['metadata_tagger.py', '--db-type', 'synthetic', '--config', str(config_path),
+                                      '--rules', rules_path, '--sample-size', '20', '--parallel-databases', '3',
+                                      '--output', 'results.jsonl', '--output-format', 'jsonl'])
+    
+    metadata_tagger.main()
+    
+    with open(tmp_path / 'results.jsonl') as f:
+        databases = [json.loads(line)['database'] for line in f]
+    assert set(databases) == {'A', 'B', 'C'}
+    assert databases == sorted(databases)
+    assert sorted(os.listdir(tmp_path)) == ['database_config.json', 'results.jsonl']
@@ -0,0 +1,72 @@
+"""
+Tests for the phase timings and work counters written with --metrics-out.
+"""
+
+import json
+
+import pytest
+
+import metadata_tagger
+from utils.metrics import RunMetrics, SCAN_COUNTERS, SCAN_PHASES
+
+@pytest.fixture
+def metrics():
+    metrics = RunMetrics()
+    with metrics.phase('sampling'):
+        pass
+    metrics.add_time('detection', 1.5, calls=3)
+    metrics.increment('tables', 2)
+    metrics.increment('rows_fetched', 40)
+    return metrics
+
+def test_json_summary_holds_every_phase_and_counter(metrics, tmp_path):
+    path = tmp_path / 'metrics' / 'run.json'
+    
+    assert metrics.write(str(path))
+    
+    summary = json.loads(path.read_text())
+    assert set(summary) == {'started_at', 'wall_seconds', 'phases', 'counters'}
+    assert list(summary['phases']) == SCAN_PHASES
+    assert summary['phases']['detection'] == {'seconds': 1.5, 'calls': 3}
+    assert summary['phases']['sampling']['calls'] == 1
+    assert summary['phases']['export'] == {'seconds': 0.0, 'calls': 0}
+    assert summary['counters'] == {**{counter: 0 for counter in SCAN_COUNTERS}, 'tables': 2, 'rows_fetched': 40}
+    assert not (tmp_path / 'metrics' / 'run.json.tmp').exists()
+
+def test_prometheus_file_has_a_sample_per_phase_and_counter(metrics, tmp_path):
+    path = tmp_path / 'run.prom'
+    
+    assert metrics.write(str(path), prefix='tagger')
+    
+    samples = {}
+    for line in path.read_text().splitlines():
+        if not line.startswith('#'):
+            name, value = line.rsplit(' ', 1)
+            samples[name] = float(value)
+    assert samples['tagger_phase_seconds_total{phase="detection"}'] == 1.5
+    assert samples['tagger_phase_calls_total{phase="detection"}'] == 3
+    assert samples['tagger_tables_total'] == 2
+    assert samples['tagger_rows_fetched_total'] == 40
+    assert samples['tagger_tag_failures_total'] == 0
+    assert 'tagger_run_seconds' in samples
+    assert len(samples) == 1 + 2 * len(SCAN_PHASES) + len(SCAN_COUNTERS)
+    assert '# TYPE tagger_rows_fetched_total counter' in path.read_text()
+
+@pytest.mark.parametrize('sampling_mode', ['table', 'column'])
+def test_sampling_counts_rows_fetched_and_values(detector, make_connector, sampling_mode):
+    connector = make_connector(schemas=1, tables=1, columns=5, rows=500, null_ratio=0.5, seed=3)
+    column_names = [column['name'] for column in connector.get_columns('SCHEMA_0', 'TABLE_0')]
+    metrics = RunMetrics()
+    
+    metadata_tagger.detect_from_samples(connector, detector, 'SCHEMA_0', 'TABLE_0', column_names, 50,
+                                        sampling_mode, metrics)
+    
+    counters = metrics.counters
+    if sampling_mode == 'table':
+        # One query fetching 50 rows, some of whose values are null
+        assert (counters['samples_fetched'], counters['rows_fetched']) == (1, 50)
+        assert counters['sample_values_fetched'] < 50 * len(column_names)
+    else:
+        # A query per column, each returning only its non-null values
+        assert counters['samples_fetched'] == len(column_names)
+        assert counters['rows_fetched'] == counters['sample_values_fetched']
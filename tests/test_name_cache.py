@@ -0,0 +1,65 @@
+"""
+Tests for the column name cache and its invalidation when the rules change.
+"""
+
+import pytest
+
+from detection.detector import PIIDetector
+from detection.name_cache import NameCache
+from detection.rule_loader import RuleLoader
+
+def test_cached_decisions_belong_to_one_generation():
+    cache = NameCache()
+    cache.get('email', 1)
+    cache.put('email', 1, 'PII')
+    cache.put('notes', 1, None)
+    
+    assert cache.get('email', 1) == 'PII'
+    assert cache.get('notes', 1) is None
+    assert cache.get('email', 2) is NameCache.MISSING
+    assert cache.info() == {'hits': 2, 'misses': 2, 'invalidations': 1, 'size': 0, 'max_size': 10000}
+
+def test_decisions_of_an_older_generation_are_not_cached():
+    cache = NameCache()
+    cache.get('email', 2)
+    cache.put('email', 1, 'PII')
+    
+    assert cache.get('email', 2) is NameCache.MISSING
+
+def test_least_recently_used_name_is_evicted():
+    cache = NameCache(max_size=2)
+    cache.get('a', 1)
+    cache.put('a', 1, 'A')
+    cache.put('b', 1, 'B')
+    cache.get('a', 1)
+    cache.put('c', 1, 'C')
+    
+    assert cache.get('b', 1) is NameCache.MISSING
+    assert cache.get('a', 1) == 'A' and cache.get('c', 1) == 'C'
+
+def test_zero_size_disables_the_cache():
+    cache = NameCache(max_size=0)
+    cache.get('email', 1)
+    cache.put('email', 1, 'PII')
+    
+    assert cache.get('email', 1) is NameCache.MISSING
+    assert cache.info()['size'] == 0
+
+def test_negative_size_is_rejected():
+    with pytest.raises(ValueError):
+        NameCache(max_size=-1)
+
+def test_detector_forgets_names_when_the_rules_are_reloaded(rules_file):
+    detector = PIIDetector(RuleLoader(rules_file.path))
+    
+    assert detector.detect_from_name('emailaddress') == 'PII - Customer Information'
+    assert detector.detect_from_name('emailaddress') == 'PII - Customer Information'
+    assert detector.name_cache.info()['hits'] == 1
+    
+    generation = detector.rule_loader.generation
+    rules_file.replace("(email|e-mail|mail)(_)?address", "(e-mail|mail)(_)?address")
+    detector.rule_loader.reload()
+    
+    assert detector.rule_loader.generation == generation + 1
+    assert detector.detect_from_name('emailaddress') is None
+    assert detector.name_cache.info()['invalidations'] == 1
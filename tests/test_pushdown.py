@@ -0,0 +1,116 @@
+"""
+Tests for translating data patterns into Snowflake regular expressions.
+"""
+
+import re
+import random
+import threading
+
+import pytest
+
+from connectors.synthetic import compile_regexp_like
+from detection.pushdown import PushdownRules, UnsupportedPattern, translate_pattern
+from detection.rule_engine import RuleEngine
+from detection.rule_loader import RuleLoader
+
+from conftest import RULES_PATH
+
+# Random values over the characters the patterns tell apart, and values each shipped rule should match
+ALPHABET = 'abcxyzABF0123456789 .-_@+()\n\t{}'
+VALUES = [''.join(rng.choice(ALPHABET) for _ in range(rng.randint(0, 14)))
+          for rng in [random.Random(5)] for _ in range(5000)]
+VALUES += ['foo', 'a foo b', 'foobar', 'FOO', '123', 'x123y', '123-45-6789', 'ann.12@example.com', 'abc\n', 'a\nc',
+           '4111 1111 1111 1111', '4111-1111-1111-1111', '10.0.0.1', 'v10.0.0.1', '(555) 123-4567', '+1 555-123-4567']
+
+def rule_patterns():
+    return [pattern for pattern, _, _ in RuleLoader(RULES_PATH).get_rule_engine().data_rules]
+
+def assert_same_matches(pattern):
+    """The translated pattern matches, under REGEXP_LIKE, exactly the values re.search finds the pattern in"""
+    regex, parameters = translate_pattern(pattern)
+    translated = compile_regexp_like(regex, parameters)
+    original = re.compile(pattern)
+    differences = [value for value in VALUES if bool(original.search(value)) != bool(translated.fullmatch(value))]
+    assert not differences, f"{pattern} -> {regex} differs on {differences[:5]}"
+
+@pytest.mark.parametrize('pattern', rule_patterns())
+def test_every_shipped_rule_translates_faithfully(pattern):
+    assert_same_matches(pattern)
+
+@pytest.mark.parametrize('pattern', [
+    r'\bfoo\b', r'\bfoo|bar\b', r'\b[0-9]{3}\b', r'(?:\d{2}|[A-F]{2})\b', r'\b(x)?y', r'\.\d\b', r'\b\.',
+    r'(?i)foo', r'(?i)[a-f]{2}\b', r'^\d+$', r'a$', r'a.c', r'(?s)a.c', r'x{,2}y', r'a{}', r'(ab|cd)+?e', r'[\s.-]x'
+])
+def test_translation_matches_re_search(pattern):
+    assert_same_matches(pattern)
+
+def test_case_flag_becomes_a_parameter():
+    assert translate_pattern('(?i)abc') == ('.*(abc).*', 'si')
+    assert translate_pattern('abc') == ('.*(abc).*', 's')
+
+def test_pattern_is_wrapped_to_match_anywhere_in_the_value():
+    regex, parameters = translate_pattern('foo|bar')
+    
+    # The group keeps both alternatives inside the wrapping, so either is found anywhere
+    assert regex == '.*(foo|bar).*'
+    assert compile_regexp_like(regex, parameters).fullmatch('a bar\nand more')
+    assert not compile_regexp_like('foo|bar', parameters).fullmatch('a bar')
+    # Anchors stay inside the group and still tie the pattern to the ends of the value
+    regex, parameters = translate_pattern(r'^\d+$')
+    assert compile_regexp_like(regex, parameters).fullmatch('123\n')
+    assert not compile_regexp_like(regex, parameters).fullmatch('x123')
+
+@pytest.mark.parametrize('pattern', [r'(?=a)b', r'a(?!b)', r'(a)\1', r'a\Z', r'\b[-a]\b', r'(?m)^a', r'[\]]'])
+def test_untranslatable_patterns_are_rejected(pattern):
+    with pytest.raises(UnsupportedPattern):
+        translate_pattern(pattern)
+
+def test_untranslatable_rules_are_matched_client_side():
+    engine = RuleEngine({}, {r'\b\d{3}-\d{4}\b': 'PII - Phone', r'\d{3}(?=-)': 'PII - Prefix', r'(?i)ssn': 'PII - SSN'})
+    
+    rules = PushdownRules(engine)
+    
+    assert rules.client == [1]
+    assert [index for index, _, _, _ in rules.pushed] == [0, 2]
+    assert rules.rule_counts([4, 1], ['555-1234', '123-', 'SSN']) == [4, 2, 1]
+
+def test_untranslatable_rules_count_the_fetched_values(make_connector):
+    engine = RuleEngine({}, {r'\d{3}-\d{4}': 'PII - Phone', r'\d{3}(?=-\d{2}-)': 'PII - SSN'})
+    rules = PushdownRules(engine)
+    connector = make_connector(schemas=1, tables=2, columns=8, pii_ratio=0.6, seed=4)
+    columns = [column['name'] for column in connector.catalog['SCHEMA_0']['TABLE_1']]
+    
+    match_counts = connector.get_table_match_counts('SCHEMA_0', 'TABLE_1', columns, rules.patterns(), 50,
+                                                    with_values=True)
+    
+    assert rules.client == [1]
+    sample = connector.get_table_sample('SCHEMA_0', 'TABLE_1', columns, 50)
+    for column in columns:
+        values = match_counts[column]['values']
+        assert values == sample[column]
+        assert rules.rule_counts(match_counts[column]['matches'], values) == engine.count_rule_matches(values)
+    assert any(engine.count_rule_matches(sample[column])[1] for column in columns)
+
+def test_concurrent_identical_match_count_queries_are_answered_separately(make_connector, monkeypatch):
+    connector = make_connector(schemas=1, tables=1, columns=4, seed=2)
+    columns = [column['name'] for column in connector.catalog['SCHEMA_0']['TABLE_0']]
+    patterns = PushdownRules(RuleLoader(RULES_PATH).get_rule_engine()).patterns()
+    # Both queries are built before either runs
+    barrier = threading.Barrier(2)
+    match_counts_sql = type(connector)._match_counts_sql
+    monkeypatch.setattr(type(connector), '_match_counts_sql',
+                        lambda self, *args: (match_counts_sql(self, *args), barrier.wait())[0])
+    results = []
+    
+    def count(clone):
+        clone.connect()
+        results.append(clone.get_table_match_counts('SCHEMA_0', 'TABLE_0', columns, patterns, 30))
+    
+    threads = [threading.Thread(target=count, args=(connector.clone(),)) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert len(results) == 2 and results[0] == results[1]
+    assert connector.query_counts['sample'] == 2
@@ -0,0 +1,101 @@
+"""
+Tests for recording the statements a cursor runs in the query ledger and summarizing them.
+"""
+
+import pytest
+
+from utils.query_ledger import QueryLedger, read_ledger, summarize_ledger
+
+class FakeCursor:
+    """DB-API cursor returning canned rows, with Snowflake's query ids and asynchronous queries"""
+    
+    def __init__(self):
+        self.sfqid = None
+        self.rowcount = None
+        self.rows = []
+        self.queries = 0
+        self.results = {}
+    
+    def _run(self, command):
+        if 'missing' in command:
+            raise RuntimeError(f"Table does not exist: {command}")
+        self.queries += 1
+        self.sfqid = f"q{self.queries}"
+        self.rows = [(index,) for index in range(3)] if command.startswith(('SELECT', 'SHOW')) else []
+        self.rowcount = len(self.rows) or 1
+        self.results[self.sfqid] = (list(self.rows), self.rowcount)
+    
+    def execute(self, command):
+        self._run(command)
+        return self
+    
+    def execute_async(self, command):
+        self._run(command)
+        return {'queryId': self.sfqid}
+    
+    def get_results_from_sfqid(self, query_id):
+        self.sfqid = query_id
+        rows, self.rowcount = self.results[query_id]
+        self.rows = list(rows)
+    
+    def fetchone(self):
+        return self.rows.pop(0) if self.rows else None
+    
+    def fetchall(self):
+        rows, self.rows = self.rows, []
+        return rows
+    
+    def __iter__(self):
+        while self.rows:
+            yield self.rows.pop(0)
+    
+    def close(self):
+        pass
+
+@pytest.fixture
+def ledger_path(tmp_path):
+    ledger = QueryLedger(str(tmp_path / 'ledger.jsonl'))
+    cursor = ledger.wrap(FakeCursor())
+    
+    assert cursor.execute("SELECT email FROM CUSTOMER WHERE name = 'Ann'") is cursor
+    assert len(cursor.fetchall()) == 3
+    cursor.execute("SHOW TABLES")
+    assert cursor.fetchone() == (0,)
+    cursor.execute("ALTER TABLE CUSTOMER MODIFY COLUMN EMAIL SET TAG PII = 'PII - Contact'")
+    with pytest.raises(RuntimeError):
+        cursor.execute("SELECT * FROM missing WHERE secret = 'hunter2'")
+    first = cursor.execute_async("SELECT 1")['queryId']
+    second = cursor.execute_async("ALTER TABLE ORDERS SET TAG PII = 'x'")['queryId']
+    cursor.get_results_from_sfqid(second)
+    cursor.get_results_from_sfqid(first)
+    assert list(cursor) == [(0,), (1,), (2,)]
+    cursor.close()
+    ledger.close()
+    return ledger.filepath
+
+def test_each_statement_is_recorded_with_its_rows_and_query_id(ledger_path):
+    entries = list(read_ledger(ledger_path))
+    
+    assert [(entry['kind'], entry['query_id'], entry['rows']) for entry in entries] == [
+        ('SELECT', 'q1', 3), ('SHOW', 'q2', 1), ('ALTER', 'q3', 1), ('SELECT', 'q3', None),
+        ('ALTER', 'q5', 1), ('SELECT', 'q4', 3)
+    ]
+    assert entries[0]['sql'] == "SELECT email FROM CUSTOMER WHERE name = ?"
+    assert entries[3]['error'] == "Table does not exist: SELECT * FROM missing WHERE secret = ?"
+    assert all('error' not in entry for entry in entries[:3] + entries[4:])
+    assert all(entry['elapsed_seconds'] >= 0 for entry in entries)
+
+def test_summary_totals_statements_rows_and_errors_per_kind(ledger_path):
+    with open(ledger_path, 'a') as f:
+        f.write('{"kind": "SELECT", "elapsed')
+    
+    summary = summarize_ledger(read_ledger(ledger_path), top=2)
+    
+    kinds = summary['kinds']
+    assert set(kinds) == {'SELECT', 'SHOW', 'ALTER'}
+    assert {kind: (totals['statements'], totals['rows'], totals['errors']) for kind, totals in kinds.items()} == {
+        'SELECT': (3, 6, 1), 'SHOW': (1, 1, 0), 'ALTER': (2, 2, 0)
+    }
+    assert list(kinds) == sorted(kinds, key=lambda kind: kinds[kind]['elapsed_seconds'], reverse=True)
+    assert len(summary['slowest']) == 2
+    assert summary['slowest'][0]['elapsed_seconds'] >= summary['slowest'][1]['elapsed_seconds']
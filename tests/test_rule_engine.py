@@ -0,0 +1,73 @@
+"""
+Tests for matching column names against the combined name rules of the rule engine.
+"""
+
+import re
+
+import pytest
+
+from detection.rule_engine import RuleEngine
+from policy_manager.pii_detector import PIIDetector
+
+NAMES = ['EMAIL_ADDRESS', 'customer_name', 'CC_NUMBER', 'ssn', 'notes', 'mailaddress', 'user_names', 'acct',
+         'home_phone_no', 'api_key', 'date_of_birth', 'card#', 'x_password_hash', '', 'STATE', 'statement']
+
+def first_rule_searching(engine, name):
+    """The name rule match_name should find: the first one whose pattern re.search finds in the name"""
+    for pattern, compiled, category in engine.name_rules:
+        if compiled.search(name):
+            return pattern, category
+    return None
+
+def test_combined_rules_find_the_same_rule_as_searching_in_order(rule_loader):
+    engine = rule_loader.get_rule_engine()
+    
+    assert engine.name_matcher is not None
+    assert [engine.match_name(name) for name in NAMES] == [first_rule_searching(engine, name) for name in NAMES]
+
+def test_first_rule_wins_wherever_it_matches_in_the_name():
+    engine = RuleEngine({'name$': 'Late', 'first': 'Early', 'f': 'Single'}, {})
+    
+    assert engine.name_matcher is not None
+    assert engine.match_name('first_name') == ('name$', 'Late')
+    assert engine.match_name('first') == ('first', 'Early')
+    assert engine.match_name('fn') == ('f', 'Single')
+    assert engine.match_name('other') is None
+
+@pytest.mark.parametrize('pattern', [r'(a)\1', r'(?P<x>a)(?P=x)', r'(?x) a a', r'(a)?(?(1)a|b)'])
+def test_rules_that_cannot_be_combined_are_matched_one_at_a_time(pattern):
+    engine = RuleEngine({r'^(b)(c)': 'First', pattern: 'Repeated', 'z': 'Last'}, {})
+    
+    assert engine.name_matcher is None
+    assert engine.match_name('bc_aa') == (r'^(b)(c)', 'First')
+    assert engine.match_name('xaa') == (pattern, 'Repeated')
+    assert engine.match_name('z') == ('z', 'Last')
+
+def test_groups_without_references_are_combined():
+    engine = RuleEngine({r'(^|_)(ssn)($|_)': 'Government', r'(?i)(mail)': 'Contact'}, {})
+    
+    assert engine.name_matcher is not None
+    assert engine.match_name('tax_ssn') == (r'(^|_)(ssn)($|_)', 'Government')
+    assert engine.match_name('SSN') is None
+    assert engine.match_name('E_MAIL') == (r'(?i)(mail)', 'Contact')
+
+def test_ignorecase_flag_applies_to_every_combined_rule():
+    engine = RuleEngine({'ssn': 'Government', 'e?mail': 'Contact'}, {}, name_flags=re.IGNORECASE)
+    
+    assert engine.name_matcher is not None
+    assert engine.match_name('CUSTOMER_SSN') == ('ssn', 'Government')
+    assert engine.match_name('Email') == ('e?mail', 'Contact')
+
+@pytest.mark.parametrize('phone', ['phone', r'(ph)one\1'])
+def test_policy_manager_detector_matches_names_case_insensitively(phone):
+    detector = PIIDetector([
+        {'category': 'Government', 'name_patterns': [{'pattern': 'ssn'}]},
+        {'category': 'Contact', 'name_patterns': [{'pattern': '(e)?mail'}, {'pattern': phone}]}
+    ])
+    
+    # A backreference keeps the rules from being combined; either way the flag applies to every rule
+    assert (detector.rule_engine.name_matcher is None) == ('\\1' in phone)
+    assert detector.detect_from_name('SSN') == 'Government'
+    assert detector.detect_from_name('E_Mail') == 'Contact'
+    assert detector.detect_from_name('PHONEph') == 'Contact'
+    assert detector.detect_from_name('address') is None
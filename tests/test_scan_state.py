@@ -0,0 +1,115 @@
+"""
+Tests for skipping tables unchanged since the previous scan.
+"""
+
+import pytest
+
+import metadata_tagger
+from detection.detector import PIIDetector
+from detection.rule_loader import RuleLoader
+from utils.scan_state import ScanStateStore
+
+@pytest.fixture
+def scanned(monkeypatch):
+    """Tables passed to process_table, in order"""
+    tables = []
+    process_table = metadata_tagger.process_table
+    
+    def spy(connector, detector, overrides, database_name, schema, table, *args, **kwargs):
+        tables.append((schema, table))
+        return process_table(connector, detector, overrides, database_name, schema, table, *args, **kwargs)
+    
+    monkeypatch.setattr(metadata_tagger, 'process_table', spy)
+    return tables
+
+def scan(connector, rules_file, scan_state, overrides=None):
+    """Scan the synthetic database once with the rules as they are in rules_file"""
+    rule_loader = RuleLoader(rules_file.path)
+    metadata_tagger.process_database(connector, PIIDetector(rule_loader), rule_loader, overrides or {},
+                                     sample_size=20, scan_state=scan_state)
+
+@pytest.fixture
+def connector(make_connector):
+    return make_connector(schemas=1, tables=4, columns=5, pii_ratio=0.5, seed=3)
+
+@pytest.fixture
+def scan_state(tmp_path):
+    return ScanStateStore(str(tmp_path / 'state.json'))
+
+def test_unchanged_tables_are_skipped(connector, rules_file, scan_state, scanned):
+    scan(connector, rules_file, scan_state)
+    assert len(scanned) == 4
+    
+    scanned.clear()
+    scan(connector, rules_file, scan_state)
+    
+    assert scanned == []
+
+def test_changed_rules_invalidate_every_table(connector, rules_file, scan_state, scanned):
+    scan(connector, rules_file, scan_state)
+    
+    rules_file.replace("data_pattern_match: 0.05", "data_pattern_match: 0.1")
+    scanned.clear()
+    scan(connector, rules_file, scan_state)
+    
+    assert len(scanned) == 4
+
+def test_changed_overrides_invalidate_their_table(connector, rules_file, scan_state, scanned):
+    scan(connector, rules_file, scan_state)
+    
+    column = connector.catalog['SCHEMA_0']['TABLE_2'][0]['name']
+    scanned.clear()
+    scan(connector, rules_file, scan_state, {f"schema_0.table_2.{column}".lower(): 'customer_pii'})
+    
+    assert scanned == [('SCHEMA_0', 'TABLE_2')]
+
+def test_changed_columns_invalidate_their_table(connector, rules_file, scan_state, scanned):
+    scan(connector, rules_file, scan_state)
+    
+    connector.catalog['SCHEMA_0']['TABLE_1'][0]['type'] = 'VARIANT'
+    scanned.clear()
+    scan(connector, rules_file, scan_state)
+    
+    assert scanned == [('SCHEMA_0', 'TABLE_1')]
+
+def test_tables_written_while_scanned_are_scanned_again(connector, rules_file, scan_state, scanned):
+    tagged = {table for table, columns in connector.catalog['SCHEMA_0'].items() if any(c['pii'] for c in columns)}
+    written = sorted(tagged)[0]
+    single_table_stats = connector.get_single_table_stats
+    
+    # Rows land in one tagged table between its sample and the statistics read after its ALTER
+    def stats_with_write(schema, table):
+        stats = single_table_stats(schema, table)
+        return dict(stats, row_count=stats['row_count'] + 1) if table == written else stats
+    
+    connector.get_single_table_stats = stats_with_write
+    scan(connector, rules_file, scan_state)
+    del connector.get_single_table_stats
+    
+    scanned.clear()
+    scan(connector, rules_file, scan_state)
+    
+    assert scanned == [('SCHEMA_0', written)]
+
+def test_dropped_tables_are_forgotten(make_connector, rules_file, scan_state):
+    connector = make_connector(schemas=2, tables=3, columns=5, pii_ratio=0.5, seed=3)
+    scan(connector, rules_file, scan_state)
+    assert len(scan_state.tables) == 6
+    
+    del connector.catalog['SCHEMA_0']['TABLE_1']
+    del connector.catalog['SCHEMA_1']['TABLE_2']
+    rule_loader = RuleLoader(rules_file.path)
+    metadata_tagger.process_database(connector, PIIDetector(rule_loader), rule_loader, {}, ['SCHEMA_0'],
+                                     sample_size=20, scan_state=scan_state)
+    scan_state.save()
+    
+    # Tables of schemas the run did not list are kept, as their absence says nothing
+    saved = ScanStateStore(scan_state.filepath)
+    saved.load()
+    assert sorted(key.split('/', 1)[1] for key in saved.tables) == [
+        'SYNTHETIC.SCHEMA_0.TABLE_0', 'SYNTHETIC.SCHEMA_0.TABLE_2',
+        'SYNTHETIC.SCHEMA_1.TABLE_0', 'SYNTHETIC.SCHEMA_1.TABLE_1', 'SYNTHETIC.SCHEMA_1.TABLE_2'
+    ]
+    
+    scan(connector, rules_file, scan_state)
+    assert len(scan_state.tables) == 4
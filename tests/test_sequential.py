@@ -0,0 +1,61 @@
+"""
+Tests for sequential sampling, settling column tags from growing samples.
+"""
+
+import pytest
+
+import metadata_tagger
+from detection.detector import PIIDetector
+from detection.sequential import SequentialSampling
+
+@pytest.fixture
+def detector(rule_loader):
+    return PIIDetector(rule_loader, sequential=True)
+
+def test_default_first_round_can_rule_out_a_share():
+    sequential = SequentialSampling()
+    
+    assert sequential.rows_to_rule_out(0.05) == 52
+    assert sequential.interval(0, 52)[1] < 0.05 <= sequential.interval(0, 51)[1]
+    assert sequential.initial_sample_size >= sequential.rows_to_rule_out(0.05)
+
+def test_sample_sizes_grow_up_to_the_maximum():
+    sequential = SequentialSampling(initial_sample_size=20, growth_factor=5)
+    
+    assert sequential.sample_sizes(1000) == [20, 100, 500, 1000]
+    assert sequential.sample_sizes(100) == [20, 100]
+    assert sequential.sample_sizes(10) == [10]
+    assert sequential.next_sample_size(20) == 100
+    assert SequentialSampling(initial_sample_size=1, growth_factor=1.2).next_sample_size(1) == 2
+
+def test_column_matching_often_settles_with_its_tag(detector):
+    settled, tag_info = detector.settle_tag_from_data([f"user{i}@example.com" for i in range(60)])
+    
+    assert settled
+    assert tag_info[0] == 'PII - Customer Information'
+
+def test_column_matching_nothing_settles_untagged_in_the_first_round(detector):
+    assert detector.settle_tag_from_data([f"plain text {i}" for i in range(60)]) == (True, None)
+
+def test_column_matching_near_the_threshold_is_unsettled(detector):
+    sample_data = ['user@example.com'] * 3 + [f"plain text {i}" for i in range(57)]
+    
+    assert detector.settle_tag_from_data(sample_data) == (False, None)
+
+def test_empty_sample_is_unsettled(detector):
+    assert detector.settle_tag_from_data([]) == (False, None)
+
+def test_last_round_counts_rows_fetched_not_values():
+    assert metadata_tagger._last_round(None, 100, 100)
+    assert not metadata_tagger._last_round(60, 60, 300)
+    assert metadata_tagger._last_round(45, 60, 300)
+    assert not metadata_tagger._last_round(None, 60, 300)
+
+def test_null_heavy_columns_are_sampled_again(detector, make_connector):
+    connector = make_connector(schemas=1, tables=1, columns=6, rows=1000, null_ratio=0.5, seed=3)
+    columns = [column['name'] for column in connector.get_columns('SCHEMA_0', 'TABLE_0')]
+    
+    metadata_tagger.detect_from_samples(connector, detector, 'SCHEMA_0', 'TABLE_0', columns, sample_size=300)
+    
+    # Every column has fewer than 60 values in the first round, which must not end sampling
+    assert connector.query_counts['sample'] == 2
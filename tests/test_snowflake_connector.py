@@ -0,0 +1,155 @@
+"""
+Tests for the Snowflake connector against an in-memory stand-in for the driver's connection.
+"""
+
+import re
+import asyncio
+import threading
+
+import pytest
+
+pytest.importorskip('snowflake.connector')
+
+from connectors.snowflake import SnowflakeConnector
+from utils.query_ledger import QueryLedger, read_ledger
+
+class FakeCursor:
+    """Cursor recording every statement and failing the ones matching the connection's pattern"""
+    
+    def __init__(self, connection):
+        self.connection = connection
+        self.sfqid = None
+        self.rows = []
+    
+    def execute(self, sql, *args, **kwargs):
+        self.connection.statements.append(sql)
+        if self.connection.fail and re.search(self.connection.fail, sql):
+            raise Exception(f"failed: {sql}")
+        return self
+    
+    def execute_async(self, sql, *args, **kwargs):
+        self.connection.calls.append(('execute_async', threading.get_ident()))
+        self.connection.statements.append(sql)
+        self.sfqid = f"query-{len(self.connection.statements)}"
+        self.connection.submitted[self.sfqid] = sql
+        return {'queryId': self.sfqid}
+    
+    def get_results_from_sfqid(self, query_id):
+        self.connection.calls.append(('get_results_from_sfqid', threading.get_ident()))
+        self.sfqid = query_id
+        self.rows = [(query_id,)]
+    
+    def fetchall(self):
+        self.connection.calls.append(('fetchall', threading.get_ident()))
+        rows, self.rows = self.rows, []
+        return rows
+    
+    def fetchone(self):
+        return None
+    
+    def close(self):
+        pass
+
+class FakeConnection:
+    """Connection handing out recording cursors; submitted queries matching the pattern fail while running"""
+    
+    def __init__(self, fail=None):
+        self.fail = fail
+        self.statements = []
+        self.submitted = {}
+        self.calls = []
+        self.polls = {}
+    
+    def cursor(self):
+        return FakeCursor(self)
+    
+    def get_query_status_throw_if_error(self, query_id):
+        # Each query reports running twice before it succeeds
+        self.calls.append(('get_query_status_throw_if_error', threading.get_ident()))
+        self.polls[query_id] = self.polls.get(query_id, 0) + 1
+        if self.fail and re.search(self.fail, self.submitted[query_id]) and self.polls[query_id] > 2:
+            raise Exception(f"failed: {self.submitted[query_id]}")
+        return 'RUNNING' if self.polls[query_id] <= 2 else 'SUCCESS'
+    
+    def is_still_running(self, status):
+        return status == 'RUNNING'
+
+def make_connector(fail=None):
+    """Connector over a fake connection, skipping the real connect()"""
+    connector = SnowflakeConnector({'database': 'DB'})
+    connector.conn = FakeConnection(fail)
+    return connector
+
+def test_apply_tags_uses_one_statement():
+    connector = make_connector()
+    
+    applied = connector.apply_tags('PUBLIC', 'CUSTOMER', {'EMAIL': 'EMAIL', 'PHONE': 'PHONE'}, 'PII')
+    
+    assert applied == {'EMAIL': True, 'PHONE': True}
+    assert connector.conn.statements == [
+        "CREATE TAG IF NOT EXISTS DB.PUBLIC.PII",
+        "ALTER TABLE PUBLIC.CUSTOMER MODIFY COLUMN EMAIL SET TAG DB.PUBLIC.PII = 'EMAIL', "
+        "COLUMN PHONE SET TAG DB.PUBLIC.PII = 'PHONE'"
+    ]
+
+def test_apply_tags_falls_back_per_column_when_the_batch_fails():
+    # Any statement touching PHONE fails, so the batch fails and so does PHONE's own statement
+    connector = make_connector(fail=r"COLUMN PHONE ")
+    
+    applied = connector.apply_tags('PUBLIC', 'CUSTOMER', {'EMAIL': 'EMAIL', 'PHONE': 'PHONE', 'SSN': 'SSN'}, 'PII')
+    
+    assert applied == {'EMAIL': True, 'PHONE': False, 'SSN': True}
+    per_column = [statement for statement in connector.conn.statements if statement.count(' COLUMN ') == 1]
+    assert per_column == [
+        "ALTER TABLE PUBLIC.CUSTOMER MODIFY COLUMN EMAIL SET TAG DB.PUBLIC.PII = 'EMAIL'",
+        "ALTER TABLE PUBLIC.CUSTOMER MODIFY COLUMN PHONE SET TAG DB.PUBLIC.PII = 'PHONE'",
+        "ALTER TABLE PUBLIC.CUSTOMER MODIFY COLUMN SSN SET TAG DB.PUBLIC.PII = 'SSN'"
+    ]
+    # The tag is created once, not again for each column
+    assert connector.conn.statements.count("CREATE TAG IF NOT EXISTS DB.PUBLIC.PII") == 1
+
+def test_apply_tags_without_columns_runs_nothing():
+    connector = make_connector()
+    
+    assert connector.apply_tags('PUBLIC', 'CUSTOMER', {}, 'PII') == {}
+    assert connector.conn.statements == []
+
+def test_async_queries_run_driver_calls_off_the_event_loop():
+    connector = make_connector()
+    connector.ASYNC_POLL_INTERVAL = 0
+    
+    async def run():
+        return threading.get_ident(), await connector.gather(["SELECT 1", "SELECT 2"])
+    
+    loop_thread, results = asyncio.run(run())
+    
+    assert results == [[('query-1',)], [('query-2',)]]
+    assert {name for name, _ in connector.conn.calls} == {
+        'execute_async', 'get_query_status_throw_if_error', 'get_results_from_sfqid', 'fetchall'
+    }
+    assert all(thread != loop_thread for _, thread in connector.conn.calls)
+    assert connector.conn.polls == {'query-1': 3, 'query-2': 3}
+
+def test_plan_statements_are_submitted_together_and_recorded_one_by_one(tmp_path):
+    connector = make_connector(fail=r"TABLE_2 ")
+    connector.ASYNC_POLL_INTERVAL = 0
+    connector.query_ledger = QueryLedger(str(tmp_path / 'ledger.jsonl'))
+    statements = [f"ALTER TABLE DB.PUBLIC.TABLE_{index} MODIFY COLUMN EMAIL SET TAG DB.PUBLIC.PII = 'EMAIL'"
+                  for index in range(5)]
+    
+    succeeded = connector.execute_statements(statements, batch_size=2)
+    connector.query_ledger.close()
+    
+    assert succeeded == [True, True, False, True, True]
+    # Every statement is submitted once and nothing runs again after the failure
+    assert connector.conn.statements == statements
+    calls = [name for name, _ in connector.conn.calls]
+    assert calls.count('execute_async') == 5
+    # A batch is submitted in full before its first statement is waited for
+    assert calls[:2] == ['execute_async', 'execute_async']
+    assert calls.index('get_query_status_throw_if_error') == 2
+    entries = list(read_ledger(connector.query_ledger.filepath))
+    assert [entry['query_id'] for entry in entries] == [f"query-{index}" for index in range(1, 6)]
+    assert [entry['kind'] for entry in entries] == ['ALTER'] * 5
+    assert ['error' in entry for entry in entries] == [False, False, True, False, False]
+    assert all("= ?" in entry['sql'] and "EMAIL'" not in entry['error'] for entry in entries if 'error' in entry)
@@ -0,0 +1,94 @@
+"""
+Tests for the synthetic connector answering the tagger's queries through its cursors.
+"""
+
+import asyncio
+from collections import Counter
+
+import pytest
+
+import metadata_tagger
+from connectors.synthetic import SyntheticConnector
+from detection.detector import PIIDetector
+from policy_manager.policy_engine import PolicyEngine
+from utils.query_ledger import QueryLedger, read_ledger
+from utils.scan_state import ScanStateStore
+
+@pytest.fixture
+def connector(tmp_path):
+    """Synthetic connector recording its statements in a query ledger"""
+    connector = SyntheticConnector({'schemas': 2, 'tables': 3, 'columns': 6, 'pii_ratio': 0.5, 'seed': 5})
+    connector.query_ledger = QueryLedger(str(tmp_path / 'ledger.jsonl'))
+    return connector
+
+def ledger_kinds(connector):
+    """Number of ledger entries by statement kind"""
+    connector.query_ledger.close()
+    return Counter(entry['kind'] for entry in read_ledger(connector.query_ledger.filepath))
+
+def test_scan_queries_are_recorded_in_the_query_ledger(tmp_path, connector, rule_loader):
+    metadata_tagger.process_database(connector, PIIDetector(rule_loader), rule_loader, {}, sample_size=20,
+                                     scan_state=ScanStateStore(str(tmp_path / 'state.json')))
+    
+    counts = connector.query_counts
+    assert counts['sample'] > 0 and counts['tag'] > 0 and counts['stats'] > 0
+    assert ledger_kinds(connector) == {
+        'SELECT': counts['catalog'] + counts['stats'] + counts['sample'],
+        'CREATE': counts['create_tag'],
+        'ALTER': counts['tag']
+    }
+
+def test_async_scan_queries_are_recorded_in_the_query_ledger(connector, rule_loader):
+    asyncio.run(metadata_tagger.process_database_async(connector, PIIDetector(rule_loader), rule_loader, {},
+                                                       sample_size=20, max_in_flight=3))
+    
+    counts = connector.query_counts
+    assert ledger_kinds(connector) == {
+        'SELECT': counts['catalog'] + counts['sample'],
+        'CREATE': counts['create_tag'],
+        'ALTER': counts['tag']
+    }
+
+def test_samples_are_the_same_on_every_query(connector):
+    connector.connect()
+    columns = [column['name'] for column in connector.catalog['SCHEMA_0']['TABLE_0']]
+    
+    table_sample = connector.get_table_sample('SCHEMA_0', 'TABLE_0', columns, 50)
+    
+    assert connector.get_sample_data('SCHEMA_0', 'TABLE_0', columns[2], 50) == table_sample[columns[2]]
+    assert asyncio.run(connector.get_table_sample_async('SCHEMA_0', 'TABLE_0', columns, 50)) == table_sample
+    assert all(None not in values and len(values) <= 50 for values in table_sample.values())
+
+def test_tagging_an_unknown_column_falls_back_per_column(connector):
+    connector.connect()
+    column = connector.catalog['SCHEMA_0']['TABLE_0'][0]['name']
+    
+    applied = connector.apply_tags('SCHEMA_0', 'TABLE_0', {column: 'PII', 'MISSING': 'PII'}, 'PII')
+    
+    assert applied == {column: True, 'MISSING': False}
+    assert set(connector.applied_tags) == {('SCHEMA_0', 'TABLE_0', column)}
+    assert connector.query_counts['tag'] == 3
+    assert ledger_kinds(connector)['ALTER'] == 3
+
+def test_policy_manager_statements_are_answered_from_the_synthetic_state(connector):
+    connector.connect()
+    engine = PolicyEngine(connector)
+    column = connector.catalog['SCHEMA_1']['TABLE_2'][0]
+    connector.apply_tags('SCHEMA_1', 'TABLE_2', {column['name']: 'PII - Customer Information'}, 'PII')
+    
+    tagged = engine.get_tagged_columns('SYNTHETIC', 'PII', ['Customer'])
+    assert engine.create_category_masking_policy('SYNTHETIC', 'SCHEMA_1', 'MASK_PII', 'TEXT', "'***'")
+    assert engine.create_category_masking_policy('SYNTHETIC', 'SCHEMA_1', 'MASK_PII', 'TEXT', "'###'")
+    assert engine.apply_masking_policy_by_data_type('SYNTHETIC', 'SCHEMA_1', 'MASK_PII', 'SCHEMA_1', 'TABLE_2',
+                                                    column['name'], 'TEXT')
+    
+    assert tagged == [{'schema': 'SCHEMA_1', 'table': 'TABLE_2', 'column': column['name'],
+                       'data_type': column['type'], 'tag_value': 'PII - Customer Information'}]
+    assert connector.policies == {'SYNTHETIC.SCHEMA_1.MASK_PII_TEXT': 'MASKING'}
+    assert connector.policy_references == {
+        f"SYNTHETIC.SCHEMA_1.TABLE_2.{column['name']}": 'SYNTHETIC.SCHEMA_1.MASK_PII_TEXT'
+    }
+    assert connector.query_counts['tag_references'] == 2
+    assert connector.query_counts['column_types'] == 1
+    assert connector.query_counts['show'] == 2 and connector.query_counts['policy_ddl'] == 2
+    assert connector.query_counts['other'] == 0
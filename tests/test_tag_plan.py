@@ -0,0 +1,52 @@
+"""
+Tests for planning the tag DDL of a database and writing it as a SQL script.
+"""
+
+import re
+
+import metadata_tagger
+from utils.tag_plan import TagPlan, write_plan_sql
+
+def test_plan_script_defines_each_tag_once_before_its_statements(tmp_path):
+    plan = TagPlan('DB')
+    for schema, table in [('PUBLIC', 'CUSTOMER'), ('SALES', 'ORDERS'), ('PUBLIC', 'ORDERS')]:
+        plan.add_table(schema, table, 'PII', '', [('EMAIL', ('PII - Contact', 'Column name pattern: EMAIL'))],
+                       f"CREATE TAG IF NOT EXISTS DB.{schema}.PII",
+                       f"ALTER TABLE DB.{schema}.{table} MODIFY COLUMN EMAIL SET TAG DB.{schema}.PII = 'PII - Contact'")
+    path = str(tmp_path / 'plan.sql')
+    
+    assert write_plan_sql(path, [plan])
+    
+    with open(path) as f:
+        lines = [line for line in f.read().splitlines() if line and not line.startswith('-- Tag plan')]
+    assert lines[:3] == [
+        "-- Database: DB (3 tables)",
+        "CREATE TAG IF NOT EXISTS DB.PUBLIC.PII;",
+        "CREATE TAG IF NOT EXISTS DB.SALES.PII;"
+    ]
+    assert lines[3:6] == [
+        "-- PUBLIC.CUSTOMER",
+        "--   EMAIL = 'PII - Contact': Column name pattern: EMAIL",
+        "ALTER TABLE DB.PUBLIC.CUSTOMER MODIFY COLUMN EMAIL SET TAG DB.PUBLIC.PII = 'PII - Contact';"
+    ]
+    assert sum(line.startswith('ALTER TABLE') for line in lines) == 3
+
+def test_plan_tags_each_table_with_one_statement(make_connector, detector, rule_loader):
+    connector = make_connector(schemas=2, tables=3, columns=6, pii_ratio=0.5, seed=5)
+    plan = TagPlan('SYNTHETIC')
+    
+    results = metadata_tagger.plan_database(connector, detector, rule_loader, {}, plan, sample_size=20)
+    
+    assert plan.definitions() == ["CREATE TAG IF NOT EXISTS SYNTHETIC.SCHEMA_0.PII",
+                                  "CREATE TAG IF NOT EXISTS SYNTHETIC.SCHEMA_1.PII"]
+    statements = plan.statements()
+    assert len(statements) == len(plan.tables) == 6
+    for planned, statement in zip(plan.tables, statements):
+        columns = re.findall(r"COLUMN (\w+) SET TAG", statement)
+        assert statement.startswith(f"ALTER TABLE SYNTHETIC.{planned['schema']}.{planned['table']} MODIFY ")
+        assert columns == [column_name for column_name, _ in planned['decisions']]
+    assert any(len(planned['decisions']) > 1 for planned in plan.tables)
+    # Every statement succeeded, so no table fell back to tagging column by column
+    assert connector.query_counts['create_tag'] == 2
+    assert connector.query_counts['tag'] == 6
+    assert len(connector.applied_tags) == sum(len(rows) for rows in results.values())